@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Layout from './components/Layout';
 import WelcomePage from './components/WelcomePage';
 import UploadScreen from './components/UploadScreen';
@@ -24,6 +24,8 @@ function App() {
   const [apiData, setApiData] = useState<ApiRecommendationResponse | null>(null);
   const [userPrefs, setUserPrefs] = useState<Preferences | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(false);
+  // Last recommendations and their ETag: the server answers 304 when nothing changed
+  const lastRecommendations = useRef<{ etag: string; data: ApiRecommendationResponse } | null>(null);
 
   useEffect(() => {
     window.scrollTo({ top: 0, left: 0, behavior: 'instant' });
@@ -67,18 +69,27 @@ function App() {
     setUserPrefs(preferences);
     setIsLoading(true);
 
-    const formData = new FormData();
-    formData.append('completed_courses', JSON.stringify(completedCourses));
-    formData.append('department', department);
-    formData.append('preferences', JSON.stringify(preferences));
+    // GET, so the server can answer a repeat request with 304 (it only does that for GET)
+    const params = new URLSearchParams({
+      completed_courses: JSON.stringify(completedCourses),
+      department,
+      preferences: JSON.stringify(preferences),
+    });
 
     try {
-      const response = await fetch(`${API_URL}/api/recommendations`, {
-        method: 'POST',
-        body: formData,
+      const cached = lastRecommendations.current;
+      const response = await fetch(`${API_URL}/api/recommendations?${params}`, {
+        headers: cached ? { 'If-None-Match': cached.etag } : undefined,
       });
+      if (response.status === 304 && cached) {
+        setApiData(cached.data);
+        setStep(4);
+        return;
+      }
       const data = await response.json();
       if (response.ok) {
+        const etag = response.headers.get('ETag');
+        lastRecommendations.current = etag ? { etag, data } : null;
         setApiData(data);
         setStep(4);
       } else {
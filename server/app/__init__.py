@@ -1,15 +1,19 @@
 import os
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 from .config import Config
 from .extensions import db, migrate
+from . import metrics
+from .responses import FastJSONProvider, finalize_json
 
 def create_app():
     # Load environment variables from .env
     load_dotenv()
     app = Flask(__name__, instance_relative_config=False)
-    CORS(app)
+    app.json = FastJSONProvider(app)
+    # ETag exposed so the frontend can send it back as If-None-Match
+    CORS(app, expose_headers=['ETag'])
     app.config.from_object(Config)
 
     # Accept DATABASE_URL or SQLALCHEMY_DATABASE_URI
@@ -22,6 +26,13 @@ def create_app():
             db_url = db_url.replace("postgres://", "postgresql://", 1)
         app.config['SQLALCHEMY_DATABASE_URI'] = db_url
 
+    # Pool sizing from Config; the catalog and grades databases are binds of their own
+    # (the engine queries run on them, migrations manage classes.db's course_requisites table)
+    from .scripts.db_access import database_binds, pool_options
+    if app.config.get('SQLALCHEMY_DATABASE_URI'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', pool_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    app.config.setdefault('SQLALCHEMY_BINDS', database_binds())
+
     db.init_app(app)
     migrate.init_app(app, db)
 
@@ -29,6 +40,24 @@ def create_app():
     def ping():
         return "pong", 200
 
+    # Prometheus scrape target: stage/request histograms and cache counters
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return metrics.render_metrics(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    # Per-stage timings -> Server-Timing header (no-ops when METRICS_ENABLED=0)
+    @app.before_request
+    def start_timing():
+        metrics.begin_request()
+
+    @app.after_request
+    def add_server_timing(response):
+        return metrics.end_request(response, request.endpoint)
+
+    # ETag / 304 / compression of JSON bodies; registered after the Server-Timing hook,
+    # so it runs first and the compression time is in the header
+    app.after_request(finalize_json)
+
     # simple route to show DB count
     @app.route("/users-count")
     def users_count():
@@ -44,4 +73,9 @@ def create_app():
     from . import routes  # noqa
     app.register_blueprint(routes.api_bp)
 
+    # Optional: build catalogs/professor data now (shared by workers under gunicorn --preload)
+    if app.config['APP_WARMUP']:
+        from .warmup import warm_up
+        warm_up(app)
+
     return app
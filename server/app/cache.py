@@ -0,0 +1,132 @@
+"""
+Bounded LRU + TTL caches for /api/recommendations.
+
+Two stages are cached:
+    eligibility_cache: (department, sorted normalized completed courses)
+                       -> (eligible courses, offerings by course code)
+    result_cache:      (eligibility key, preferences)
+                       -> final scored recommendations list
+
+Both are cleared whenever classes.db, grades.sqlite or the professors
+database change (see invalidate_if_data_changed), so a cached answer is never
+older than the data.
+
+    transcript_cache:  sha256 of the uploaded PDF bytes -> parsed course list
+                       (independent of the databases, so never invalidated)
+    compressed_cache:  (ETag, Content-Encoding) -> compressed JSON body
+                       (the ETag is a hash of the body, so never stale)
+
+Hit/miss counters (and pooled connection reuse of the catalog and grades
+engines, see scripts/db_access.py) are served from /api/cache-stats.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .config import Config
+from .scripts.db_access import CATALOG, GRADES, connection_stats, data_version as database_version
+
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl              # seconds; None = entries only leave by eviction/clear
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Cached value or MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+eligibility_cache = LRUCache(Config.ELIGIBILITY_CACHE_SIZE, Config.RECOMMENDATION_CACHE_TTL)
+result_cache = LRUCache(Config.RESULT_CACHE_SIZE, Config.RECOMMENDATION_CACHE_TTL)
+transcript_cache = LRUCache(Config.TRANSCRIPT_CACHE_SIZE, Config.TRANSCRIPT_CACHE_TTL)
+compressed_cache = LRUCache(Config.COMPRESSED_CACHE_SIZE)
+
+_data_version = None
+_version_lock = threading.Lock()
+invalidations = 0
+
+
+def data_version():
+    """Changes whenever any database behind a recommendation changes."""
+    # Imported here: professor_index needs the app's models/extensions
+    from .professor_index import _db_version as professors_version
+    return (
+        database_version(CATALOG),
+        database_version(GRADES),
+        professors_version(),
+    )
+
+
+def invalidate_if_data_changed():
+    """Clears both caches the first time a request sees new data."""
+    global _data_version, invalidations
+    version = data_version()
+    if version == _data_version:
+        return
+    with _version_lock:
+        if version != _data_version:
+            if _data_version is not None:
+                invalidations += 1
+            eligibility_cache.clear()
+            result_cache.clear()
+            _data_version = version
+
+
+def cache_stats():
+    return {
+        'eligibility': eligibility_cache.stats(),
+        'results': result_cache.stats(),
+        'transcripts': transcript_cache.stats(),
+        'compressed': compressed_cache.stats(),
+        'invalidations': invalidations,
+        'db_connections': connection_stats(),
+    }
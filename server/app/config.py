@@ -4,3 +4,51 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     # SQLALCHEMY_DATABASE_URI will be set from env var DATABASE_URL or SQLALCHEMY_DATABASE_URI
+
+    # Catalog / grades databases (see app/scripts/db_access.py); default: classes.db / grades.sqlite under DATA_DIR
+    CATALOG_DATABASE_URL = os.getenv("CATALOG_DATABASE_URL")
+    GRADES_DATABASE_URL = os.getenv("GRADES_DATABASE_URL")
+
+    # Connection pool of every engine (professors, catalog, grades), per worker process.
+    # Pre-ping only applies to server databases: a SQLite file can't drop the connection.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+    # /api/recommendations caches (see app/cache.py); size 0 disables a cache
+    ELIGIBILITY_CACHE_SIZE = int(os.getenv("ELIGIBILITY_CACHE_SIZE", "512"))
+    RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "2048"))
+    RECOMMENDATION_CACHE_TTL = int(os.getenv("RECOMMENDATION_CACHE_TTL", "3600"))
+
+    # Parsed transcripts, keyed by a hash of the PDF bytes
+    TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))
+    TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", "1800"))
+
+    # JSON responses (see app/responses.py): bodies from this many bytes on are gzip/brotli
+    # compressed when the client accepts it (0 = never); compressed bodies kept per ETag
+    RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+    COMPRESSED_CACHE_SIZE = int(os.getenv("COMPRESSED_CACHE_SIZE", "256"))
+
+    # Background parse jobs (POST /api/parse-transcript?async=1, see app/transcript_jobs.py):
+    # pool processes per worker, max queued jobs per worker, seconds a finished job is kept,
+    # seconds after which an unfinished job is considered dead (failed)
+    TRANSCRIPT_JOB_WORKERS = int(os.getenv("TRANSCRIPT_JOB_WORKERS", "2"))
+    TRANSCRIPT_JOB_MAX_PENDING = int(os.getenv("TRANSCRIPT_JOB_MAX_PENDING", "32"))
+    TRANSCRIPT_JOB_TTL = int(os.getenv("TRANSCRIPT_JOB_TTL", "3600"))
+    TRANSCRIPT_JOB_TIMEOUT = int(os.getenv("TRANSCRIPT_JOB_TIMEOUT", "600"))
+    TRANSCRIPT_JOBS_DB = os.getenv("TRANSCRIPT_JOBS_DB")  # default: a file in the system temp dir
+
+    # Max entries accepted by /api/recommendations/batch
+    BATCH_MAX_ENTRIES = int(os.getenv("BATCH_MAX_ENTRIES", "1000"))
+
+    # Load catalogs and professor data inside create_app (see app/warmup.py)
+    APP_WARMUP = os.getenv("APP_WARMUP", "0") == "1"
+
+    # Stage timers, Server-Timing header and /metrics (see app/metrics.py); 0 turns them off
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+    # instructor_professor_map matches below this confidence count as "no professor" (see app/scripts/instructor_map.py)
+    INSTRUCTOR_MATCH_MIN_CONFIDENCE = float(os.getenv("INSTRUCTOR_MATCH_MIN_CONFIDENCE", "0.75"))
@@ -2,4 +2,5 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
 db = SQLAlchemy()
-migrate = Migrate()
+# render_as_batch: SQLite can only change column types by copying the table (alembic batch mode)
+migrate = Migrate(render_as_batch=True)
@@ -0,0 +1,176 @@
+"""
+Per-stage timing for the API.
+
+    with stage("eligibility"):
+        ...
+
+    @timed("catalog_load")
+    def get_department_courses(...): ...
+
+Every stage of a request is summed per name and sent back as a
+Server-Timing header (durations in ms), and observed into a histogram.
+/metrics serves the histograms, request durations and cache counters in
+Prometheus text format.
+
+METRICS_ENABLED=0 turns all of it off: stage() then hands back a shared
+no-op context manager and timed() calls straight through.
+"""
+import contextvars
+import functools
+import threading
+import time
+
+from .config import Config
+
+ENABLED = Config.METRICS_ENABLED
+
+# Seconds. Finer than Prometheus' defaults at the low end: most stages take well under 10 ms.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage timings of the request being handled ({name: seconds}), None outside a request
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, Prometheus style."""
+
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._series = {}  # label value -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for value, series in items:
+            label = f'{self.label}="{_escape(value)}"'
+            for bound, n in zip(BUCKETS, series):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label}}} {series[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{label}}} {series[-1]}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+stage_seconds = Histogram('smartadvisors_stage_duration_seconds',
+                          'Time spent in each stage of an API request.', 'stage')
+request_seconds = Histogram('smartadvisors_request_duration_seconds',
+                            'Total time per API endpoint.', 'endpoint')
+
+
+def record(name, seconds):
+    """Adds one timed stage to the current request and to the stage histogram."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    stage_seconds.observe(name, seconds)
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager timing one stage (no-op when metrics are disabled)."""
+    if not ENABLED:
+        return _NO_STAGE
+    return _Stage(name)
+
+
+def timed(name):
+    """Decorator version of stage()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# --- Flask hooks (registered in create_app) ---
+
+def begin_request():
+    if ENABLED:
+        _request_timings.set({'_start': time.perf_counter()})
+
+
+def end_request(response, endpoint):
+    """Adds the Server-Timing header and observes the request duration."""
+    timings = _request_timings.get()
+    if timings is None:
+        return response
+    _request_timings.set(None)
+    total = time.perf_counter() - timings.pop('_start')
+    request_seconds.observe(endpoint or 'unknown', total)
+
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    response.headers['Server-Timing'] = ', '.join(parts)
+    return response
+
+
+def render_metrics():
+    """Prometheus text exposition of the histograms plus cache counters."""
+    from .cache import cache_stats  # imported here: cache imports the data paths
+
+    lines = stage_seconds.render() + request_seconds.render()
+    stats = cache_stats()
+    for metric, key, kind in (
+        ('smartadvisors_cache_hits_total', 'hits', 'counter'),
+        ('smartadvisors_cache_misses_total', 'misses', 'counter'),
+        ('smartadvisors_cache_entries', 'size', 'gauge'),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        for cache in ('eligibility', 'results', 'transcripts', 'compressed'):
+            lines.append(f'{metric}{{cache="{cache}"}} {stats[cache][key]}')
+    lines.append("# TYPE smartadvisors_cache_invalidations_total counter")
+    lines.append(f"smartadvisors_cache_invalidations_total {stats['invalidations']}")
+    return '\n'.join(lines) + '\n'
@@ -12,6 +12,8 @@ class Professor(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128))
+    rmp_name = db.Column(db.String(128))
+    url = db.Column(db.String(256))
     department = db.Column(db.String(128))
     
     # --- THE FIX IS HERE ---
@@ -20,8 +22,39 @@ class Professor(db.Model):
     
     # "When I say .difficulty, read the 'difficulty_rating' column"
     difficulty = db.Column('difficulty_rating', db.Float)
+
+    # Stored as REAL/INTEGER since the typed-columns migration ("N/A" -> NULL, "85%" -> 85.0)
+    total_ratings = db.Column(db.Integer)
+    would_take_again = db.Column(db.Float)
     
     tags = db.Column(db.String(512))
 
+    # Case-insensitive name lookups: WHERE lower(name) = lower(:name) uses this index
+    __table_args__ = (db.Index('ix_professors_name_lower', db.func.lower(name)),)
+
     def __repr__(self):
-        return f"<Professor {self.name}>"
\ No newline at end of file
+        return f"<Professor {self.name}>"
+
+
+class CourseRequisite(db.Model):
+    """
+    One prerequisite/co-requisite edge of a ClassesFor<Dept> row, in classes.db.
+    The Pre_Requisites/Co_Requisites columns stay as they are (AND/OR
+    expressions, see scripts/requisites.py); this table has one row per course
+    they mention, whether required or an alternative, and is kept in step with
+    them by the scraper (see CourseWriter).
+    """
+    __bind_key__ = 'catalog'
+    __tablename__ = 'course_requisites'
+
+    id = db.Column(db.Integer, primary_key=True)
+    department = db.Column(db.String(10), nullable=False)  # the ClassesFor<Dept> table
+    course_num = db.Column(db.String(16), nullable=False)  # normalized, e.g. "CSE 3318"
+    requisite = db.Column(db.String(16), nullable=False)
+    kind = db.Column(db.String(3), nullable=False)         # 'pre' | 'co'
+    position = db.Column(db.Integer, nullable=False)       # order in the original string
+
+    __table_args__ = (
+        db.Index('ix_course_requisites_course', 'department', 'course_num'),
+        db.Index('ix_course_requisites_requisite', 'requisite'),
+    )
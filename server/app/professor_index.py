@@ -0,0 +1,220 @@
+"""
+In-memory professor name index.
+
+get_recommendations used to resolve each instructor with up to three
+`Professor.name.ilike(...)` queries, the last one a `%lastname%` scan. This
+module loads the professors table once (and again whenever the database file
+changes) and answers the same three lookups from memory:
+
+    1. case-insensitive full name           -> ILIKE 'John Smith'
+    2. "Smith, John" swapped to "John Smith" -> ILIKE 'John Smith'
+    3. last name anywhere in the name        -> ILIKE '%Smith%'
+
+Each step returns the first professor in table order, which is what
+`.first()` returns for those queries, so the picked professor is unchanged.
+"""
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from .config import Config
+from .extensions import db
+from .models import Professor
+from .scoring import FeatureTable, score_professors
+from .scripts.instructor_map import load_instructor_map, professors_fingerprint
+from .scripts.records import ProfessorRecord
+from .scripts.snapshot import get_snapshot
+
+# SQLite's lower()/LIKE only fold ASCII letters
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+# Non-SQLite databases have no file to stat, so they are reloaded on a timer
+REFRESH_SECONDS = 300
+
+
+def _fold(text):
+    return text.translate(_ASCII_LOWER)
+
+
+def _like_regex(pattern):
+    """LIKE pattern -> compiled regex ('%' = any run, '_' = any one char)."""
+    parts = []
+    for ch in pattern:
+        if ch == '%':
+            parts.append('.*')
+        elif ch == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(ch))
+    return re.compile(''.join(parts), re.DOTALL)
+
+
+class ProfessorIndex:
+    def __init__(self, professors):
+        self.professors = []   # rows with a name, in table order
+        self.by_name = {}      # folded name -> first row with that name
+        folded = []
+        for prof in professors:
+            if prof.name is None:
+                continue
+            key = _fold(prof.name)
+            self.by_name.setdefault(key, prof)
+            self.professors.append(prof)
+            folded.append(key)
+        self.folded = folded
+        self.fingerprint = professors_fingerprint((prof.id, prof.name) for prof in self.professors)
+        self._mapped = None  # (InstructorMap, {instructor: professor or None}) once resolved
+
+        # All names joined into one string: the first blob.find(needle) hit is the
+        # first professor (in table order) whose name contains the needle.
+        self.blob = '\n'.join(folded)
+        self.starts = []
+        pos = 0
+        for key in folded:
+            self.starts.append(pos)
+            pos += len(key) + 1
+
+        self._contains_cache = {}
+
+        # Scoring features, encoded once per load; the extra last row stands for
+        # "no professor matched" (always scores 0.0)
+        self.features = FeatureTable(self.professors + [None])
+        self.row_of = {id(prof): i for i, prof in enumerate(self.professors)}
+        self.no_match_row = len(self.professors)
+
+    def _ilike(self, pattern):
+        key = _fold(pattern)
+        if '%' not in key and '_' not in key:
+            return self.by_name.get(key)
+        regex = _like_regex(key)
+        for prof, name in zip(self.professors, self.folded):
+            if regex.fullmatch(name):
+                return prof
+        return None
+
+    def _contains(self, needle):
+        key = _fold(needle)
+        if key in self._contains_cache:
+            return self._contains_cache[key]
+        if '%' in key or '_' in key or '\n' in key:
+            match = self._ilike(f"%{needle}%")
+        else:
+            pos = self.blob.find(key)
+            match = self.professors[bisect_right(self.starts, pos) - 1] if pos != -1 else None
+        self._contains_cache[key] = match
+        return match
+
+    def resolve(self, prof_name):
+        """Same three-step match get_recommendations used to run as SQL."""
+        db_prof = self._ilike(prof_name)
+
+        # Swap Check: "Smith, John" -> "John Smith"
+        if not db_prof and ',' in prof_name:
+            parts = prof_name.split(',')
+            if len(parts) >= 2:
+                swapped = f"{parts[1].strip()} {parts[0].strip()}"
+                db_prof = self._ilike(swapped)
+
+        # Fuzzy Last Name Check
+        if not db_prof:
+            parts = prof_name.replace(',', '').split()
+            if len(parts) > 0:
+                last_name = parts[0] if ',' in prof_name else parts[-1]
+                db_prof = self._contains(last_name)
+
+        return db_prof
+
+    def score(self, professors, user_prefs):
+        """Match scores for professors from this index (None allowed), in one NumPy pass."""
+        rows = []
+        for prof in professors:
+            row = self.no_match_row if prof is None else self.row_of.get(id(prof))
+            if row is None:
+                # Not from this index (it was reloaded mid-request): encode directly
+                return score_professors(professors, user_prefs)
+            rows.append(row)
+        return self.features.score(user_prefs, np.array(rows, dtype=np.intp))
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def _db_version():
+    """mtime/size of the SQLite file behind the Professor table, or a time bucket otherwise."""
+    url = db.engine.url
+    if url.get_backend_name() == 'sqlite' and url.database and os.path.exists(url.database):
+        st = os.stat(url.database)
+        return (st.st_mtime_ns, st.st_size)
+    return int(time.time() // REFRESH_SECONDS)
+
+
+def get_professor_index():
+    """Returns the name index, (re)loading it when the professors database has changed."""
+    global _index, _index_version
+    version = _db_version()
+    snap = get_snapshot()
+    if snap is not None and not snap.professors_match(version):
+        snap = None
+    version = (version, snap.version if snap is not None else None)
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_version != version:
+            if snap is not None:
+                rows = snap.professor_rows()
+            else:
+                rows = [ProfessorRecord(*row) for row in db.session.query(
+                    Professor.id, Professor.name, Professor.rating, Professor.difficulty, Professor.tags
+                )]
+            _index = ProfessorIndex(rows)
+            _index_version = version
+    return _index
+
+
+def mapped_professors(index):
+    """
+    {instructor: professor row or None} from the stored instructor_professor_map,
+    or None when it hasn't been built or was built from other professors.
+    """
+    loaded = load_instructor_map()
+    if loaded is None or loaded.fingerprint != index.fingerprint:
+        return None
+    cached = index._mapped
+    if cached is not None and cached[0] is loaded:
+        return cached[1]
+
+    by_id = {str(prof.id): prof for prof in index.professors}
+    min_confidence = Config.INSTRUCTOR_MATCH_MIN_CONFIDENCE
+    mapped = {
+        name: by_id.get(pid) if pid is not None and confidence >= min_confidence else None
+        for name, (pid, confidence) in loaded.matches.items()
+    }
+    index._mapped = (loaded, mapped)
+    return mapped
+
+
+def resolve_professors(names):
+    """
+    Batch lookup: {instructor name: professor row or None}, with no SQL round-trips.
+    One dict lookup per name when instructor_professor_map is built; names it
+    doesn't know (or no map at all) go through the name heuristics.
+    """
+    index = get_professor_index()
+    mapped = mapped_professors(index)
+    if mapped is None:
+        return {name: index.resolve(name) for name in dict.fromkeys(names)}
+    return {name: mapped[name] if name in mapped else index.resolve(name) for name in dict.fromkeys(names)}
+
+
+def score_matches(matches, user_prefs):
+    """{instructor name: professor or None} -> {instructor name: match score}."""
+    names = list(matches)
+    scores = get_professor_index().score([matches[n] for n in names], user_prefs)
+    return dict(zip(names, scores))
@@ -0,0 +1,119 @@
+"""
+JSON encoding, ETags and compression for API responses.
+
+A recommendation payload is 40-90 KB of JSON, most of it the same tag lists
+repeated per course, and the frontend asks for the same state again while a
+student goes back and forth in PreferenceForm.
+
+- FastJSONProvider (app.json) encodes with orjson when it is installed: the
+  same sorted, compact JSON as Flask's provider (non-ASCII as UTF-8 rather
+  than \\u escapes) for a fraction of the CPU. Without orjson it is Flask's
+  provider unchanged.
+- finalize_json (after_request) handles complete 200 JSON bodies:
+    ETag      GET/HEAD only: weak hash of the body, so equal payloads get
+              equal tags
+    304       GET/HEAD only, when If-None-Match has that tag (a POST with a
+              matching tag would have to get 412, so POSTs aren't tagged;
+              clients revalidate through GET /api/recommendations)
+    encoding  br (needs the brotli package) or gzip when the client accepts
+              it and the body is at least RESPONSE_COMPRESS_MIN_BYTES;
+              compressed bodies are kept by (ETag, encoding), so a repeat
+              answer is not compressed again
+  NDJSON streams and error responses pass through untouched.
+"""
+import gzip
+import hashlib
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+from . import metrics
+from .cache import MISSING, compressed_cache
+
+try:
+    import orjson
+except ImportError:  # optional: Flask's stdlib encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with orjson doing the encoding when available."""
+
+    def dumps_bytes(self, obj):
+        """UTF-8 JSON bytes for obj."""
+        if orjson is None:
+            return super().dumps(obj).encode()
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            # Something only the stdlib encoder takes (e.g. an int wider than 64 bits)
+            return super().dumps(obj).encode()
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed output (debug mode) stays with the stdlib encoder
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def _encoding(size):
+    """Content-Encoding to send a body of this size with, or None."""
+    min_bytes = current_app.config['RESPONSE_COMPRESS_MIN_BYTES']
+    if min_bytes <= 0 or size < min_bytes:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(body, etag, encoding):
+    key = (etag, encoding)
+    compressed = compressed_cache.get(key)
+    if compressed is MISSING:
+        with metrics.stage("compress"):
+            if encoding == 'br':
+                compressed = brotli.compress(body, quality=current_app.config['RESPONSE_BROTLI_QUALITY'])
+            else:
+                compressed = gzip.compress(body, compresslevel=current_app.config['RESPONSE_GZIP_LEVEL'], mtime=0)
+        compressed_cache.put(key, compressed)
+    return compressed
+
+
+def finalize_json(response):
+    """after_request hook: ETag, 304 and compression for complete JSON responses."""
+    if (response.status_code != 200 or response.mimetype != 'application/json' or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    body = response.get_data()
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    revalidate = request.method in ('GET', 'HEAD')
+    if revalidate and request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        encoding = _encoding(len(body))
+        if encoding is not None:
+            # The hash also keys the compressed-body memo, for POSTs too
+            response.set_data(_compress(body, etag, encoding))
+            response.headers['Content-Encoding'] = encoding
+    if revalidate:
+        response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -1,20 +1,19 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from werkzeug.datastructures import FileStorage # Import for type hinting
-import os
-import tempfile
+import hashlib
 import sys
 import traceback
 import json
 
-from app.models import Professor
+from app.cache import MISSING, cache_stats, eligibility_cache, invalidate_if_data_changed, result_cache, transcript_cache
+from app import metrics, transcript_jobs
+from app.professor_index import resolve_professors, score_matches
+from app.scoring import as_float, score_professors
 
-from .scripts.recommendation_engine import (
-    get_department_courses,
-    filter_eligible_courses_unique,
-    get_professor_offerings_for_course
-)
-from .scripts.parse_transcript import extract_all_courses
+from .scripts.catalog_graph import get_catalog_graph
+from .scripts.offerings_index import get_offerings_for_courses
+from .scripts.parse_transcript import parse_courses
+from .scripts.recommendation_engine import normalize_code
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -22,84 +21,223 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 def calculate_match_score(professor_obj, user_prefs):
     """
     Sophisticated scoring based on Rating, Difficulty, and Tags.
+    Single-professor wrapper around the vectorized scorer in scoring.py.
     """
     if not professor_obj:
         return 0.0
-    
-    # 1. BASELINE: Start with the Quality Rating (0 - 5)
-    try:
-        base_score = float(professor_obj.rating) if professor_obj.rating else 2.5
-    except:
-        base_score = 2.5
+    return score_professors([professor_obj], user_prefs)[0]
+
+
+def history_key(department, completed_courses):
+    """Cache/dedup key for a course history: only the normalized set matters."""
+    return (department, tuple(sorted(set(normalize_code(c) for c in completed_courses))))
+
+
+def prefs_key(user_prefs):
+    return json.dumps(user_prefs, sort_keys=True)
+
+
+def eligible_courses_with_offerings(department, completed_courses):
+    """Stage 1: eligible courses for a transcript plus their offerings (depends only on the course history)."""
+    # Compiled once per catalog version; same result as filter_eligible_courses_unique
+    with metrics.stage("catalog"):
+        graph = get_catalog_graph(department)
+    with metrics.stage("eligibility"):
+        eligible = graph.eligible_courses(completed_courses)
+
+    # One query for every eligible course (see scripts/offerings_index.py)
+    with metrics.stage("offerings"):
+        offerings_by_code = get_offerings_for_courses(eligible.keys())
+    return eligible, offerings_by_code
+
+
+def instructor_names(offerings_by_code):
+    """Every real instructor name in a set of offerings ("Staff"/"TBA" placeholders skipped)."""
+    return [
+        prof_name
+        for offerings in offerings_by_code.values()
+        for offer in offerings
+        for prof_name in offer['instructors']
+        if prof_name and prof_name.lower() not in ['staff', 'tba', 'unknown']
+    ]
+
+
+def build_recommendations(eligible, offerings_by_code, user_prefs):
+    """Stage 2: match instructors to professors and score them for the user's preferences."""
+    # Resolve every instructor of this request in one batch, from memory
+    with metrics.stage("professor_match"):
+        prof_matches = resolve_professors(instructor_names(offerings_by_code))
+
+    # A professor's score doesn't depend on the course: score each one once
+    with metrics.stage("scoring"):
+        prof_scores = score_matches(prof_matches, user_prefs)
+    with metrics.stage("assemble"):
+        return assemble_recommendations(eligible, offerings_by_code, prof_matches, prof_scores)
+
+
+def course_templates(eligible, offerings_by_code, prof_matches):
+    """
+    The preference-independent part of stage 2: for each course, its professor
+    rows without matchScore. Built once per course history and reused for
+    every preference dict (see the batch route).
+    """
+    return list(iter_course_templates(eligible, offerings_by_code, prof_matches))
+
+
+def iter_course_templates(eligible, offerings_by_code, prof_matches):
+    """Generator behind course_templates: one (code, name, professor rows) per course."""
+    for code, course in eligible.items():
+        offerings = offerings_by_code[code]
         
-    score = base_score
-    
-    # Get Data safely
-    try:
-        difficulty = float(professor_obj.difficulty) if professor_obj.difficulty else 3.0
-    except:
-        difficulty = 3.0
+        professors_list = []
+        seen = set()
+        
+        for offer in offerings:
+            for prof_name in offer['instructors']:
+                
+                # CLEANUP: Skip "Staff" or "TBA" placeholders
+                if not prof_name or prof_name.lower() in ['staff', 'tba', 'unknown']:
+                    continue
+
+                if prof_name not in seen:
+                    seen.add(prof_name)
+                    
+                    try:
+                        # Same match the old ILIKE name / swapped name / %lastname% queries picked
+                        db_prof = prof_matches[prof_name]
+
+                        # GET DATA (Safe defaults)
+                        # as_float: unmigrated professors.db files still hold "N/A" text
+                        if db_prof and db_prof.rating is not None:
+                            final_rating = as_float(db_prof.rating, 0.0)
+                        else:
+                            final_rating = round(as_float(offer.get('course_gpa', 0) or 0, 0.0), 1)
+                        
+                        final_tags = []
+                        if db_prof and db_prof.tags:
+                            final_tags = str(db_prof.tags).split(',')
+
+                        final_difficulty = "Moderate"
+                        diff_val = as_float(db_prof.difficulty) if db_prof and db_prof.difficulty else None
+                        if diff_val is not None:
+                            if diff_val < 2.5: final_difficulty = "Easy"
+                            elif diff_val > 3.8: final_difficulty = "Hard"
+
+                        professors_list.append((
+                            str(len(professors_list)),
+                            prof_name,
+                            final_rating,
+                            final_difficulty,
+                            f"{offer.get('year','')} {offer.get('semester','')}".strip(),
+                            final_tags,
+                        ))
+                    except Exception as inner_e:
+                        print(f"Skipping prof {prof_name}: {inner_e}", file=sys.stderr)
+                        continue
+
+        yield (code, course['Course_Name'], professors_list)
+
+
+def apply_scores(templates, prof_scores):
+    """Fills in matchScore for one preference dict and sorts each course's professors."""
+    return list(iter_scored(templates, prof_scores))
 
-    try:
-        tags_str = str(professor_obj.tags).lower() if professor_obj.tags else ""
-    except:
-        tags_str = ""
-    
-    # --- 2. LOGIC APPLICATION ---
 
-    # A. EASY GRADER LOGIC
-    if user_prefs.get('extraCredit'):
-        if "extra credit" in tags_str:
-            score += 1.0
+def iter_scored(templates, prof_scores):
+    """Generator behind apply_scores: one recommendation record per course template."""
+    for code, course_name, rows in templates:
+        professors_list = [
+            {
+                'id': prof_id,
+                'name': prof_name,
+                'rating': rating,
+                'difficulty': difficulty,
+                'matchScore': prof_scores[prof_name],
+                'schedule': schedule,
+                'tags': tags,
+                'reviewCount': 0, 'classSize': 'Unknown', 'assessmentType': 'Unknown', 'attendance': 'Unknown'
+            }
+            for prof_id, prof_name, rating, difficulty, schedule, tags in rows
+        ]
 
-    if user_prefs.get('easyGrader') or user_prefs.get('clearGrading'):
-        # Bonus for low difficulty (1.0 difficulty = +2.0 boost)
-        difficulty_bonus = (5.0 - difficulty) * 0.5 
-        score += difficulty_bonus
+        # Sort by Match Score (Highest First)
+        professors_list.sort(key=lambda x: x['matchScore'], reverse=True)
         
-        if any(t in tags_str for t in ['easy grader', 'clear grading', 'graded by few things']):
-            score += 1.0
-        if any(t in tags_str for t in ['tough grader', 'hard grader']):
-            score -= 1.5
-
-    # B. TEACHING QUALITY
-    if user_prefs.get('caring') or user_prefs.get('goodFeedback'):
-        if any(t in tags_str for t in ['caring', 'respected', 'inspirational', 'accessible', 'good feedback']):
-            score += 1.2
-    
-    # C. LEARNING STYLE
-    if user_prefs.get('lectureHeavy'):
-        if "amazing lectures" in tags_str:
-            score += 1.5
-        elif "lecture heavy" in tags_str:
-            score += 0.5 
-    
-    if user_prefs.get('groupProjects'):
-        if "group projects" in tags_str:
-            score += 1.0
-    else:
-        # User dislikes groups (default assumption)
-        if "group projects" in tags_str:
-            score -= 0.5
+        yield {
+            'courseCode': code, 
+            'courseName': course_name, 
+            'professors': professors_list
+        }
+
 
-    # D. "DEAL BREAKERS"
-    if not user_prefs.get('testHeavy'):
-        if any(t in tags_str for t in ['test heavy', 'tests are tough']):
-            score -= 1.5 
+def assemble_recommendations(eligible, offerings_by_code, prof_matches, prof_scores):
+    """Per-course professor lists from already resolved matches and scores."""
+    return apply_scores(course_templates(eligible, offerings_by_code, prof_matches), prof_scores)
 
-    if not user_prefs.get('homeworkHeavy'):
-        if any(t in tags_str for t in ['lots of homework', 'so many papers']):
-            score -= 1.0
 
-    if not user_prefs.get('strictAttendance'):
-        if any(t in tags_str for t in ['attendance mandatory', 'skip class']):
-            score -= 1.0
+def iter_recommendations(eligible, offerings_by_code, user_prefs):
+    """
+    Streaming version of build_recommendations: matches and scores one course's
+    professors at a time and yields its record right away. The records are the
+    same, in the same order, as build_recommendations returns.
+    """
+    for code, course in eligible.items():
+        course_offerings = {code: offerings_by_code[code]}
+        prof_matches = resolve_professors(instructor_names(course_offerings))
+        prof_scores = score_matches(prof_matches, user_prefs)
+        yield from iter_scored(iter_course_templates({code: course}, course_offerings, prof_matches), prof_scores)
+
 
-    if not user_prefs.get('popQuizzes'):
-        if "pop quizzes" in tags_str:
-            score -= 2.0 
+def wants_ndjson():
+    """Streaming is opt-in: ?stream=1 (or ?format=ndjson), or an Accept: application/x-ndjson header."""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes') or request.args.get('format') == 'ndjson':
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
 
-    return round(score, 1)
+
+def ndjson_response(records, on_complete=None):
+    """
+    One JSON object per line, written as each record is produced. on_complete
+    gets the full list once the client has read everything (used to fill the
+    result cache).
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        produced = []
+        try:
+            for record in records:
+                produced.append(record)
+                yield dumps(record) + '\n'
+        except Exception as e:
+            # Headers are already sent: report the failure as the last line
+            traceback.print_exc(file=sys.stderr)
+            yield dumps({'error': str(e)}) + '\n'
+            return
+        if on_complete:
+            on_complete(produced)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def courses_from_upload(file: FileStorage):
+    """
+    Parses an uploaded transcript from memory (no temp file), reusing the
+    result when the same PDF bytes were parsed before.
+    """
+    data = file.read()
+    key = hashlib.sha256(data).hexdigest()
+    courses = transcript_cache.get(key)
+    if courses is MISSING:
+        try:
+            with metrics.stage("transcript_parse"):
+                courses = parse_courses(data)
+        except Exception as e:
+            # Same behaviour as extract_all_courses: unreadable PDF -> no courses (not cached)
+            print(f"Error parsing PDF: {e}", file=sys.stderr)
+            return []
+        transcript_cache.put(key, courses)
+    return list(courses)
 
 
 @api_bp.route('/parse-transcript', methods=['POST'])
@@ -115,16 +253,11 @@ def parse_transcript():
         if not file or file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        temp_dir = tempfile.gettempdir()
-        # Safe handling of filename
-        fname = secure_filename(file.filename or "temp.pdf")
-        temp_path = os.path.join(temp_dir, fname)
-        file.save(temp_path)
-        
-        courses = extract_all_courses(temp_path)
-        
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # Opt-in background parsing: answer with a job id now, poll GET /parse-transcript/<id>
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            return start_parse_job(file)
+
+        courses = courses_from_upload(file)
         
         return jsonify({'success': True, 'courses': courses}), 200
         
@@ -133,12 +266,34 @@ def parse_transcript():
         return jsonify({'error': str(e)}), 500
 
 
-@api_bp.route('/recommendations', methods=['POST'])
+def start_parse_job(file: FileStorage):
+    data = file.read()
+    key = hashlib.sha256(data).hexdigest()
+    cached = transcript_cache.get(key)
+    try:
+        job = transcript_jobs.submit(data, key, None if cached is MISSING else list(cached))
+    except transcript_jobs.QueueFull:
+        return jsonify({'error': 'Transcript parser is busy, try again shortly'}), 503, {'Retry-After': '5'}
+    job['statusUrl'] = url_for('api.get_parse_transcript_job', job_id=job['jobId'])
+    return jsonify(job), 200 if job['status'] == 'done' else 202
+
+
+@api_bp.route('/parse-transcript/<job_id>', methods=['GET'])
+def get_parse_transcript_job(job_id):
+    job = transcript_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job id'}), 404
+    return jsonify(job), 200
+
+
+@api_bp.route('/recommendations', methods=['GET', 'POST'])
 def get_recommendations():
+    # GET takes the same fields as query parameters (no transcript upload);
+    # its responses can be revalidated with If-None-Match (see app/responses.py)
     print("\n=== RECOMMENDATIONS ROUTE CALLED ===", file=sys.stderr)
     
     try:
-        department = request.form.get('department')
+        department = request.values.get('department')
         if not department:
             return jsonify({'error': 'Department required'}), 400
 
@@ -146,7 +301,7 @@ def get_recommendations():
         completed_courses = []
         
         # Safe .get() with default string '[]' fixes the red line risk
-        raw_courses = request.form.get('completed_courses', '[]')
+        raw_courses = request.values.get('completed_courses', '[]')
         
         try:
             if raw_courses and raw_courses != 'undefined':
@@ -158,109 +313,159 @@ def get_recommendations():
         if not completed_courses and 'transcript' in request.files:
             file: FileStorage = request.files['transcript']
             if file and file.filename:
-                temp_dir = tempfile.gettempdir()
-                fname = secure_filename(file.filename)
-                temp_path = os.path.join(temp_dir, fname)
-                file.save(temp_path)
-                completed_courses = extract_all_courses(temp_path)
-                if os.path.exists(temp_path): os.remove(temp_path)
+                completed_courses = courses_from_upload(file)
 
         # 2. GET PREFERENCES
         user_prefs = {}
         try:
-            raw_prefs = request.form.get('preferences', '{}')
+            raw_prefs = request.values.get('preferences', '{}')
             user_prefs = json.loads(raw_prefs)
         except:
             pass
+        if not isinstance(user_prefs, dict):
+            # e.g. '[1]' or 'null': treated like no preferences, same as unparseable JSON
+            user_prefs = {}
 
-        # 3. LOGIC ENGINE
-        all_courses = get_department_courses(department)
-        eligible = filter_eligible_courses_unique(all_courses, completed_courses)
-        
-        result = []
-        for code, course in eligible.items():
-            offerings = get_professor_offerings_for_course(code)
-            
-            professors_list = []
-            seen = set()
-            
-            for offer in offerings:
-                for prof_name in offer['instructors']:
-                    
-                    # CLEANUP: Skip "Staff" or "TBA" placeholders
-                    if not prof_name or prof_name.lower() in ['staff', 'tba', 'unknown']:
-                        continue
+        # 3. LOGIC ENGINE (both stages cached; see app/cache.py)
+        invalidate_if_data_changed()
+        stage_key = history_key(department, completed_courses)
 
-                    if prof_name not in seen:
-                        seen.add(prof_name)
-                        
-                        try:
-                            # --- ROBUST NAME MATCHING ---
-                            db_prof = Professor.query.filter(Professor.name.ilike(prof_name)).first()
-                            
-                            # Swap Check: "Smith, John" -> "John Smith"
-                            if not db_prof and ',' in prof_name:
-                                parts = prof_name.split(',')
-                                if len(parts) >= 2:
-                                    swapped = f"{parts[1].strip()} {parts[0].strip()}"
-                                    db_prof = Professor.query.filter(Professor.name.ilike(swapped)).first()
-                            
-                            # Fuzzy Last Name Check
-                            if not db_prof:
-                                parts = prof_name.replace(',', '').split()
-                                if len(parts) > 0:
-                                    last_name = parts[0] if ',' in prof_name else parts[-1]
-                                    db_prof = Professor.query.filter(Professor.name.ilike(f"%{last_name}%")).first()
-
-                            # CALCULATE SCORE
-                            match_score = calculate_match_score(db_prof, user_prefs)
-                            
-                            # GET DATA (Safe defaults)
-                            final_rating = 0.0
-                            if db_prof and db_prof.rating is not None: 
-                                try: final_rating = float(db_prof.rating)
-                                except: final_rating = 0.0
-                            else:
-                                try: final_rating = round(float(offer.get('course_gpa', 0) or 0), 1)
-                                except: final_rating = 0.0
-                            
-                            final_tags = []
-                            if db_prof and db_prof.tags:
-                                final_tags = str(db_prof.tags).split(',')
-
-                            final_difficulty = "Moderate"
-                            if db_prof and db_prof.difficulty:
-                                try:
-                                    diff_val = float(db_prof.difficulty)
-                                    if diff_val < 2.5: final_difficulty = "Easy"
-                                    elif diff_val > 3.8: final_difficulty = "Hard"
-                                except: pass
-
-                            professors_list.append({
-                                'id': str(len(professors_list)),
-                                'name': prof_name,
-                                'rating': final_rating,
-                                'difficulty': final_difficulty,
-                                'matchScore': match_score,
-                                'schedule': f"{offer.get('year','')} {offer.get('semester','')}".strip(),
-                                'tags': final_tags,
-                                'reviewCount': 0, 'classSize': 'Unknown', 'assessmentType': 'Unknown', 'attendance': 'Unknown'
-                            })
-                        except Exception as inner_e:
-                            print(f"Skipping prof {prof_name}: {inner_e}", file=sys.stderr)
-                            continue
-            
-            # Sort by Match Score (Highest First)
-            professors_list.sort(key=lambda x: x['matchScore'], reverse=True)
-            
-            result.append({
-                'courseCode': code, 
-                'courseName': course['Course_Name'], 
-                'professors': professors_list
-            })
+        stage = eligibility_cache.get(stage_key)
+        if stage is MISSING:
+            stage = eligible_courses_with_offerings(department, completed_courses)
+            eligibility_cache.put(stage_key, stage)
+        eligible, offerings_by_code = stage
+
+        result_key = (stage_key, prefs_key(user_prefs))
+        result = result_cache.get(result_key)
+
+        # Opt-in NDJSON: one line per course, sent as soon as it is scored
+        if wants_ndjson():
+            if result is not MISSING:
+                return ndjson_response(result)
+            return ndjson_response(
+                iter_recommendations(eligible, offerings_by_code, user_prefs),
+                on_complete=lambda records: result_cache.put(result_key, records),
+            )
+
+        if result is MISSING:
+            result = build_recommendations(eligible, offerings_by_code, user_prefs)
+            result_cache.put(result_key, result)
         
-        return jsonify({'success': True, 'recommendations': result}), 200
+        with metrics.stage("serialize"):
+            response = jsonify({'success': True, 'recommendations': result})
+        return response, 200
         
     except Exception as e:
         traceback.print_exc(file=sys.stderr)
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/recommendations/batch', methods=['POST'])
+def get_batch_recommendations():
+    """
+    Recommendations for a whole cohort in one call. JSON body:
+        {"department": "CE",
+         "entries": [{"id": "s1", "completed_courses": [...], "preferences": {...}}, ...]}
+
+    The catalog, offerings and professor data are loaded once; identical
+    course histories share one eligibility/offerings computation, and
+    identical preference dicts share one scoring pass.
+    """
+    print("\n=== BATCH RECOMMENDATIONS ROUTE CALLED ===", file=sys.stderr)
+
+    try:
+        body = request.get_json(silent=True) or {}
+        department = body.get('department')
+        entries = body.get('entries')
+        if not department:
+            return jsonify({'error': 'Department required'}), 400
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'error': 'entries must be a non-empty list'}), 400
+        if len(entries) > current_app.config['BATCH_MAX_ENTRIES']:
+            return jsonify({'error': f"At most {current_app.config['BATCH_MAX_ENTRIES']} entries per batch"}), 400
+
+        parsed = []
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                return jsonify({'error': f'entries[{i}] must be an object'}), 400
+            completed = entry.get('completed_courses') or []
+            prefs = entry.get('preferences') or {}
+            if not isinstance(completed, list) or not isinstance(prefs, dict):
+                return jsonify({'error': f'entries[{i}] has invalid completed_courses/preferences'}), 400
+            parsed.append((entry.get('id', i), completed, prefs))
+
+        invalidate_if_data_changed()
+
+        # 1. Deduplicate course histories; compute eligibility once per distinct history
+        with metrics.stage("catalog"):
+            graph = get_catalog_graph(department)
+        stages = {}
+        pending = {}
+        for _, completed, _ in parsed:
+            key = history_key(department, completed)
+            if key in stages or key in pending:
+                continue
+            stage = eligibility_cache.get(key)
+            if stage is MISSING:
+                with metrics.stage("eligibility"):
+                    pending[key] = graph.eligible_courses(completed)
+            else:
+                stages[key] = stage
+
+        # 2. One offerings query for every course eligible in any pending history
+        if pending:
+            all_codes = {code for eligible in pending.values() for code in eligible}
+            with metrics.stage("offerings"):
+                offerings = get_offerings_for_courses(all_codes)
+            for key, eligible in pending.items():
+                stage = (eligible, {code: offerings[code] for code in eligible})
+                eligibility_cache.put(key, stage)
+                stages[key] = stage
+
+        # 3. Resolve every instructor of the cohort once; score once per distinct preference dict
+        prof_matches = None
+        prof_scores = {}
+        templates = {}
+        built = {}  # (history, preferences) -> result, for repeats within this batch
+        results = []
+        for entry_id, completed, prefs in parsed:
+            key = history_key(department, completed)
+            result_key = (key, prefs_key(prefs))
+            result = built.get(result_key, MISSING)
+            if result is MISSING:
+                result = result_cache.get(result_key)
+            if result is MISSING:
+                if prof_matches is None:
+                    names = [n for _, offerings_by_code in stages.values() for n in instructor_names(offerings_by_code)]
+                    with metrics.stage("professor_match"):
+                        prof_matches = resolve_professors(names)
+                if result_key[1] not in prof_scores:
+                    with metrics.stage("scoring"):
+                        prof_scores[result_key[1]] = score_matches(prof_matches, prefs)
+                with metrics.stage("assemble"):
+                    if key not in templates:
+                        eligible, offerings_by_code = stages[key]
+                        templates[key] = course_templates(eligible, offerings_by_code, prof_matches)
+                    result = apply_scores(templates[key], prof_scores[result_key[1]])
+                result_cache.put(result_key, result)
+            built[result_key] = result
+            results.append({'id': entry_id, 'recommendations': result})
+
+        with metrics.stage("serialize"):
+            response = jsonify({
+                'success': True,
+                'department': department,
+                'uniqueHistories': len(stages),
+                'results': results,
+            })
+        return response, 200
+
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(cache_stats()), 200
@@ -0,0 +1,158 @@
+"""
+Vectorized professor scoring.
+
+calculate_match_score() used to lowercase each professor's tag string and run
+a few dozen substring checks per (professor, course) pair. Here every
+professor is encoded once into (rating, difficulty, tag bitmask) and a
+FeatureTable scores all of them for a preference dict in one NumPy pass.
+
+The arithmetic is applied in the same order as the original function and
+the final round(score, 1) is Python's, so scores are identical.
+"""
+import numpy as np
+
+# Every tag phrase the scoring rules look for; bit i <-> TAG_PHRASES[i]
+TAG_PHRASES = [
+    'extra credit',
+    'easy grader', 'clear grading', 'graded by few things',
+    'tough grader', 'hard grader',
+    'caring', 'respected', 'inspirational', 'accessible', 'good feedback',
+    'amazing lectures', 'lecture heavy',
+    'group projects',
+    'test heavy', 'tests are tough',
+    'lots of homework', 'so many papers',
+    'attendance mandatory', 'skip class',
+    'pop quizzes',
+]
+TAG_BITS = {phrase: 1 << i for i, phrase in enumerate(TAG_PHRASES)}
+
+
+def _bits(*phrases):
+    mask = 0
+    for phrase in phrases:
+        mask |= TAG_BITS[phrase]
+    return mask
+
+
+EXTRA_CREDIT = _bits('extra credit')
+EASY_GRADING = _bits('easy grader', 'clear grading', 'graded by few things')
+HARD_GRADING = _bits('tough grader', 'hard grader')
+GOOD_TEACHING = _bits('caring', 'respected', 'inspirational', 'accessible', 'good feedback')
+AMAZING_LECTURES = _bits('amazing lectures')
+LECTURE_HEAVY = _bits('lecture heavy')
+GROUP_PROJECTS = _bits('group projects')
+TEST_HEAVY = _bits('test heavy', 'tests are tough')
+HOMEWORK_HEAVY = _bits('lots of homework', 'so many papers')
+ATTENDANCE = _bits('attendance mandatory', 'skip class')
+POP_QUIZZES = _bits('pop quizzes')
+
+
+def as_float(value, default=None):
+    """
+    A rating column as a float, or default. After `flask db upgrade` (migration
+    3f1c2a9d7b10) they are REAL or NULL already; this fallback is for a
+    professors.db that hasn't been migrated, where they are TEXT like "N/A".
+    """
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def encode_professor(professor_obj):
+    """(rating, difficulty, tag bitmask) with the same defaults calculate_match_score used."""
+    rating = as_float(professor_obj.rating, 2.5) if professor_obj.rating else 2.5
+    difficulty = as_float(professor_obj.difficulty, 3.0) if professor_obj.difficulty else 3.0
+
+    try:
+        tags_str = str(professor_obj.tags).lower() if professor_obj.tags else ""
+    except:
+        tags_str = ""
+
+    mask = 0
+    for phrase, bit in TAG_BITS.items():
+        if phrase in tags_str:
+            mask |= bit
+    return rating, difficulty, mask
+
+
+class FeatureTable:
+    """Column arrays for a list of professors (None entries always score 0.0)."""
+
+    def __init__(self, professors):
+        professors = list(professors)
+        n = len(professors)
+        self.rating = np.full(n, 2.5)
+        self.difficulty = np.full(n, 3.0)
+        self.tags = np.zeros(n, dtype=np.uint32)
+        self.present = np.zeros(n, dtype=bool)
+        for i, prof in enumerate(professors):
+            if not prof:
+                continue
+            self.rating[i], self.difficulty[i], self.tags[i] = encode_professor(prof)
+            self.present[i] = True
+
+    def __len__(self):
+        return len(self.present)
+
+    def _has(self, mask, rows):
+        tags = self.tags if rows is None else self.tags[rows]
+        return (tags & np.uint32(mask)) != 0
+
+    def score(self, user_prefs, rows=None):
+        """
+        Match scores for every professor (or for `rows`, an index array into
+        this table), as a list of Python floats rounded to one decimal.
+        """
+        pick = (lambda a: a) if rows is None else (lambda a: a[rows])
+        has = lambda mask: self._has(mask, rows)
+        score = pick(self.rating).copy()
+        difficulty = pick(self.difficulty)
+
+        # A. EASY GRADER LOGIC
+        if user_prefs.get('extraCredit'):
+            score += np.where(has(EXTRA_CREDIT), 1.0, 0.0)
+
+        if user_prefs.get('easyGrader') or user_prefs.get('clearGrading'):
+            score += (5.0 - difficulty) * 0.5
+            score += np.where(has(EASY_GRADING), 1.0, 0.0)
+            score -= np.where(has(HARD_GRADING), 1.5, 0.0)
+
+        # B. TEACHING QUALITY
+        if user_prefs.get('caring') or user_prefs.get('goodFeedback'):
+            score += np.where(has(GOOD_TEACHING), 1.2, 0.0)
+
+        # C. LEARNING STYLE
+        if user_prefs.get('lectureHeavy'):
+            amazing = has(AMAZING_LECTURES)
+            score += np.where(amazing, 1.5, 0.0)
+            score += np.where(~amazing & has(LECTURE_HEAVY), 0.5, 0.0)
+
+        if user_prefs.get('groupProjects'):
+            score += np.where(has(GROUP_PROJECTS), 1.0, 0.0)
+        else:
+            score -= np.where(has(GROUP_PROJECTS), 0.5, 0.0)
+
+        # D. "DEAL BREAKERS"
+        if not user_prefs.get('testHeavy'):
+            score -= np.where(has(TEST_HEAVY), 1.5, 0.0)
+
+        if not user_prefs.get('homeworkHeavy'):
+            score -= np.where(has(HOMEWORK_HEAVY), 1.0, 0.0)
+
+        if not user_prefs.get('strictAttendance'):
+            score -= np.where(has(ATTENDANCE), 1.0, 0.0)
+
+        if not user_prefs.get('popQuizzes'):
+            score -= np.where(has(POP_QUIZZES), 2.0, 0.0)
+
+        # Python's round() (correctly rounded), not np.round, to match the old scores exactly
+        present = pick(self.present).tolist()
+        return [round(s, 1) if ok else 0.0 for s, ok in zip(score.tolist(), present)]
+
+
+def score_professors(professors, user_prefs):
+    """Scores a list of professors (None allowed) for one preference dict."""
+    return FeatureTable(professors).score(user_prefs)
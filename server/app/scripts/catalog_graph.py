@@ -0,0 +1,179 @@
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from .db_access import CATALOG, data_version
+from .recommendation_engine import get_department_courses, normalize_code
+from .requisites import codes as requisite_tree_codes, parse_requisites, to_dnf
+from .snapshot import get_snapshot
+
+
+class CatalogGraph:
+    """
+    Compiled prerequisite graph for one department catalog.
+
+    Every course code (including prereqs from other departments that are not
+    in the table) gets an integer id. Requisite expressions (see requisites.py)
+    are compiled to OR-of-AND clauses with each AND as an int bitmask, so
+    checking a requirement against a transcript is `mask & ~done == 0` for
+    any one clause; a plain comma-joined list is a single clause.
+
+    eligible_courses() returns exactly what filter_eligible_courses_unique()
+    returns for the same rows, in the same order.
+    """
+
+    def __init__(self, all_courses: List[dict]):
+        self.ids: Dict[str, int] = {}
+        self.codes: List[str] = []
+
+        # course_map semantics: the last row for a normalized code wins
+        course_map: Dict[str, dict] = {}
+        for course in all_courses:
+            course_map[normalize_code(course['Course_Num'])] = course
+        self.course_map = course_map
+
+        # --- Per-code data (used when a course is looked up as a co-requisite) ---
+        # Prereq clauses as masks: met when any one mask is fully completed
+        self.prereq_masks: Dict[int, Tuple[int, ...]] = {}
+        for code, course in course_map.items():
+            cid = self._id(code)
+            clauses = to_dnf(parse_requisites(course.get('Pre_Requisites')))
+            self.prereq_masks[cid] = tuple(self._mask(clause) for clause in clauses)
+
+        # --- Per-row data (used when walking the catalog in table order) ---
+        # Each row: (code_id, course, clauses, ordered_coreq_ids); the row is met when any clause is.
+        # Each clause: (required_mask, catalog_coreq_ids), from one prereq clause x one coreq clause
+        #   required_mask     -> prereqs + coreqs that are not in this catalog (must be completed)
+        #   catalog_coreq_ids -> coreqs in this catalog (completed OR their own prereqs met)
+        self.rows = []
+        for course in all_courses:
+            cid = self._id(normalize_code(course['Course_Num']))
+            prereqs = to_dnf(parse_requisites(course.get('Pre_Requisites')))
+            coreq_tree = parse_requisites(course.get('Co_Requisites'))
+            coreqs = to_dnf(coreq_tree)
+
+            clauses = []
+            for pre_clause in prereqs:
+                pre_mask = self._mask(pre_clause)
+                for co_clause in coreqs:
+                    required = pre_mask
+                    in_catalog = []
+                    for code in co_clause:
+                        if code in course_map:
+                            in_catalog.append(self._id(code))
+                        else:
+                            required |= 1 << self._id(code)
+                    clauses.append((required, tuple(dict.fromkeys(in_catalog))))
+
+            self.rows.append((
+                cid,
+                course,
+                tuple(clauses),
+                tuple(self._id(c) for c in requisite_tree_codes(coreq_tree) if c in course_map),
+            ))
+
+        # Co-requisites are checked against the row course_map picked (the last one)
+        self.row_by_id = {row[0]: row for row in self.rows}
+
+    def _id(self, code: str) -> int:
+        cid = self.ids.get(code)
+        if cid is None:
+            cid = len(self.codes)
+            self.ids[code] = cid
+            self.codes.append(code)
+        return cid
+
+    def _mask(self, codes: Iterable[str]) -> int:
+        mask = 0
+        for code in codes:
+            mask |= 1 << self._id(code)
+        return mask
+
+    def completed_ids(self, completed_courses: Iterable[str]) -> List[int]:
+        """Ids of the completed courses this catalog knows about (others can't affect eligibility)."""
+        ids = self.ids
+        found = (ids.get(normalize_code(c)) for c in completed_courses)
+        return [cid for cid in found if cid is not None]
+
+    def completed_mask(self, completed_courses: Iterable[str]) -> int:
+        """Bitmask of the completed courses this catalog knows about."""
+        mask = 0
+        for cid in self.completed_ids(completed_courses):
+            mask |= 1 << cid
+        return mask
+
+    def _row_eligible(self, clauses, done_flags, missing) -> bool:
+        prereq_masks = self.prereq_masks
+        for required, coreq_ids in clauses:
+            if required & missing:
+                continue
+            for cid in coreq_ids:
+                if done_flags[cid]:
+                    continue
+                for mask in prereq_masks[cid]:
+                    if not mask & missing:
+                        break
+                else:
+                    break  # this co-requisite can't be taken yet
+            else:
+                return True
+        return False
+
+    def eligible_courses(self, completed_courses: Iterable[str]) -> Dict[str, dict]:
+        """
+        Drop-in replacement for filter_eligible_courses_unique(all_courses, completed_courses).
+        """
+        codes = self.codes
+        eligible = dict()
+
+        # Single-bit membership tests on wide ints cost O(catalog size), so
+        # per-id flags are kept in bytearrays: completed, and completed-or-eligible.
+        done = 0
+        done_flags = bytearray(len(codes))
+        for cid in self.completed_ids(completed_courses):
+            done |= 1 << cid
+            done_flags[cid] = 1
+        missing = ~done
+        taken = bytearray(done_flags)
+
+        for cid, course, clauses, ordered_coreqs in self.rows:
+            if taken[cid]:
+                continue
+            if not self._row_eligible(clauses, done_flags, missing):
+                continue
+            eligible[codes[cid]] = course
+            taken[cid] = 1
+            for co_id in ordered_coreqs:
+                if taken[co_id]:
+                    continue
+                if self._row_eligible(self.row_by_id[co_id][2], done_flags, missing):
+                    eligible[codes[co_id]] = self.course_map[codes[co_id]]
+                    taken[co_id] = 1
+        return eligible
+
+# --- Compiled graphs, one per (department, catalog version) ---
+_graph_cache: Dict[str, Tuple[tuple, CatalogGraph]] = {}
+_graph_lock = threading.Lock()
+
+
+def catalog_version():
+    """Identifies the current catalog contents (changes whenever the scraper rewrites classes.db)."""
+    snap = get_snapshot()
+    if snap is not None:
+        return ('snapshot', snap.version)
+    return data_version(CATALOG)
+
+
+def get_catalog_graph(department) -> CatalogGraph:
+    """
+    Returns the compiled graph for a department, rebuilding it only when
+    classes.db has changed since the last build.
+    """
+    version = catalog_version()
+    cached = _graph_cache.get(department)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    graph = CatalogGraph(get_department_courses(department))
+    with _graph_lock:
+        _graph_cache[department] = (version, graph)
+    return graph
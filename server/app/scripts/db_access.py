@@ -0,0 +1,237 @@
+"""
+Shared read access to the catalog (classes.db) and grades (grades.sqlite)
+databases, through pooled SQLAlchemy engines.
+
+Both are named databases ("catalog", "grades"). By default they are the
+SQLite files under DATA_DIR; CATALOG_DATABASE_URL / GRADES_DATABASE_URL point
+them at a server database instead (e.g. Postgres, so scaled-out instances
+share one copy of the data instead of each shipping its own files).
+
+- inside the app they are Flask-SQLAlchemy binds (create_app registers
+  database_binds()), so they share the app's engine setup; only the ones in
+  MIGRATED_BINDS are under `flask db` migrations (grades.sqlite is rebuilt
+  by the offerings index / instructor map scripts, nothing migrates it);
+  scripts and benchmarks without an app context get one engine per process
+  built from the same options
+- pool size, overflow, pre-ping and recycle come from Config
+- engines are disposed after a fork (gunicorn --preload) and when a SQLite
+  file on disk was replaced (the scraper rebuilding classes.db), so no
+  connection points at an inherited socket or an old file
+- SQLite connections are read-only (mode=ro URI + query_only), with the same
+  mmap / page-cache pragmas as before, and sqlite3's per-connection
+  statement cache keeps queries prepared; `flask db upgrade` writes through
+  its own engine (migration_engine), never through the request pool
+"""
+import functools
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+import sqlalchemy as sa
+from flask import has_app_context
+
+from ..config import Config
+from ..extensions import db
+
+CATALOG = 'catalog'
+GRADES = 'grades'
+MIGRATED_BINDS = (CATALOG,)  # binds with revisions in migrations/versions (besides professors.db)
+
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(16 * 1024)))
+STATEMENT_CACHE = 256
+
+# Server databases have no cheap "last modified": cached catalogs/indexes built from them are rebuilt this often
+REFRESH_SECONDS = 300
+
+_standalone = {}                        # name -> engine, when there is no app context
+_state = weakref.WeakKeyDictionary()    # engine -> {'name', 'pid', 'inode', 'opened', 'checkouts', 'reopened'}
+_tables = {}                            # name -> (data_version, table names)
+_lock = threading.Lock()
+
+
+def database_url(name):
+    """URL of a named database: its *_DATABASE_URL setting, or the SQLite file under DATA_DIR."""
+    # Imported here: recommendation_engine imports this module
+    from .recommendation_engine import get_classes_db_path, get_grades_db_path
+    if name == CATALOG:
+        return Config.CATALOG_DATABASE_URL or f"sqlite:///{get_classes_db_path()}"
+    if name == GRADES:
+        return Config.GRADES_DATABASE_URL or f"sqlite:///{get_grades_db_path()}"
+    raise KeyError(name)
+
+
+@functools.lru_cache(maxsize=None)
+def sqlite_path(name):
+    """File behind a named database, or None when it isn't a SQLite file (checked on every query, so cached)."""
+    url = sa.engine.make_url(database_url(name))
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return os.path.abspath(url.database)
+
+
+def _sqlite_creator(path, read_only=True):
+    def connect():
+        # check_same_thread off: the pool hands a connection to one thread at a time
+        if read_only:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE)
+        else:
+            conn = sqlite3.connect(path, check_same_thread=False, cached_statements=STATEMENT_CACHE)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+    return connect
+
+
+def pool_options(url):
+    """Pool arguments from Config for an engine on url."""
+    url = sa.engine.make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}  # one static connection (Flask-SQLAlchemy's default), nothing to size
+        return {'pool_size': Config.DB_POOL_SIZE, 'max_overflow': Config.DB_MAX_OVERFLOW,
+                'pool_recycle': Config.DB_POOL_RECYCLE}
+    # A local file can't drop the connection; a server (or a proxy in front of it) can
+    return {'pool_size': Config.DB_POOL_SIZE, 'max_overflow': Config.DB_MAX_OVERFLOW,
+            'pool_recycle': Config.DB_POOL_RECYCLE, 'pool_pre_ping': Config.DB_POOL_PRE_PING}
+
+
+def engine_options(name):
+    """create_engine() arguments (including 'url') for a named database."""
+    url = database_url(name)
+    options = dict(pool_options(url), url=url)
+    path = sqlite_path(name)
+    if path is not None:
+        options['creator'] = _sqlite_creator(path)
+    return options
+
+
+def database_binds():
+    """SQLALCHEMY_BINDS entries for the catalog and grades databases."""
+    return {name: engine_options(name) for name in (CATALOG, GRADES)}
+
+
+def migration_engine(name):
+    """Writable, unpooled engine on a named database, for `flask db upgrade` (migrations/env.py)."""
+    url = database_url(name)
+    path = sqlite_path(name)
+    if path is None:
+        return sa.create_engine(url, poolclass=sa.pool.NullPool)
+    return sa.create_engine(url, poolclass=sa.pool.NullPool, creator=_sqlite_creator(path, read_only=False))
+
+
+def _track(name, engine):
+    state = _state.get(engine)
+    if state is not None:
+        return state
+    with _lock:
+        state = _state.get(engine)
+        if state is None:
+            state = {'name': name, 'pid': os.getpid(), 'inode': None, 'opened': 0, 'checkouts': 0, 'reopened': 0}
+
+            @sa.event.listens_for(engine, 'connect')
+            def opened(dbapi_conn, record):
+                state['opened'] += 1
+
+            @sa.event.listens_for(engine, 'checkout')
+            def checked_out(dbapi_conn, record, proxy):
+                state['checkouts'] += 1
+
+            _state[engine] = state
+    return state
+
+
+def get_engine(name):
+    """Pooled engine for a named database: the app's bind when in an app context, else a per-process one."""
+    engine = None
+    if has_app_context():
+        engine = db.engines.get(name)
+    if engine is None:
+        engine = _standalone.get(name)
+        if engine is None:
+            with _lock:
+                engine = _standalone.get(name)
+                if engine is None:
+                    options = engine_options(name)
+                    engine = _standalone[name] = sa.create_engine(options.pop('url'), **options)
+
+    state = _track(name, engine)
+    pid = os.getpid()
+    if state['pid'] != pid:
+        # Freshly forked worker: never use a connection inherited from the parent process
+        engine.dispose(close=False)
+        state['pid'] = pid
+
+    path = sqlite_path(name)
+    if path is not None:
+        # Checked before connecting: SQLite would silently create an empty file
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Database file not found at {path}")
+        inode = os.stat(path).st_ino
+        if state['inode'] not in (None, inode):
+            # File was replaced (not just modified): pooled handles point at the old file
+            engine.dispose()
+            state['reopened'] += 1
+        state['inode'] = inode
+    return engine
+
+
+def query(name, statement, params=None):
+    """Runs one read query (Core statement or text()) on a pooled connection; returns (column names, rows)."""
+    with get_engine(name).connect() as conn:
+        result = conn.execute(statement, params or {})
+        return list(result.keys()), result.fetchall()
+
+
+def table_names(name):
+    """Tables in a named database (SQLite: in creation order, term tables are read in that order); cached per data_version."""
+    version = data_version(name)
+    cached = _tables.get(name)
+    if cached and cached[0] == version:
+        return cached[1]
+    engine = get_engine(name)
+    if engine.dialect.name == 'sqlite':
+        _, rows = query(name, sa.text("SELECT name FROM sqlite_master WHERE type='table' ORDER BY rowid"))
+        names = [row[0] for row in rows if not row[0].startswith('sqlite')]
+    else:
+        names = sa.inspect(engine).get_table_names()
+    _tables[name] = (version, names)
+    return names
+
+
+def data_version(name):
+    """Changes when a named database changes: (mtime, size) of a SQLite file, a time bucket otherwise."""
+    path = sqlite_path(name)
+    if path is None:
+        return int(time.time() // REFRESH_SECONDS)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def close_connections():
+    """Closes every pooled connection (e.g. in the gunicorn master before it forks)."""
+    for engine in list(_state.keys()):
+        engine.dispose()
+
+
+def connection_stats():
+    """{database name: {'opened', 'reused', 'reopened', 'reuse_rate', 'checked_out'}} for this process."""
+    report = {}
+    for engine, state in list(_state.items()):
+        entry = report.setdefault(state['name'], {'opened': 0, 'reused': 0, 'reopened': 0, 'checked_out': 0})
+        entry['opened'] += state['opened']
+        entry['reused'] += max(state['checkouts'] - state['opened'], 0)
+        entry['reopened'] += state['reopened']
+        entry['checked_out'] += getattr(engine.pool, 'checkedout', lambda: 0)()
+    for entry in report.values():
+        total = entry['opened'] + entry['reused']
+        entry['reuse_rate'] = round(entry['reused'] / total, 4) if total else 0.0
+    return report
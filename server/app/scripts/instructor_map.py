@@ -0,0 +1,376 @@
+"""
+Offline instructor -> professor resolution for grades.sqlite.
+
+The request path used to match every instructor name from the grades tables
+to a professors row with three heuristics (full name, "Last, First" swapped,
+then `%lastname%`). The last one picks whichever professor comes first with
+that surname, often the wrong person. This job resolves every distinct
+instructor name once and stores the answer, with a confidence score, in
+grades.sqlite:
+
+    instructor_professor_map(instructor, professor_id, confidence, method)
+    instructor_map_sources(key, value)   -- fingerprint of the professors it was built from
+
+Build (re-run after a new grades term or a professors update):
+    python -m app.scripts.instructor_map [--grades path/to/grades.sqlite]
+
+Matching avoids comparing every instructor with every professor:
+  - blocking: a professor is only a candidate for names whose last name is
+    the same or close (shares enough character trigrams, via a trigram index
+    over the distinct professor last names)
+  - scoring: 0.6 * last-name similarity + 0.4 * first-name similarity
+    (equal, prefix/initial like "Chris"/"Christopher", or trigram similarity)
+  - department: unambiguous exact matches teach which professor departments
+    teach which subjects; that affinity breaks ties between candidates with
+    the same name score. A tie it can't break lowers the confidence.
+
+Department is deliberately not part of the blocking key. A grades row only
+has a subject code (CE, CSE), professors.db has free-text RateMyProfessors
+departments ("Engineering", "computer science and electrical engineering",
+... about 90 of them) and there is no subject -> department table; the
+affinity above is learned from the matches themselves. Blocking on
+(last name, department) would need that mapping before matching, and every
+professor listed under a coarse or unexpected department would never become
+a candidate. The last-name blocks are already small, so the tie-break costs
+little.
+
+A surname-only match scores about 0.76 at most (first name unknown) and
+0.6 or less with a different first name; when several professors share the surname it
+only stands if the departments tell them apart. Below
+INSTRUCTOR_MATCH_MIN_CONFIDENCE the request path treats the name as
+unmatched instead of guessing.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from .db_access import GRADES, data_version, get_engine
+from .recommendation_engine import DERIVED_TABLES, OFFERING_COLUMNS, get_grades_db_path
+
+MAP_TABLES = ('instructor_professor_map', 'instructor_map_sources')
+
+INSTRUCTOR_COLUMNS = ('instructor1', 'instructor2', 'instructor3', 'instructor4', 'instructor5')
+
+# Placeholders the routes skip anyway
+PLACEHOLDERS = ('staff', 'tba', 'unknown')
+
+_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'phd', 'dr', 'md'}
+_NON_LETTERS = re.compile(r"[^a-z\s]+")
+
+# Blocking: other last names are candidates from this trigram similarity on
+MIN_LAST_NAME_SIMILARITY = 0.5
+# Same first and last name but not the same full name (middle names differ) ranks below an exact match
+NON_EXACT_WEIGHT = 0.95
+# Ranking: candidates within this score of the best are a tie
+TIE_MARGIN = 0.02
+# Department affinity needed to break a tie, and the confidence factor for an unbroken one
+AFFINITY_MARGIN = 0.2
+AMBIGUOUS_PENALTY = 0.75
+
+ParsedName = namedtuple('ParsedName', ['full', 'first', 'last'])
+InstructorMap = namedtuple('InstructorMap', ['fingerprint', 'matches'])
+
+
+def parse_name(raw):
+    """
+    "Smith, John A." / "John A. Smith" -> ParsedName('john a smith', 'john', 'smith').
+    Accents, punctuation and suffixes are dropped; `full` keeps middle names
+    and initials so "John A. Smith" and "John Smith" are not an exact match.
+    """
+    text = unicodedata.normalize('NFKD', str(raw)).encode('ascii', 'ignore').decode().lower()
+    text = text.replace("'", '')
+    if ',' in text:
+        last_part, _, first_part = text.partition(',')
+    else:
+        first_part, last_part = '', text
+
+    def words(part):
+        return [w for w in _NON_LETTERS.sub(' ', part).split() if w not in _SUFFIXES]
+
+    first_words, last_words = words(first_part), words(last_part)
+    if not first_words and len(last_words) > 1:
+        # "John A Smith": everything but the last word is the given name(s)
+        first_words, last_words = last_words[:-1], last_words[-1:]
+    if not last_words:
+        return None
+    return ParsedName(' '.join(first_words + last_words), first_words[0] if first_words else '', last_words[-1])
+
+
+@lru_cache(maxsize=None)
+def trigrams(text):
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@lru_cache(maxsize=65536)
+def similarity(a, b):
+    """Jaccard similarity of the two strings' trigram sets."""
+    if a == b:
+        return 1.0
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+def name_score(instructor, professor):
+    """(score in [0, 1], method) for two ParsedNames; only an exact match scores 1.0."""
+    if instructor.full == professor.full:
+        return 1.0, 'exact'
+    last = similarity(instructor.last, professor.last)
+    if not instructor.first or not professor.first:
+        first = 0.5
+    elif instructor.first == professor.first:
+        first = 1.0
+    elif instructor.first.startswith(professor.first) or professor.first.startswith(instructor.first):
+        first = 0.8  # initial, or a short form ("Chris" / "Christopher")
+    else:
+        first = 0.5 * similarity(instructor.first, professor.first)
+    return NON_EXACT_WEIGHT * (0.6 * last + 0.4 * first), ('name' if last == 1.0 else 'fuzzy')
+
+
+def professors_fingerprint(professors):
+    """Identifies a professors table by its (id, name) pairs; stored with the map to detect staleness."""
+    digest = hashlib.sha256()
+    for pid, name in sorted((str(pid), name) for pid, name in professors if name is not None):
+        digest.update(f"{pid}\t{name}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+# --- Build ---
+
+class _ProfessorBlocks:
+    """Professors grouped by last name, plus a trigram index over the distinct last names."""
+
+    def __init__(self, professors):
+        self.professors = professors  # [(id, department, [ParsedName, ...]), ...]
+        self.by_last = defaultdict(set)
+        self.by_full = defaultdict(set)
+        for i, (_, _, names) in enumerate(professors):
+            for parsed in names:
+                self.by_last[parsed.last].add(i)
+                self.by_full[parsed.full].add(i)
+        self.by_trigram = defaultdict(set)
+        for last in self.by_last:
+            for gram in trigrams(last):
+                self.by_trigram[gram].add(last)
+        self._similar = {}
+
+    def similar_last_names(self, last):
+        cached = self._similar.get(last)
+        if cached is None:
+            shared = Counter()
+            grams = trigrams(last)
+            for gram in grams:
+                for other in self.by_trigram.get(gram, ()):
+                    shared[other] += 1
+            cached = self._similar[last] = [
+                other for other, n in shared.items()
+                if n / (len(grams) + len(trigrams(other)) - n) >= MIN_LAST_NAME_SIMILARITY
+            ]
+        return cached
+
+    def candidates(self, parsed):
+        # Nothing else can tie an exact full-name match (see NON_EXACT_WEIGHT)
+        exact = self.by_full.get(parsed.full)
+        if exact:
+            return exact
+        found = set()
+        for last in self.similar_last_names(parsed.last):
+            found |= self.by_last[last]
+        return found
+
+    def best_score(self, parsed, i):
+        return max(name_score(parsed, name) for name in self.professors[i][2])
+
+
+def instructor_subjects(conn):
+    """{instructor name as stored: Counter(subject_id)} over every grades term table."""
+    subjects = defaultdict(Counter)
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY rowid")
+              if not r[0].startswith('sqlite') and r[0] not in DERIVED_TABLES]
+    for tbl in tables:
+        quoted = '"' + tbl.replace('"', '""') + '"'
+        try:
+            conn.execute(f'SELECT {OFFERING_COLUMNS} FROM {quoted} LIMIT 0')
+        except sqlite3.Error:
+            continue  # same rule as the scan: tables without the grade columns are skipped
+        for column in INSTRUCTOR_COLUMNS:
+            rows = conn.execute(f'SELECT subject_id, {column}, COUNT(*) FROM {quoted} '
+                                f'WHERE {column} IS NOT NULL GROUP BY subject_id, {column}').fetchall()
+            for subject, name, n in rows:
+                # Same cleaning as offering_from_row
+                if not str(name).strip() or str(name).strip().lower() == 'none':
+                    continue
+                if str(name).strip().lower() in PLACEHOLDERS:
+                    continue
+                subjects[name][subject] += n
+    return subjects
+
+
+def resolve_instructors(subjects, professors):
+    """
+    subjects: {instructor: Counter(subject_id)}; professors: [(id, name, rmp_name, department), ...].
+    Returns {instructor: (professor_id or None, confidence, method)}.
+    """
+    parsed_professors = []
+    for pid, name, rmp_name, department in professors:
+        names = {parse_name(n) for n in (name, rmp_name) if n}
+        names.discard(None)
+        if names:
+            parsed_professors.append((str(pid), department, list(names)))
+    blocks = _ProfessorBlocks(parsed_professors)
+
+    # Spellings of one name ("SMITH, JOHN", "John Smith") share their candidate scores
+    by_parsed = {}
+    scored = {}
+    for name in subjects:
+        p = parse_name(name)
+        if p is None:
+            continue
+        scores = by_parsed.get(p)
+        if scores is None:
+            scores = by_parsed[p] = [(blocks.best_score(p, i), i) for i in blocks.candidates(p)]
+            # Best first; equal scores in professors table order
+            scores.sort(key=lambda s: (-s[0][0], s[1]))
+        scored[name] = scores
+
+    # Department affinity, learned from unambiguous exact matches: P(department | subject)
+    pairs = defaultdict(Counter)
+    for name, scores in scored.items():
+        exact = [i for (score, method), i in scores if method == 'exact']
+        if len(exact) == 1:
+            department = parsed_professors[exact[0]][1]
+            for subject, n in subjects[name].items():
+                pairs[subject][department] += n
+    affinity_of = {subject: {d: n / sum(c.values()) for d, n in c.items()} for subject, c in pairs.items()}
+
+    def affinity(name, i):
+        department = parsed_professors[i][1]
+        counts = subjects[name]
+        total = sum(counts.values())
+        return sum(n * affinity_of.get(subject, {}).get(department, 0.0) for subject, n in counts.items()) / total
+
+    result = {}
+    for name in subjects:
+        scores = scored.get(name)
+        if not scores:
+            result[name] = (None, 0.0, 'none')
+            continue
+        top = scores[0][0][0]
+        tied = [((score, method), i) for (score, method), i in scores if score >= top - TIE_MARGIN]
+        if len(tied) > 1:
+            ranked = sorted(tied, key=lambda s: affinity(name, s[1]), reverse=True)
+            (score, method), i = ranked[0]
+            if affinity(name, ranked[0][1]) - affinity(name, ranked[1][1]) < AFFINITY_MARGIN:
+                score, method = score * AMBIGUOUS_PENALTY, 'ambiguous'
+        else:
+            (score, method), i = tied[0]
+        result[name] = (parsed_professors[i][0], round(score, 4), method)
+    return result
+
+
+def build_instructor_map(professors, db_path=None):
+    """
+    Resolves every instructor in grades.sqlite against professors
+    [(id, name, rmp_name, department), ...] and (re)writes the map tables.
+    Returns {method: count}.
+    """
+    db_path = db_path or get_grades_db_path()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Grades DB file not found at {db_path}")
+    professors = list(professors)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        matches = resolve_instructors(instructor_subjects(conn), professors)
+        cur = conn.cursor()
+        cur.execute('BEGIN IMMEDIATE')
+        for tbl in MAP_TABLES:
+            cur.execute(f'DROP TABLE IF EXISTS {tbl}')
+        cur.execute("""CREATE TABLE instructor_professor_map(
+                            instructor TEXT PRIMARY KEY,
+                            professor_id TEXT,
+                            confidence REAL NOT NULL,
+                            method TEXT NOT NULL
+                            )""")
+        cur.execute("""CREATE TABLE instructor_map_sources(
+                            key TEXT PRIMARY KEY,
+                            value TEXT
+                            )""")
+        cur.executemany('INSERT INTO instructor_professor_map VALUES (?, ?, ?, ?)',
+                        [(name, pid, conf, method) for name, (pid, conf, method) in matches.items()])
+        cur.executemany('INSERT INTO instructor_map_sources VALUES (?, ?)', [
+            ('professors', professors_fingerprint((p[0], p[1]) for p in professors)),
+            ('built_at', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return Counter(method for _, _, method in matches.values())
+
+
+# --- Request path: the stored map, reloaded when grades.sqlite changes ---
+_maps = {}
+_maps_lock = threading.Lock()
+
+
+def load_instructor_map():
+    """InstructorMap(fingerprint, {instructor: (professor_id, confidence)}), or None when it hasn't been built."""
+    version = data_version(GRADES)
+    if version is None:
+        return None
+    cached = _maps.get(GRADES)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    sources = sa.table('instructor_map_sources', sa.column('key'), sa.column('value'))
+    mapping = sa.table('instructor_professor_map', sa.column('instructor'), sa.column('professor_id'), sa.column('confidence'))
+    with get_engine(GRADES).connect() as conn:
+        try:
+            row = conn.execute(sa.select(sources.c.value).where(sources.c.key == 'professors')).first()
+            rows = conn.execute(sa.select(mapping.c.instructor, mapping.c.professor_id, mapping.c.confidence))
+            loaded = InstructorMap(row[0] if row else None, {name: (pid, conf) for name, pid, conf in rows})
+        except sa.exc.DBAPIError:
+            loaded = None
+
+    with _maps_lock:
+        _maps[GRADES] = (version, loaded)
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve grades instructors to professors (instructor_professor_map)")
+    parser.add_argument('--grades', help='grades.sqlite (default: the app data folder)')
+    args = parser.parse_args()
+
+    # Professors come from the app's database (DATABASE_URL), like the server reads them
+    from app import create_app
+    from app.extensions import db
+    from app.models import Professor
+
+    app = create_app()
+    with app.app_context():
+        professors = db.session.query(Professor.id, Professor.name, Professor.rmp_name, Professor.department).all()
+
+    start = time.perf_counter()
+    counts = build_instructor_map(professors, args.grades)
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{method}: {n}" for method, n in counts.most_common())
+    print(f"Resolved {sum(counts.values())} instructors against {len(professors)} professors "
+          f"in {elapsed:.2f} s ({summary})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Materialized offerings index for grades.sqlite.
+
+grades.sqlite has one table per term. get_professor_offerings_for_course()
+scans every one of them for every course, so a request costs
+(#eligible courses x #term tables) queries. The build step below merges all
+term tables into a single `offerings` table indexed on
+(subject_id, course_number), and get_offerings_for_courses() answers a whole
+request with one query.
+
+Build (re-run after adding a new term table):
+    python -m app.scripts.offerings_index [path/to/grades.sqlite]
+
+Until the index is built (or when it is stale) the bulk API falls back to the
+per-table scan, so results never silently go missing; a warning is logged
+once per grades data version.
+
+The build writes a SQLite file; the lookups go through the pooled "grades"
+engine (scripts/db_access.py), so they also work against a server database
+holding the same tables.
+"""
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+import sqlalchemy as sa
+
+from .db_access import GRADES, data_version, get_engine, table_names
+from .snapshot import get_snapshot
+from .recommendation_engine import (
+    DERIVED_TABLES,
+    INDEX_TABLES,
+    OFFERING_COLUMNS,
+    get_grades_db_path,
+    get_professor_offerings_for_course,
+    offering_from_row,
+    term_table,
+)
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default variable limit is 999 on older builds; up to 2 per course code
+_CHUNK = 400
+
+offerings_sources = sa.table('offerings_sources', sa.column('table_name'), sa.column('row_count'))
+
+
+@lru_cache(maxsize=64)
+def _offerings_select(n_subjects):
+    """
+    Offerings of n_subjects subjects' course numbers, oldest first (binds subj0, nums0, subj1, nums1, ...).
+    One (subject_id = ? AND course_number IN (...)) per subject: SQLite probes idx_offerings_course
+    once per code (a row-value IN scans the whole index). Built once per n_subjects.
+    """
+    offerings = term_table('offerings')
+    return (sa.select(*offerings.c)
+            .where(sa.or_(*(sa.and_(offerings.c.subject_id == sa.bindparam(f'subj{k}'),
+                                    offerings.c.course_number.in_(sa.bindparam(f'nums{k}', expanding=True)))
+                            for k in range(n_subjects))))
+            .order_by(sa.column('id')))
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _term_tables(cur):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY rowid;")
+    return [row[0] for row in cur.fetchall() if not row[0].startswith('sqlite') and row[0] not in DERIVED_TABLES]
+
+
+def _row_counts(cur, tables):
+    counts = {}
+    for tbl in tables:
+        try:
+            cur.execute(f'SELECT COUNT(*) FROM {_quote(tbl)}')
+            counts[tbl] = cur.fetchone()[0]
+        except sqlite3.Error:
+            continue
+    return counts
+
+
+def build_offerings_index(db_path=None):
+    """
+    (Re)creates the `offerings` table from every term table, in the same
+    table/row order the per-table scan returns. Returns the number of rows.
+    """
+    db_path = db_path or get_grades_db_path()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Grades DB file not found at {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute('BEGIN IMMEDIATE')
+        for tbl in INDEX_TABLES:
+            cur.execute(f'DROP TABLE IF EXISTS {tbl}')
+
+        # course_number is stored as TEXT so lookups with '1426' hit the index
+        # regardless of how each term table declared it.
+        cur.execute("""CREATE TABLE offerings(
+                            id INTEGER PRIMARY KEY,
+                            subject_id TEXT,
+                            course_number TEXT,
+                            course_title,
+                            year,
+                            semester,
+                            instructor1,
+                            instructor2,
+                            instructor3,
+                            instructor4,
+                            instructor5,
+                            course_gpa
+                            )""")
+        cur.execute("""CREATE TABLE offerings_sources(
+                            table_name TEXT PRIMARY KEY,
+                            row_count INTEGER NOT NULL
+                            )""")
+
+        tables = _term_tables(cur)
+        sources = []
+        for tbl in tables:
+            try:
+                cur.execute(f'INSERT INTO offerings ({OFFERING_COLUMNS}) '
+                            f'SELECT {OFFERING_COLUMNS} FROM {_quote(tbl)} ORDER BY rowid')
+            except sqlite3.Error:
+                # Same rule as the scan: tables without the grade columns are skipped
+                continue
+            sources.append(tbl)
+
+        counts = _row_counts(cur, sources)
+        cur.executemany('INSERT INTO offerings_sources (table_name, row_count) VALUES (?, ?)', counts.items())
+        cur.execute('CREATE INDEX idx_offerings_course ON offerings (subject_id, course_number)')
+        cur.execute('SELECT COUNT(*) FROM offerings')
+        total = cur.fetchone()[0]
+        conn.commit()
+        return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# --- Freshness: checked once per grades database version, not per request ---
+_fresh = {}
+_fresh_lock = threading.Lock()
+
+
+def index_is_fresh():
+    """
+    True when the offerings table exists and matches the current term tables
+    (same tables, same row counts).
+    """
+    version = data_version(GRADES)
+    cached = _fresh.get(GRADES)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    tables = [tbl for tbl in table_names(GRADES) if tbl not in DERIVED_TABLES]
+    with get_engine(GRADES).connect() as conn:
+        try:
+            recorded = dict(conn.execute(sa.select(offerings_sources.c.table_name, offerings_sources.c.row_count)).fetchall())
+        except sa.exc.DBAPIError:
+            conn.rollback()
+            recorded = None
+        counts = {}
+        if recorded is not None:
+            for tbl in tables:
+                try:
+                    counts[tbl] = conn.execute(sa.select(sa.func.count()).select_from(sa.table(tbl))).scalar()
+                except sa.exc.DBAPIError:
+                    conn.rollback()
+        fresh = bool(recorded is not None and counts == recorded)
+
+    with _fresh_lock:
+        warn = not fresh and _fresh.get(GRADES, (None,))[0] != version
+        _fresh[GRADES] = (version, fresh)
+    if warn:
+        logger.warning("offerings index missing or stale; scanning term tables until "
+                       "`python -m app.scripts.offerings_index` is run")
+    return fresh
+
+
+def get_offerings_for_courses(course_codes):
+    """
+    Bulk version of get_professor_offerings_for_course().
+    Returns {course_code: [offering, ...]} for every requested code (empty list when never offered).
+    Served from the mmapped snapshot when one is current.
+    """
+    snap = get_snapshot()
+    if snap is not None:
+        return snap.offerings_for(course_codes)
+
+    codes = list(dict.fromkeys(course_codes))
+    result = {code: [] for code in codes}
+
+    if not index_is_fresh():
+        for code in codes:
+            result[code] = get_professor_offerings_for_course(code)
+        return result
+
+    keys = {}
+    for code in codes:
+        subj, num = code.split()
+        keys[(subj, num)] = code
+
+    grouped = defaultdict(list)
+    pairs = list(keys)
+    with get_engine(GRADES).connect() as conn:
+        for i in range(0, len(pairs), _CHUNK):
+            numbers = defaultdict(list)
+            for subj, num in pairs[i:i + _CHUNK]:
+                numbers[subj].append(num)
+            params = {}
+            for k, (subj, nums) in enumerate(numbers.items()):
+                params[f'subj{k}'] = subj
+                params[f'nums{k}'] = nums
+            for row in conn.execute(_offerings_select(len(numbers)), params).fetchall():
+                grouped[(row[0], row[1])].append(offering_from_row(row))
+
+    for key, code in keys.items():
+        result[code] = grouped.get(key, [])
+    return result
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    n = build_offerings_index(path)
+    print(f"Indexed {n} offerings into {path or get_grades_db_path()}")
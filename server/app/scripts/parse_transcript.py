@@ -75,39 +75,145 @@
 # # also if you are a freshman, there might not be any grades attached to the courses
 # # also if the user has no classes, there should be an option called i'm new to UTA and we just send them to select the professor and courses attributes
 
-import pdfplumber
+# pdfplumber (with pdfminer) and pypdfium2 are imported on first use, inside
+# the functions below: together they are about half of the app's import time,
+# and workers that never parse a PDF don't need them.
+import io
+import os
 import re
-from typing import List
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Set, Union
 
-def extract_all_courses(pdf_path: str) -> List[str]:
+SEMESTER_COURSE_PATTERN = re.compile(r'^([A-Z]{2,4}(?:-[A-Z]{2})?)\s(\d{4}).*?\d+\.\d{3}\s+\d+\.\d{3}')
+TRANSFER_TEST_PATTERN = re.compile(
+    r'Transferred to Term \d{4} (?:Summer|Spring|Fall) as\s*\n\s*([A-Z]{3,4}\s\d{4})',
+    re.IGNORECASE
+)
+
+# "fast": pypdfium2 plain-text extraction, falling back to pdfplumber when it finds no courses
+# "pdfplumber": always use pdfplumber's layout-aware extract_text
+EXTRACT_MODE = os.getenv("TRANSCRIPT_EXTRACT_MODE", "fast")
+
+# Transcripts with at least this many pages are split across the process pool
+PARALLEL_MIN_PAGES = int(os.getenv("TRANSCRIPT_PARALLEL_MIN_PAGES", "4"))
+PARSE_WORKERS = int(os.getenv("TRANSCRIPT_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+PdfSource = Union[str, bytes]
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Lazily created per process: a pool inherited through fork (gunicorn --preload) can't be used."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _open(source: PdfSource):
+    import pdfplumber
+
+    # Uploads are parsed straight from memory; nothing touches the disk
+    if isinstance(source, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def courses_in_text(text: str) -> Set[str]:
+    """Course codes on one page of transcript text."""
+    found = set(TRANSFER_TEST_PATTERN.findall(text))
+    for line in text.split('\n'):
+        match = SEMESTER_COURSE_PATTERN.match(line.strip())
+        if match:
+            found.add(f"{match.group(1)} {match.group(2)}")
+    return found
+
+
+def _courses_in_pages(source: PdfSource, start: int, stop: int) -> Set[str]:
+    """Worker task: course codes on pages [start, stop)."""
+    found = set()
+    with _open(source) as pdf:
+        for page in pdf.pages[start:stop]:
+            text = page.extract_text(x_tolerance=2, y_tolerance=3)
+            if text:
+                found |= courses_in_text(text)
+            page.close()
+    return found
+
+
+def _fast_courses(source: PdfSource) -> Set[str]:
     """
-    Parses a UTA Unofficial Civil Engineering Undergrad transcript PDF to find all course codes.
+    Course codes via pdfium's text layer. We only need line text for two
+    regexes, so this skips pdfplumber's character-level layout analysis.
     """
-    semester_course_pattern = re.compile(r'^([A-Z]{2,4}(?:-[A-Z]{2})?)\s(\d{4}).*?\d+\.\d{3}\s+\d+\.\d{3}')
-    transfer_test_pattern = re.compile(
-        r'Transferred to Term \d{4} (?:Summer|Spring|Fall) as\s*\n\s*([A-Z]{3,4}\s\d{4})',
-        re.IGNORECASE
-    )
+    import pypdfium2 as pdfium
 
-    found_courses_set = set()
-    
+    found = set()
+    pdf = pdfium.PdfDocument(source)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text(x_tolerance=2, y_tolerance=3)
-                if not text:
-                    continue
-                
-                for course_code in transfer_test_pattern.findall(text):
-                    found_courses_set.add(course_code)
-                
-                for line in text.split('\n'):
-                    match = semester_course_pattern.match(line.strip())
-                    if match:
-                        found_courses_set.add(f"{match.group(1)} {match.group(2)}")
-                        
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range().replace('\r\n', '\n')
+            textpage.close()
+            page.close()
+            if text:
+                found |= courses_in_text(text)
+    finally:
+        pdf.close()
+    return found
+
+
+def _pdfplumber_courses(source: PdfSource, parallel: bool = True) -> List[str]:
+    with _open(source) as pdf:
+        n_pages = len(pdf.pages)
+
+    if not parallel or n_pages < PARALLEL_MIN_PAGES or PARSE_WORKERS < 2:
+        return sorted(_courses_in_pages(source, 0, n_pages))
+
+    # Contiguous page ranges, one per worker
+    step = -(-n_pages // PARSE_WORKERS)
+    futures = [
+        _get_pool().submit(_courses_in_pages, source, start, min(start + step, n_pages))
+        for start in range(0, n_pages, step)
+    ]
+    found = set()
+    for future in futures:
+        found |= future.result()
+    return sorted(found)
+
+
+def parse_courses(source: PdfSource, mode: str = None, parallel: bool = True) -> List[str]:
+    """
+    Like extract_all_courses, but raises on unreadable PDFs instead of
+    returning [] (so callers can tell "no courses" from "failed").
+    parallel=False keeps large pdfplumber parses in this process (for callers
+    that already run inside a pool worker).
+    """
+    if (mode or EXTRACT_MODE) == "fast":
+        import pypdfium2 as pdfium
+        try:
+            found = _fast_courses(source)
+        except pdfium.PdfiumError:
+            found = set()
+        if found:
+            return sorted(found)
+    return _pdfplumber_courses(source, parallel)
+
+
+def extract_all_courses(pdf_path: PdfSource) -> List[str]:
+    """
+    Parses a UTA Unofficial Civil Engineering Undergrad transcript PDF to find all course codes.
+    Accepts a file path or the raw PDF bytes.
+    """
+    try:
+        return parse_courses(pdf_path)
     except Exception as e:
         print(f"Error parsing PDF: {e}")
         return []
-
-    return sorted(list(found_courses_set))
\ No newline at end of file
@@ -1,49 +1,82 @@
 import os
-import sqlite3
+import threading
+from functools import lru_cache
+import sqlalchemy as sa
+from ..metrics import timed
+from .db_access import CATALOG, GRADES, get_engine, query, table_names
 from .parse_transcript import extract_all_courses 
+from .records import Course, Offering
+from .requisites import parse_requisites, requisite_codes, requisites_met
 
+# Resolved once at import instead of on every call (DATA_DIR env var points at another data folder)
+DATA_DIR = os.path.abspath(os.getenv("DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../data'))
+CLASSES_DB_PATH = os.path.join(DATA_DIR, 'classes.db')
+GRADES_DB_PATH = os.path.join(DATA_DIR, 'grades.sqlite')
+
+def get_classes_db_path():
+    return CLASSES_DB_PATH
+
+@timed("catalog_load")
 def get_department_courses(department):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.abspath(os.path.join(script_dir, '../../../data/classes.db'))
-    if not os.path.exists(db_path):
-        raise FileNotFoundError(f"Database file not found at {db_path}")
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(f'SELECT * FROM ClassesFor{department}')
-    rows = cur.fetchall()
-    columns = [desc[0] for desc in cur.description]
-    courses = [dict(zip(columns, row)) for row in rows]
-    conn.close()
+    from .snapshot import get_snapshot  # imported here: snapshot imports this module
+    snap = get_snapshot()
+    if snap is not None:
+        courses = snap.department_courses(department)
+        if courses is not None:
+            return courses
+    # Description is only needed for display: fetched for the whole department on first access
+    table = catalog_table(department)
+    _, rows = query(CATALOG, sa.select(table.c.Course_Num, table.c.Course_Name, table.c.Pre_Requisites, table.c.Co_Requisites))
+    load_description = description_loader(department)
+    courses = [Course(num, name, pre, co, load_description, num) for num, name, pre, co in rows]
     return courses
 
+CATALOG_COLUMNS = ('Course_Num', 'Course_Name', 'Pre_Requisites', 'Co_Requisites', 'Description')
+
+def catalog_table(department):
+    """ClassesFor<Dept> as a Core table: SQLAlchemy quotes the name, nothing is pasted into SQL."""
+    return sa.table(f'ClassesFor{department}', *(sa.column(c) for c in CATALOG_COLUMNS))
+
+def description_loader(department):
+    """
+    load(course_num) -> Description for one department's courses. The first call
+    reads every description of the department in one query (a page that shows
+    one usually shows the rest), later calls are dict lookups.
+    """
+    table = catalog_table(department)
+    statement = sa.select(table.c.Course_Num, table.c.Description)
+    descriptions = None
+    lock = threading.Lock()
+    def load(course_num):
+        nonlocal descriptions
+        if descriptions is None:
+            with lock:
+                if descriptions is None:
+                    _, rows = query(CATALOG, statement)
+                    found = {}
+                    for num, description in rows:
+                        found.setdefault(num, description)
+                    descriptions = found
+        return descriptions.get(course_num)
+    return load
+
 def normalize_code(course_code):
     return ' '.join(str(course_code).replace('\xa0', ' ').split()).strip()
 
 def is_course_eligible(course, completed, course_map):
-    course_id = normalize_code(course['Course_Num'])
-    prereqs = course.get('Pre_Requisites', '').strip()
-    if prereqs and prereqs.lower() != 'none':
-        prereq_list = [normalize_code(p) for p in prereqs.split(',') if p.strip()]
-        for p in prereq_list:
-            if p not in completed:
-                return False
-    coreqs = course.get('Co_Requisites', '').strip()
-    if coreqs and coreqs.lower() != 'none':
-        coreq_list = [normalize_code(p) for p in coreqs.split(',') if p.strip()]
-        for ccode in coreq_list:
-            if ccode in completed:
-                continue
-            co_course = course_map.get(ccode)
-            if not co_course:
-                return False
-            co_prereqs = co_course.get('Pre_Requisites', '').strip()
-            if co_prereqs and co_prereqs.lower() != 'none':
-                co_prereq_list = [normalize_code(p) for p in co_prereqs.split(',') if p.strip()]
-                for p in co_prereq_list:
-                    if p not in completed:
-                        return False
-    return True
+    # Requisite columns are AND/OR expressions (see requisites.py); a plain comma list means all of them
+    if not requisites_met(parse_requisites(course.get('Pre_Requisites')), completed.__contains__):
+        return False
+    def coreq_met(ccode):
+        if ccode in completed:
+            return True
+        co_course = course_map.get(ccode)
+        if not co_course:
+            return False
+        return requisites_met(parse_requisites(co_course.get('Pre_Requisites')), completed.__contains__)
+    return requisites_met(parse_requisites(course.get('Co_Requisites')), coreq_met)
 
+@timed("eligibility_scan")
 def filter_eligible_courses_unique(all_courses, completed_courses):
     normalized_completed = set(normalize_code(c) for c in completed_courses)
     eligible = dict()
@@ -54,45 +87,62 @@ def filter_eligible_courses_unique(all_courses, completed_courses):
             continue
         if is_course_eligible(course, normalized_completed, course_map):
             eligible[c_id] = course
-            coreqs = course.get('Co_Requisites', '').strip()
-            if coreqs and coreqs.lower() != 'none':
-                coreq_list = [normalize_code(cc) for cc in coreqs.split(',') if cc.strip()]
-                for ccode in coreq_list:
-                    if ccode not in normalized_completed and ccode in course_map and ccode not in eligible:
-                        co_course = course_map[ccode]
-                        if is_course_eligible(co_course, normalized_completed, course_map):
-                            eligible[ccode] = co_course
+            for ccode in requisite_codes(course.get('Co_Requisites')):
+                if ccode not in normalized_completed and ccode in course_map and ccode not in eligible:
+                    co_course = course_map[ccode]
+                    if is_course_eligible(co_course, normalized_completed, course_map):
+                        eligible[ccode] = co_course
     return eligible
 
+def get_grades_db_path():
+    return GRADES_DB_PATH
+
+# Tables written by offerings_index.py; they are not term tables
+INDEX_TABLES = ('offerings', 'offerings_sources')
+# Every table in grades.sqlite that isn't a term: the above and instructor_map.py's
+DERIVED_TABLES = INDEX_TABLES + ('instructor_professor_map', 'instructor_map_sources')
+
+OFFERING_COLUMN_NAMES = ('subject_id', 'course_number', 'course_title', 'year', 'semester',
+                         'instructor1', 'instructor2', 'instructor3', 'instructor4', 'instructor5', 'course_gpa')
+OFFERING_COLUMNS = ', '.join(OFFERING_COLUMN_NAMES)
+
+def term_table(name):
+    """One grades term table (or `offerings`) as a Core table with the offering columns."""
+    return sa.table(name, *(sa.column(c) for c in OFFERING_COLUMN_NAMES))
+
+@lru_cache(maxsize=1024)
+def course_offerings_select(table_name):
+    """SELECT of one course's rows from a term table; built once per table, run with {'subj', 'num'}."""
+    term = term_table(table_name)
+    return sa.select(*term.c).where(term.c.subject_id == sa.bindparam('subj'), term.c.course_number == sa.bindparam('num'))
+
+def offering_from_row(row):
+    return Offering(
+        subject_id=row[0],
+        course_number=row[1],
+        course_title=row[2],
+        year=row[3],
+        semester=row[4],
+        course_gpa=row[9],
+        instructors=[iname for iname in row[5:10] if iname and str(iname).strip() and str(iname).strip().lower() != 'none']
+    )
+
+@timed("offerings_scan")
 def get_professor_offerings_for_course(course_code):
     # Looks in all tables for offerings of the given course code (subject_id + course_number)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.abspath(os.path.join(script_dir, '../../../data/grades.sqlite'))
-    if not os.path.exists(db_path):
-        raise FileNotFoundError(f"Grades DB file not found at {db_path}")
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [row[0] for row in cur.fetchall() if not row[0].startswith('sqlite')] # skip any sqlite internal tables
+    tables = [tbl for tbl in table_names(GRADES) if tbl not in DERIVED_TABLES]
     offerings = []
     subj, num = course_code.split()
-    for tbl in tables:
-        safe_tbl = f'"{tbl}"' if ('-' in tbl or ' ' in tbl) else tbl
-        try:
-            cur.execute(f'SELECT subject_id, course_number, course_title, year, semester, instructor1, instructor2, instructor3, instructor4, instructor5, course_gpa FROM {safe_tbl} WHERE subject_id=? AND course_number=?', (subj, num))
-            for row in cur.fetchall():
-                offerings.append({
-                    'subject_id': row[0],
-                    'course_number': row[1],
-                    'course_title': row[2],
-                    'year': row[3],
-                    'semester': row[4],
-                    'course_gpa': row[9],
-                    'instructors': [iname for iname in row[5:10] if iname and str(iname).strip() and str(iname).strip().lower() != 'none']
-                })
-        except Exception:
-            continue
-    conn.close()
+    with get_engine(GRADES).connect() as conn:
+        for tbl in tables:
+            try:
+                rows = conn.execute(course_offerings_select(tbl), {'subj': subj, 'num': num}).fetchall()
+            except sa.exc.DBAPIError:
+                # Not a grades table (no such columns); Postgres also needs the failed statement rolled back
+                conn.rollback()
+                continue
+            for row in rows:
+                offerings.append(offering_from_row(row))
     return offerings
 
 def print_prof_recs_for_course(course_code, course_name, completed):
@@ -135,12 +185,9 @@ def run_local_demo():
     
     for code, e in list(eligible.items()):
         print(f"{code}: {e['Course_Name']}")
-        co_req = e.get('Co_Requisites', '').strip()
-        if co_req and co_req.lower() != 'none':
-            co_req_list = [normalize_code(c) for c in co_req.split(',') if c.strip()]
-            remaining_coreqs = [c for c in co_req_list if c not in completed]
-            if remaining_coreqs:
-                print(f"    Co-requisite(s): {', '.join(remaining_coreqs)}")
+        remaining_coreqs = [c for c in requisite_codes(e.get('Co_Requisites')) if c not in completed]
+        if remaining_coreqs:
+            print(f"    Co-requisite(s): {e['Co_Requisites']}")
         print_prof_recs_for_course(code, e['Course_Name'], completed)
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+"""
+Compact record types for the data the recommendation path keeps in memory.
+
+A dict per catalog row / offering costs a hash table each (plus the full
+Description text, which nothing on the recommendation path reads). These
+classes use __slots__ instead, intern the strings that repeat across rows
+(subjects, course numbers, terms, instructor names) and load a course's
+Description only when it is asked for.
+
+Course and Offering are read-only Mappings keyed by the old dict keys, so
+`course['Course_Name']`, `offer.get('year', '')`, `dict(record)` and
+`record == {...}` keep working.
+"""
+import sys
+from collections.abc import Mapping
+
+_NOT_LOADED = object()
+
+
+def intern(value):
+    """sys.intern for strings; other values pass through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        # Faster than Mapping.get (no exception on the hit path)
+        return getattr(self, key) if key in self._fields else default
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Course(Record):
+    """One ClassesFor<Dept> row. Description is fetched on first access via load_description(row)."""
+    __slots__ = ('Course_Num', 'Course_Name', 'Pre_Requisites', 'Co_Requisites',
+                 '_description', '_load_description', '_row')
+    _fields = ('Course_Num', 'Course_Name', 'Pre_Requisites', 'Co_Requisites', 'Description')
+
+    def __init__(self, num, name, prereqs, coreqs, load_description=None, row=None, description=_NOT_LOADED):
+        self.Course_Num = intern(num)
+        self.Course_Name = name
+        self.Pre_Requisites = prereqs
+        self.Co_Requisites = coreqs
+        self._description = description
+        self._load_description = load_description
+        self._row = row
+
+    @property
+    def Description(self):
+        if self._description is _NOT_LOADED:
+            self._description = self._load_description(self._row) if self._load_description else None
+            self._load_description = None
+        return self._description
+
+
+class Offering(Record):
+    """One grades row: a section of a course in one term, with its (up to five) instructors."""
+    __slots__ = ('subject_id', 'course_number', 'course_title', 'year', 'semester', 'course_gpa', 'instructors')
+    _fields = __slots__
+
+    def __init__(self, subject_id, course_number, course_title, year, semester, course_gpa, instructors):
+        self.subject_id = intern(subject_id)
+        self.course_number = intern(course_number)
+        self.course_title = intern(course_title)
+        self.year = year
+        self.semester = intern(semester)
+        self.course_gpa = course_gpa
+        self.instructors = tuple(intern(name) for name in instructors)
+
+
+class ProfessorRecord:
+    """(id, name, rating, difficulty, tags) of one professor; iterates like the query row it replaces."""
+    __slots__ = ('id', 'name', 'rating', 'difficulty', 'tags')
+
+    def __init__(self, id, name, rating, difficulty, tags):
+        self.id = id
+        self.name = name
+        self.rating = rating
+        self.difficulty = difficulty
+        self.tags = tags
+
+    def __iter__(self):
+        return iter((self.id, self.name, self.rating, self.difficulty, self.tags))
+
+    def __repr__(self):
+        return f"<ProfessorRecord {self.name}>"
@@ -0,0 +1,210 @@
+"""
+Prerequisite / co-requisite expressions.
+
+The Pre_Requisites / Co_Requisites columns hold a small boolean expression
+over course codes:
+
+    MATH 1426, PHYS 1443                    both (the scraper's original format)
+    MATH 1426 or MATH 1421, PHYS 1443       one of the MATH courses, and PHYS 1443
+    (CSE 1310 and CSE 1320) or CSE 1325     explicit grouping
+
+"," is AND and binds loosest, then "or", then "and"; parentheses group.
+Keywords are lowercase only, so a department code is never read as one.
+'', None and 'None' mean no requirement, and a string that doesn't parse is
+read the old way (every comma-separated piece is required).
+
+A parsed expression is a tree: a course code (str), ('and', children),
+('or', children), or None for "nothing required". to_dnf() flattens a tree
+into OR-of-AND clauses; CatalogGraph compiles those into bitmasks once per
+catalog load, so checking a course is one mask test per clause.
+
+No app imports here: the scraper, the migrations' helpers and the engine
+all read the same format.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, Union
+
+Tree = Union[None, str, Tuple[str, tuple]]
+
+AND = 'and'
+OR = 'or'
+
+TOKEN_RE = re.compile(r'[(),]|[^\s(),]+')
+OPERATOR_RE = re.compile(r'[()]|\b(?:and|or)\b')
+
+
+def _node(op, children) -> Tree:
+    """('and' | 'or', children) with nested same-op nodes flattened, duplicates and no-ops dropped."""
+    flat = []
+    for child in children:
+        if child is None:
+            if op == OR:
+                return None  # one alternative needs nothing: the whole OR is met
+            continue
+        if isinstance(child, tuple) and child[0] == op:
+            flat.extend(child[1])
+        else:
+            flat.append(child)
+    flat = list(dict.fromkeys(flat))
+    if not flat:
+        return None
+    if len(flat) == 1:
+        return flat[0]
+    return (op, tuple(flat))
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, token):
+        if self.peek() == token:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self):
+        tree = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected {self.peek()!r}")
+        return tree
+
+    def expr(self):
+        # item (',' item)*; empty items ("A, , B" or a trailing comma) are skipped like before
+        items = []
+        while True:
+            if self.peek() not in (',', ')', None):
+                items.append(self.any_of())
+            if not self.take(','):
+                return _node(AND, items)
+
+    def any_of(self):
+        items = [self.all_of()]
+        while self.take(OR):
+            items.append(self.all_of())
+        return _node(OR, items)
+
+    def all_of(self):
+        items = [self.atom()]
+        while self.take(AND):
+            items.append(self.atom())
+        return _node(AND, items)
+
+    def atom(self):
+        if self.take('('):
+            tree = self.expr()
+            if not self.take(')'):
+                raise ValueError("missing ')'")
+            return tree
+        words = []
+        while self.peek() not in ('(', ')', ',', AND, OR, None):
+            words.append(self.tokens[self.pos])
+            self.pos += 1
+        if not words:
+            raise ValueError(f"expected a course code, got {self.peek()!r}")
+        return ' '.join(words)
+
+
+def _all_required(text) -> Tree:
+    return _node(AND, [' '.join(p.split()) for p in text.split(',') if p.strip()])
+
+
+@lru_cache(maxsize=16384)
+def parse_requisites(text) -> Tree:
+    """Tree for one requisite column."""
+    text = str(text or '').replace('\xa0', ' ').strip()
+    if not text or text.lower() == 'none':
+        return None
+    if not OPERATOR_RE.search(text):
+        return _all_required(text)  # plain comma list, the common case
+    try:
+        return _Parser(TOKEN_RE.findall(text)).parse()
+    except ValueError:
+        # Not an expression: every comma-separated piece is required, as before
+        return _all_required(text)
+
+
+def codes(tree: Tree) -> Tuple[str, ...]:
+    """Every course code a tree mentions, in order, once each."""
+    found = []
+
+    def walk(node):
+        if node is None:
+            return
+        if isinstance(node, str):
+            found.append(node)
+        else:
+            for child in node[1]:
+                walk(child)
+
+    walk(tree)
+    return tuple(dict.fromkeys(found))
+
+
+def requisite_codes(text) -> Tuple[str, ...]:
+    """Course codes mentioned in a requisite column: "MATH 1426 or MATH 1421, PHYS 1443" -> all three."""
+    return codes(parse_requisites(text))
+
+
+def requisites_met(tree: Tree, satisfied: Callable[[str], bool]) -> bool:
+    """Evaluates a tree, with satisfied(code) deciding each course."""
+    if tree is None:
+        return True
+    if isinstance(tree, str):
+        return satisfied(tree)
+    op, children = tree
+    if op == OR:
+        return any(requisites_met(child, satisfied) for child in children)
+    return all(requisites_met(child, satisfied) for child in children)
+
+
+def to_dnf(tree: Tree) -> Tuple[Tuple[str, ...], ...]:
+    """
+    OR-of-AND clauses for a tree: the requirement is met when every code of
+    at least one clause is. No requirement -> one empty clause. Clauses that
+    contain another clause are dropped, so catalog-style "(A or B), C" stays
+    one clause per alternative.
+    """
+    if tree is None:
+        return ((),)
+    if isinstance(tree, str):
+        return ((tree,),)
+    op, children = tree
+    if all(isinstance(child, str) for child in children):
+        return (children,) if op == AND else tuple((child,) for child in children)
+    if op == OR:
+        clauses = [clause for child in children for clause in to_dnf(child)]
+    else:
+        clauses = [()]
+        for child in children:
+            clauses = [a + tuple(c for c in b if c not in a) for a in clauses for b in to_dnf(child)]
+    sets = [frozenset(clause) for clause in clauses]
+    return tuple(
+        clause for i, clause in enumerate(clauses)
+        if not any(other < sets[i] or (other == sets[i] and j < i) for j, other in enumerate(sets))
+    )
+
+
+def requisites_from_groups(groups) -> Tree:
+    """Tree for "all of these groups, any one course of each group" (what the scraper finds in a description)."""
+    return _node(AND, [_node(OR, group) for group in groups])
+
+
+def format_requisites(tree: Tree, _parent: Optional[str] = None) -> str:
+    """Column text for a tree ('' for no requirement); parse_requisites() reads it back to the same tree."""
+    if tree is None:
+        return ''
+    if isinstance(tree, str):
+        return tree
+    op, children = tree
+    if op == AND:
+        if _parent is None:
+            return ', '.join(format_requisites(child, 'top') for child in children)
+        return '(' + ' and '.join(format_requisites(child, AND) for child in children) + ')'
+    text = ' or '.join(format_requisites(child, OR) for child in children)
+    return text if _parent in (None, 'top') else '(' + text + ')'
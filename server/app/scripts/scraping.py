@@ -1,36 +1,65 @@
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
 import requests
 import re
 import sqlite3
 import spacy
+import threading
 
-# --- New Code: Load spaCy Model Globally ---
-# This loads the model once when the script starts, which is much more efficient.
-# It will download the model if you don't have it installed.
 try:
-    nlp = spacy.load("en_core_web_lg")
-except OSError:
-    print("Downloading spaCy model 'en_core_web_lg'...")
-    print("This may take a minute and only needs to run once.")
-    spacy.cli.download("en_core_web_lg")
-    nlp = spacy.load("en_core_web_lg")
+    from .requisites import format_requisites, requisite_codes, requisites_from_groups
+except ImportError:  # run as a script (python scraping.py): requisites.py sits next to it
+    from requisites import format_requisites, requisite_codes, requisites_from_groups
+
+# --- spaCy pipeline, loaded lazily ---
+# Only sentence boundaries are used, so:
+#   "lg":          en_core_web_lg with tagger/lemmatizer/NER disabled (the parser
+#                  still sets the boundaries, same as before)
+#   "sentencizer": rule-based sentence splitter on a blank English pipeline
+#                  (no model download, much faster; see benchmarks/requisite_parity.py)
+NLP_MODE = os.getenv("SCRAPER_NLP_MODE", "lg")
+NLP_BATCH_SIZE = int(os.getenv("SCRAPER_NLP_BATCH_SIZE", "64"))
+UNUSED_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer", "ner"]
+
+_nlp = {}
+_nlp_lock = threading.Lock()
+_nlp_run_lock = threading.Lock()
+
+def get_nlp(mode=None):
+    mode = mode or NLP_MODE
+    with _nlp_lock:
+        if mode not in _nlp:
+            if mode == "sentencizer":
+                nlp = spacy.blank("en")
+                nlp.add_pipe("sentencizer")
+            else:
+                try:
+                    nlp = spacy.load("en_core_web_lg", disable=UNUSED_COMPONENTS)
+                except OSError:
+                    print("Downloading spaCy model 'en_core_web_lg'...")
+                    print("This may take a minute and only needs to run once.")
+                    spacy.cli.download("en_core_web_lg")
+                    nlp = spacy.load("en_core_web_lg", disable=UNUSED_COMPONENTS)
+            _nlp[mode] = nlp
+        return _nlp[mode]
 
 # Regex to find course codes (e.g., CEE 1234, MATH 2425)
 # This is often more reliable than just spaCy's POS tagging for this specific format
 COURSE_RE = re.compile(r'([A-Z]{2,4})\s(\d{4})')
 
-# --- New Code: Requisite Extraction Function ---
-# --- New Code: Requisite Extraction Function (Modified) ---
-# --- New Code: Requisite Extraction Function (State Machine) ---
-def extract_requisites(description_text):
+# Text allowed between two course codes of one list ("MATH 1426, MATH 1421, or MATH 2425")
+LIST_GAP_RE = re.compile(r'^\s*(,\s*)?((and|or)\s+)?$', re.IGNORECASE)
+
+# (mode, sha1 of description) -> {"prereqs": set, "coreqs": set, "prereq_expr": str, "coreq_expr": str}
+_requisite_cache = {}
+
+def _requisite_block(description_text):
     """
-    Uses spaCy to parse the *entire requisite block* (not just the last line)
-    and uses a state machine to categorize courses.
+    Finds the start of the entire requisite block (not just the last line).
+    Returns (block text, starting mode) or None when there are no requisites.
     """
-    prereqs = set()
-    coreqs = set()
-
-    # --- Step 1: Find the start of the entire requisite block ---
     lower_text = description_text.lower()
     
     # Find the first occurrence of any requisite keyword
@@ -45,28 +74,54 @@ def extract_requisites(description_text):
     
     if not valid_indices:
         # No requisite keywords found at all in the description
-        return {"prereqs": prereqs, "coreqs": coreqs}
+        return None
     
     # Get the index of the first keyword
     start_index = min(valid_indices)
-    
-    # Extract the entire block of text from that point forward
-    req_block_text = description_text[start_index:]
-    # --- End Step 1 ---
 
-    # --- Step 2: Process this block with spaCy ---
-    doc = nlp(req_block_text)
-    
-    # --- Step 3: Track the "state" as we read sentences ---
     # 0 = prerequisite mode (default)
     # 1 = corequisite mode
-    current_mode = 0 
-    
     # Set default mode based on the *first* keyword found
+    current_mode = 0
     first_keyword = lower_text[start_index:start_index+20]
     if "corequisite" in first_keyword or "concurrent" in first_keyword:
         current_mode = 1
-    
+
+    # Extract the entire block of text from that point forward
+    return description_text[start_index:], current_mode
+
+def _requisite_groups(sentence):
+    """
+    Course codes of one sentence as groups of alternatives, all of which are
+    required: "MATH 1426 or MATH 1421, and PHYS 1443" -> [['MATH 1426', 'MATH 1421'], ['PHYS 1443']].
+    Codes joined only by "or" (or an "A, B, or C" list) are alternatives;
+    anything else between two codes keeps both required, as before.
+    """
+    matches = list(COURSE_RE.finditer(sentence))
+    groups = []
+    run, run_words = [], []   # the current list of codes and the connectives inside it
+    for k, match in enumerate(matches):
+        code = f"{match.group(1)} {match.group(2)}"
+        gap = LIST_GAP_RE.match(sentence[matches[k - 1].end():match.start()]) if k else None
+        word = (gap.group(3) or '').lower() if gap else None
+        if gap is not None and word != 'and':
+            run.append(code)
+            run_words.append(word)
+            continue
+        # Other text, or an "and" (which ends a list of alternatives): start a new list
+        groups.extend(_list_groups(run, run_words))
+        run, run_words = [code], []
+    groups.extend(_list_groups(run, run_words))
+    return groups
+
+def _list_groups(codes, words):
+    if 'or' in words:
+        return [codes]
+    return [[code] for code in codes]
+
+def _requisites_from_doc(doc, current_mode):
+    """State machine over the sentences of a requisite block."""
+    groups = ([], [])   # per mode: prereq groups, coreq groups
     for sent in doc.sents:
         sent_text = sent.text.lower()
         
@@ -77,25 +132,65 @@ def extract_requisites(description_text):
         elif "prerequisite" in sent_text:
             current_mode = 0 # Now we are in prereq mode
             
-        # Find all course codes in this sentence
-        found_codes = COURSE_RE.findall(sent.text)
-        if not found_codes:
-            continue
-            
-        formatted_codes = {f"{dept} {num}" for dept, num in found_codes}
+        # Apply this sentence's codes based on the current_mode
+        groups[current_mode].extend(_requisite_groups(sent.text))
+
+    prereq_tree = requisites_from_groups(groups[0])
+    coreq_tree = requisites_from_groups(groups[1])
+    return {
+        "prereqs": {code for group in groups[0] for code in group},
+        "coreqs": {code for group in groups[1] for code in group},
+        "prereq_expr": format_requisites(prereq_tree),
+        "coreq_expr": format_requisites(coreq_tree),
+    }
+
+def extract_requisites_batch(descriptions, mode=None):
+    """
+    Requisites for every description of a department in one nlp.pipe() pass.
+    Results are cached by description hash, so unchanged descriptions are
+    never re-parsed within a process.
+    """
+    mode = mode or NLP_MODE
+    keys = [(mode, hashlib.sha1(d.encode("utf-8")).hexdigest()) for d in descriptions]
+    results = [None] * len(descriptions)
 
-        # Apply codes based on the current_mode
-        if current_mode == 1:
-            coreqs.update(formatted_codes)
+    todo = []
+    for i, (description, key) in enumerate(zip(descriptions, keys)):
+        if key in _requisite_cache:
+            continue
+        block = _requisite_block(description)
+        if block is None:
+            _requisite_cache[key] = {"prereqs": set(), "coreqs": set(), "prereq_expr": '', "coreq_expr": ''}
         else:
-            prereqs.update(formatted_codes)
+            todo.append((i, block))
 
-    return {"prereqs": prereqs, "coreqs": coreqs}
+    if todo:
+        nlp = get_nlp(mode)
+        # Pages are parsed on DepartmentPages worker threads; one pipeline run at a time
+        with _nlp_run_lock:
+            docs = nlp.pipe((block for _, (block, _) in todo), batch_size=NLP_BATCH_SIZE)
+            for (i, (_, start_mode)), doc in zip(todo, docs):
+                _requisite_cache[keys[i]] = _requisites_from_doc(doc, start_mode)
 
-def find_data(html_content):
+    for i, key in enumerate(keys):
+        cached = _requisite_cache[key]
+        # Copies: callers union/modify these sets
+        results[i] = dict(cached, prereqs=set(cached["prereqs"]), coreqs=set(cached["coreqs"]))
+    return results
+
+def extract_requisites(description_text, mode=None):
     """
-    Find the (Course_Num, Course_Name) and (Prerequisites, Corequisites)
-    Returned as list_of_titles and list_of_reqs respectively
+    Uses spaCy to parse the *entire requisite block* (not just the last line)
+    and uses a state machine to categorize courses.
+    "prereqs"/"coreqs" are every course mentioned; "prereq_expr"/"coreq_expr"
+    are the AND/OR expressions stored in the requisite columns (see requisites.py).
+    """
+    return extract_requisites_batch([description_text], mode)[0]
+
+def find_blocks(html_content):
+    """
+    Find the (Course_Num, Course_Name) titles and raw descriptions of every
+    course block on a department page, without running any NLP.
     """
     # print(html_content)
     soup = BeautifulSoup(html_content, 'html.parser')
@@ -133,19 +228,25 @@ def find_data(html_content):
     """
     Find the Pre-Requisites and Co-requisites of a Class
     """
-    list_of_reqs = []
     list_of_desc = []
     
     # Get descriptions, but only for the courses we've already processed
     desc_of_courses = soup.find_all(class_="courseblockdesc")[:len(list_of_titles)]
     
     for desc_html in desc_of_courses:
-        desc_text = desc_html.text
-        list_of_desc.append(desc_text)
-        
-        # --- Updated Code: Call the new spaCy function ---
-        reqs = extract_requisites(desc_text)
-        list_of_reqs.append(reqs)
+        list_of_desc.append(desc_html.text)
+
+    return list_of_titles, list_of_desc
+
+def find_data(html_content):
+    """
+    Find the (Course_Num, Course_Name) and (Prerequisites, Corequisites)
+    Returned as list_of_titles and list_of_reqs respectively
+    """
+    list_of_titles, list_of_desc = find_blocks(html_content)
+
+    # All descriptions of the department go through spaCy as one batch
+    list_of_reqs = extract_requisites_batch(list_of_desc)
 
     # TODO
     # IF THE Department from Prerequisite is not the same as the current department then grab the data for that department and add on the prerequisite
@@ -153,7 +254,188 @@ def find_data(html_content):
     
     return list_of_titles, list_of_reqs, list_of_desc
 
-def find_prereqs(prerequisites, main_course_department, safe_table_name, cur):
+class DepartmentPages:
+    """
+    Memo cache for one scraper run: every department page is downloaded and
+    run through find_data() at most once, no matter how many out-of-department
+    prerequisites point at it. prefetch() fetches newly discovered departments
+    concurrently on a bounded thread pool.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = int(os.getenv("SCRAPER_WORKERS", "4"))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    @staticmethod
+    def _parse(html):
+        titles, reqs, descs = find_data(html)
+        # Course_Num -> position, so finding one course doesn't rescan the page
+        by_code = {}
+        for k, title in enumerate(titles):
+            by_code.setdefault(title[0].replace('\u00A0', ' ').strip(), k)
+        return titles, reqs, descs, by_code
+
+    def _load(self, department):
+        with self._lock:
+            self.fetches += 1
+        html = get_html_content(department)
+        if not html:
+            return None
+        return self._parse(html)
+
+    def add(self, department, html):
+        """Registers a page the caller already downloaded (the department being scraped)."""
+        with self._lock:
+            if department in self._futures:
+                return  # already fetched and parsed as another department's prereq page
+        parsed = self._parse(html)
+        with self._lock:
+            self._futures.setdefault(department, _Done(parsed))
+
+    def prefetch(self, departments):
+        with self._lock:
+            for department in departments:
+                if department not in self._futures:
+                    self._futures[department] = self._executor.submit(self._load, department)
+
+    def get(self, department):
+        """(titles, reqs, descs, by_code) for a department, or None if it couldn't be fetched."""
+        self.prefetch([department])
+        return self._futures[department].result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class _Done:
+    """Stand-in for a finished Future."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+
+# --- Bulk writes ---
+# A scrape is one long write transaction. Rows are buffered and written with
+# executemany, and the journal runs in WAL with synchronous=NORMAL while the
+# load is going (back to the default rollback journal afterwards, so the
+# server's read-only connections see a plain database file).
+WRITE_BATCH_SIZE = int(os.getenv("SCRAPER_WRITE_BATCH_SIZE", "500"))
+LOAD_SYNCHRONOUS = os.getenv("SCRAPER_SYNCHRONOUS", "NORMAL")
+
+def connect_for_load(db_path):
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(f"PRAGMA synchronous={LOAD_SYNCHRONOUS}")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("BEGIN")
+    return db
+
+def finish_load(db, commit=True):
+    """Ends the load transaction (rolled back if commit is False) and closes the connection."""
+    if commit:
+        db.commit()
+    else:
+        db.rollback()
+    db.execute("PRAGMA journal_mode=DELETE")
+    db.close()
+
+
+class CourseWriter:
+    """
+    Buffered INSERT OR REPLACE writer for one ClassesFor<Dept> table.
+
+    `known` holds every Course_Num already in the table plus everything added
+    during this run, so "have we inserted this prereq yet?" is a set lookup
+    instead of a SELECT per prerequisite. Rows are written in the order they
+    were added, so the table ends up exactly as with one execute per row.
+
+    When classes.db has the course_requisites edge table (created by the
+    migrations, `flask db upgrade`), each written or deleted row's edges are
+    replaced along with it.
+    """
+
+    def __init__(self, cur, safe_table_name, batch_size=None):
+        self.cur = cur
+        self.batch_size = batch_size or WRITE_BATCH_SIZE
+        self.sql_insert = f"""
+            INSERT OR REPLACE INTO {safe_table_name} 
+            (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        self.sql_delete = f"DELETE FROM {safe_table_name} WHERE Course_Num = ?"
+        cur.execute(f"SELECT Course_Num FROM {safe_table_name}")
+        self.known = {row[0] for row in cur.fetchall()}
+        self.rows = []
+        self.written = 0
+
+        self.department = safe_table_name[len('ClassesFor'):]
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='course_requisites'")
+        self.edges = cur.fetchone() is not None
+
+    def __contains__(self, course_num):
+        return course_num in self.known
+
+    def add(self, data):
+        self.rows.append(data)
+        self.known.add(data[0])
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def delete(self, course_num):
+        self.flush()
+        self.cur.execute(self.sql_delete, (course_num,))
+        self.known.discard(course_num)
+        if self.edges:
+            self._delete_edges([course_num])
+
+    def _delete_edges(self, course_nums):
+        self.cur.executemany(
+            "DELETE FROM course_requisites WHERE department = ? AND course_num = ?",
+            [(self.department, ' '.join(num.replace('\xa0', ' ').split())) for num in course_nums],
+        )
+
+    def _write_edges(self, rows):
+        self._delete_edges([data[0] for data in rows])
+        edges = []
+        for course_num, _, prereqs, coreqs, _ in rows:
+            code = ' '.join(course_num.replace('\xa0', ' ').split())
+            for kind, req_str in (('pre', prereqs), ('co', coreqs)):
+                for position, requisite in enumerate(requisite_codes(req_str)):
+                    edges.append((self.department, code, requisite, kind, position))
+        self.cur.executemany(
+            "INSERT INTO course_requisites (department, course_num, requisite, kind, position) VALUES (?, ?, ?, ?, ?)",
+            edges,
+        )
+
+    def flush(self):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        try:
+            self.cur.executemany(self.sql_insert, rows)
+            inserted = rows
+        except Exception:
+            # Find and report the bad row(s), keep the rest
+            inserted = []
+            for data in rows:
+                try:
+                    self.cur.execute(self.sql_insert, data)
+                    inserted.append(data)
+                except Exception as e:
+                    print(f"Error inserting {data[0]}: {e}")
+        if self.edges:
+            self._write_edges(inserted)
+        self.written += len(inserted)
+
+
+def find_prereqs(prerequisites, main_course_department, safe_table_name, cur, pages=None, writer=None):
     """
     Recursively finds and inserts prerequisite courses from other departments.
     
@@ -161,18 +443,29 @@ def find_prereqs(prerequisites, main_course_department, safe_table_name, cur):
     :param main_course_department: The department of the course we're checking, e.g., "CE"
     :param safe_table_name: The name of the SQL table to insert into.
     :param cur: The active database cursor.
-    """
-    
-    # Use the same INSERT OR REPLACE strategy as insert_courses
-    sql_insert = f"""
-        INSERT OR REPLACE INTO {safe_table_name} 
-        (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description)
-        VALUES (?, ?, ?, ?, ?)
+    :param pages: DepartmentPages memo shared across the whole run (one is created if omitted).
+    :param writer: CourseWriter for safe_table_name shared across the run (one is created and flushed if omitted).
     """
     
     if not prerequisites:
         return  # Base case: no prerequisites
 
+    own_pages = pages is None
+    if own_pages:
+        pages = DepartmentPages()
+    own_writer = writer is None
+    if own_writer:
+        writer = CourseWriter(cur, safe_table_name)
+
+    # Start downloading every department this level needs at once;
+    # the loop below then mostly waits on pages that are already in flight.
+    needed = []
+    for prereq_course_id in prerequisites:
+        if main_course_department not in str(prereq_course_id):
+            if prereq_course_id not in writer:
+                needed.append(prereq_course_id.split(" ")[0])
+    pages.prefetch(needed)
+
     # Loop through each prerequisite course ID in the set
     for prereq_course_id in prerequisites:
         # prereq_course_id is a string, e.g., "MATH 1426"
@@ -184,61 +477,49 @@ def find_prereqs(prerequisites, main_course_department, safe_table_name, cur):
 
                 # --- VITAL CHECK: PREVENT INFINITE RECURSION ---
                 # Check if we have *already* inserted this course.
-                cur.execute(f"SELECT 1 FROM {safe_table_name} WHERE Course_Num = ?", (prereq_course_id,))
-                if cur.fetchone():
+                if prereq_course_id in writer:
                     # If it exists, we're done. Skip to the next prerequisite.
                     continue 
                 
-                # --- We don't have it. Scrape the new department. ---
+                # --- We don't have it. Get the department page (downloaded and parsed at most once per run) ---
                 print(f"--- Finding prereq: {prereq_course_id} from {prereq_dept} department...")
-                html = get_html_content(prereq_dept)
-                if not html:
+                page = pages.get(prereq_dept)
+                if not page:
                     print(f"Warning: Could not fetch {prereq_dept}. Skipping {prereq_course_id}.")
                     continue # Skip this prerequisite
 
-                # Parse the *entire* department page
-                new_titles, new_preqs, new_descs = find_data(html)
+                new_titles, new_preqs, new_descs, by_code = page
                 
-                # Find the specific course we're looking for
+                # Find the specific course we're looking for (e.g., "MATH 1426")
                 found_course = False
-                for k in range(len(new_titles)):
+                k = by_code.get(prereq_course_id)
+                if k is not None:
+                    found_course = True
                     
-                    clean_title_from_scrape = new_titles[k][0].replace('\u00A0', ' ').strip()
+                    # Get its data and prereqs
+                    prereqs_for_this_prereq_set = new_preqs[k]["prereqs"]
+                    coreqs_for_this_prereq_set = new_preqs[k]["coreqs"]
                     
-                    # If we find the matching course (e.g., "MATH 1426")
-                    if prereq_course_id == clean_title_from_scrape:
-                        found_course = True
-                        
-                        # Get its data and prereqs
-                        prereqs_for_this_prereq_set = new_preqs[k]["prereqs"]
-                        coreqs_for_this_prereq_set = new_preqs[k]["coreqs"]
-                        
-                        prereqs_str = ', '.join(prereqs_for_this_prereq_set)
-                        coreqs_str = ', '.join(coreqs_for_this_prereq_set)
-                        
-                        data_tuple_for_prereq = (
-                            new_titles[k][0],      # Course_Num
-                            new_titles[k][1],      # Course_Name
-                            prereqs_str,           # Pre_Requisites 
-                            coreqs_str,            # Co_Requisites 
-                            str(new_descs[k]).strip() # Description
-                        )
-                        
-                        # --- 1. Insert this prerequisite course (e.g., "MATH 1426") ---
-                        try:
-                            cur.execute(sql_insert, data_tuple_for_prereq)
-                        except Exception as e:
-                            print(f"Error inserting prereq {data_tuple_for_prereq[0]}: {e}")
-
-                        # --- 2. NOW, recursively find *its* prerequisites ---
-                        all_prereqs_for_prereq = prereqs_for_this_prereq_set.union(coreqs_for_this_prereq_set)
-                        if all_prereqs_for_prereq:
-                            # The 'department' for this recursive call is "MATH" (prereq_dept)
-                            find_prereqs(all_prereqs_for_prereq, prereq_dept, safe_table_name, cur)
-                        
-                        # We found our course, so break from the inner 'for k' loop
-                        break 
-                
+                    prereqs_str = new_preqs[k]["prereq_expr"]
+                    coreqs_str = new_preqs[k]["coreq_expr"]
+                    
+                    data_tuple_for_prereq = (
+                        new_titles[k][0],      # Course_Num
+                        new_titles[k][1],      # Course_Name
+                        prereqs_str,           # Pre_Requisites 
+                        coreqs_str,            # Co_Requisites 
+                        str(new_descs[k]).strip() # Description
+                    )
+                    
+                    # --- 1. Insert this prerequisite course (e.g., "MATH 1426") ---
+                    writer.add(data_tuple_for_prereq)
+
+                    # --- 2. NOW, recursively find *its* prerequisites ---
+                    all_prereqs_for_prereq = prereqs_for_this_prereq_set.union(coreqs_for_this_prereq_set)
+                    if all_prereqs_for_prereq:
+                        # The 'department' for this recursive call is "MATH" (prereq_dept)
+                        find_prereqs(all_prereqs_for_prereq, prereq_dept, safe_table_name, cur, pages, writer)
+
                 if not found_course:
                     print(f"Warning: Could not find {prereq_course_id} on {prereq_dept} page.")
                     
@@ -246,19 +527,42 @@ def find_prereqs(prerequisites, main_course_department, safe_table_name, cur):
                 print(f"Recursive scrape error on {prereq_course_id}: {e}")
                 continue # Continue to the next prereq in the 'for' loop
 
+    if own_writer:
+        writer.flush()
+    if own_pages:
+        pages.close()
+
     # This function does not need to return anything.
     # Its only job is to find and insert.
     return
             
 
-def insert_courses(html_content, department):
-    
-    db_path = "SmartAdvisors/data/classes.db"
-    
-    db = sqlite3.connect(db_path)
+def create_course_table(cur, safe_table_name):
+    cur.execute(f"""CREATE TABLE IF NOT EXISTS {safe_table_name}(
+                                    Course_Num VARCHAR(10) NOT NULL PRIMARY KEY, 
+                                    Course_Name VARCHAR(100) NOT NULL, 
+                                    Pre_Requisites VARCHAR(200),
+                                    Co_Requisites VARCHAR(200),
+                                    Description VARCHAR(1000)
+                                    )""")
+
+def insert_courses(html_content, department, db_path="SmartAdvisors/data/classes.db", pages=None, db=None):
+    """
+    Scrapes one department page into ClassesFor<department>. Pass `db` (from
+    connect_for_load) to make this part of a bigger load transaction; the
+    caller then commits it with finish_load.
+    """
+    own_db = db is None
+    if own_db:
+        db = connect_for_load(db_path)
     cur = db.cursor()
     
-    list_of_titles, list_of_preqs, description = find_data(html_content)
+    # One memo of department pages for the whole run (see DepartmentPages)
+    own_pages = pages is None
+    if own_pages:
+        pages = DepartmentPages()
+    pages.add(department, html_content)
+    list_of_titles, list_of_preqs, description, _ = pages.get(department)
     
     print(f"Found {len(list_of_titles)} titles.")
     print(f"Found {len(list_of_preqs)} requisite lists.")
@@ -269,30 +573,23 @@ def insert_courses(html_content, department):
 
     # Creates the Classes Table if not already present
     try:
-        cur.execute(f"""CREATE TABLE IF NOT EXISTS {safe_table_name}(
-                                        Course_Num VARCHAR(10) NOT NULL PRIMARY KEY, 
-                                        Course_Name VARCHAR(100) NOT NULL, 
-                                        Pre_Requisites VARCHAR(200),
-                                        Co_Requisites VARCHAR(200),
-                                        Description VARCHAR(1000)
-                                        )""")
+        create_course_table(cur, safe_table_name)
     except Exception as e:
         print(f"Error creating table: {e}")
-        db.close()
+        if own_db:
+            finish_load(db, commit=False)
+        if own_pages:
+            pages.close()
         return
 
-    sql_insert = f"""
-        INSERT OR REPLACE INTO {safe_table_name} 
-        (Course_Num, Course_Name, Pre_Requisites,Co_Requisites, Description)
-        VALUES (?, ?, ?, ?, ?)
-    """
+    writer = CourseWriter(cur, safe_table_name)
     i = 0
     while i < len(list_of_titles):
         prereqs_set = list_of_preqs[i]["prereqs"] # Get the set
         coreqs_set = list_of_preqs[i]["coreqs"]   # Get the set
         
-        prereqs_str = ', '.join([str(item) for item in prereqs_set])
-        coreqs_str = ', '.join([str(item) for item in coreqs_set])
+        prereqs_str = list_of_preqs[i]["prereq_expr"]
+        coreqs_str = list_of_preqs[i]["coreq_expr"]
         
         # --- This is the Depth-First Search part ---
         # 1. First, find and insert all prerequisites for this course
@@ -300,7 +597,7 @@ def insert_courses(html_content, department):
         all_reqs_set = prereqs_set.union(coreqs_set)
         
         # Call the recursive function. It doesn't return anything.
-        find_prereqs(all_reqs_set, department, safe_table_name, cur)
+        find_prereqs(all_reqs_set, department, safe_table_name, cur, pages, writer)
         
         # 2. Now that all prerequisites are in the DB, insert the main course
         data = (
@@ -310,37 +607,235 @@ def insert_courses(html_content, department):
             str(coreqs_str),              # Co_Requisites 
             str(description[i]).strip()   # Description
         )
-        try:
-            cur.execute(sql_insert, data)
-            i += 1
-        except Exception as e:
-            print(f"Error inserting {data[0]}: {e}")
-            i += 1 # Increment to avoid an infinite loop on a failing row
+        writer.add(data)
+        i += 1
 
-    db.commit()
-    db.close()
+    writer.flush()
+    if own_db:
+        finish_load(db)
+    if own_pages:
+        pages.close()
+    print(f"Fetched {pages.fetches} other department page(s) for prerequisites.")
     print(f"Successfully processed and saved data for {department} to {db_path}")
-def get_html_content(department):
+
+def insert_departments(departments, db_path="SmartAdvisors/data/classes.db", pages=None):
+    """Full scrape of several departments in one load transaction."""
+    own_pages = pages is None
+    if own_pages:
+        pages = DepartmentPages()
+    db = connect_for_load(db_path)
+    try:
+        pages.prefetch(departments)
+        for department in departments:
+            page = pages.get(department)
+            if page is None:
+                print(f"Warning: Could not fetch {department}. Skipping.")
+                continue
+            insert_courses(None, department, db_path, pages, db)
+        db.commit()
+    finally:
+        finish_load(db, commit=False)
+        if own_pages:
+            pages.close()
+
+
+# --- Incremental refresh ---
+# classes.db keeps a content hash for every course block a department page
+# had at the last refresh, plus the page's ETag/Last-Modified, so a refresh
+# only reparses and rewrites blocks that were added, changed or removed.
+
+def block_hash(title, description):
+    """Content hash of one course block (title + description)."""
+    text = f"{title[0]}\n{title[1]}\n{description}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def create_refresh_tables(cur):
+    cur.execute("""CREATE TABLE IF NOT EXISTS CourseBlockHashes(
+                                    Department VARCHAR(10) NOT NULL,
+                                    Course_Num VARCHAR(10) NOT NULL,
+                                    Content_Hash CHAR(64) NOT NULL,
+                                    PRIMARY KEY (Department, Course_Num)
+                                    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS PageValidators(
+                                    Department VARCHAR(10) NOT NULL PRIMARY KEY,
+                                    ETag TEXT,
+                                    Last_Modified TEXT
+                                    )""")
+
+def refresh_department(department, db_path="SmartAdvisors/data/classes.db", pages=None):
+    """
+    Incremental version of get_html_content + insert_courses for one department.
+    Returns a summary dict (unchanged / added / updated / removed course counts),
+    or None when the page could not be fetched.
+
+    The first refresh of a department has no stored hashes to compare with
+    (initial_load): every block is re-extracted to record them, but courses
+    already in the table count as unchanged, not added.
+    """
+    summary = {'department': department, 'not_modified': False, 'initial_load': False,
+               'unchanged': 0, 'added': 0, 'updated': 0, 'removed': 0}
+    safe_table_name = re.sub(r'[^a-zA-Z0-9_]', '', f"ClassesFor{department}")
+
+    db = connect_for_load(db_path)
+    cur = db.cursor()
+    own_pages = pages is None
+    if own_pages:
+        pages = DepartmentPages()
+    try:
+        create_course_table(cur, safe_table_name)
+        create_refresh_tables(cur)
+        writer = CourseWriter(cur, safe_table_name)
+
+        cur.execute("SELECT Course_Num, Content_Hash FROM CourseBlockHashes WHERE Department = ?", (department,))
+        stored = dict(cur.fetchall())
+        cur.execute("SELECT ETag, Last_Modified FROM PageValidators WHERE Department = ?", (department,))
+        validators = cur.fetchone() or (None, None)
+
+        # Only ask "has it changed?" when we actually have the previous version stored
+        if not stored:
+            validators = (None, None)
+        status, html, etag, last_modified = fetch_page(department, *validators)
+        if status is None:
+            print(f"Warning: Could not fetch {department}; nothing refreshed.")
+            return None
+        if status == 304:
+            summary['not_modified'] = True
+            summary['unchanged'] = len(stored)
+            return summary
+
+        list_of_titles, description = find_blocks(html)
+        current = {}
+        for k, (title, desc) in enumerate(zip(list_of_titles, description)):
+            current.setdefault(title[0], (k, block_hash(title, desc)))
+
+        changed = [k for course_num, (k, h) in current.items() if stored.get(course_num) != h]
+        removed = [course_num for course_num in stored if course_num not in current]
+        summary['unchanged'] = len(current) - len(changed)
+        summary['initial_load'] = not stored
+        existing = set(writer.known)  # before find_prereqs adds other departments' courses
+
+        # NLP only for the blocks that changed
+        list_of_preqs = extract_requisites_batch([description[k] for k in changed])
+
+        hashes = []
+        for k, reqs in zip(changed, list_of_preqs):
+            prereqs_set = reqs["prereqs"]
+            coreqs_set = reqs["coreqs"]
+            find_prereqs(prereqs_set.union(coreqs_set), department, safe_table_name, cur, pages, writer)
+
+            course_num = list_of_titles[k][0]
+            data = (
+                course_num,
+                list_of_titles[k][1],
+                reqs["prereq_expr"],
+                reqs["coreq_expr"],
+                str(description[k]).strip()
+            )
+            writer.add(data)
+            hashes.append((department, course_num, current[course_num][1]))
+            if course_num in stored:
+                summary['updated'] += 1
+            elif summary['initial_load'] and course_num in existing:
+                summary['unchanged'] += 1  # no baseline to compare with, only recorded now
+            else:
+                summary['added'] += 1
+
+        writer.flush()
+        cur.executemany("INSERT OR REPLACE INTO CourseBlockHashes (Department, Course_Num, Content_Hash) VALUES (?, ?, ?)",
+                        hashes)
+
+        for course_num in removed:
+            writer.delete(course_num)
+            summary['removed'] += 1
+        cur.executemany("DELETE FROM CourseBlockHashes WHERE Department = ? AND Course_Num = ?",
+                        [(department, course_num) for course_num in removed])
+
+        cur.execute("INSERT OR REPLACE INTO PageValidators (Department, ETag, Last_Modified) VALUES (?, ?, ?)",
+                    (department, etag, last_modified))
+        db.commit()
+        return summary
+    finally:
+        # Anything not committed above (early return or error) is rolled back
+        finish_load(db, commit=False)
+        if own_pages:
+            pages.close()
+
+def print_refresh_summary(summaries):
+    print(f"{'Dept':<8}{'Unchanged':>10}{'Added':>8}{'Updated':>9}{'Removed':>9}")
+    for summary in summaries:
+        if summary is None:
+            continue
+        note = "  (304 Not Modified)" if summary['not_modified'] else ""
+        if summary['initial_load']:
+            note = "  (initial load: hashes recorded)"
+        print(f"{summary['department']:<8}{summary['unchanged']:>10}{summary['added']:>8}"
+              f"{summary['updated']:>9}{summary['removed']:>9}{note}")
+
+# Where department pages come from. Point CATALOG_BASE_URL at a local stand-in
+# server, or CATALOG_FIXTURE_DIR at a folder of saved <dept>.html pages, to
+# run the scraper offline.
+CATALOG_BASE_URL = os.getenv("CATALOG_BASE_URL", "https://catalog.uta.edu/coursedescriptions/")
+CATALOG_FIXTURE_DIR = os.getenv("CATALOG_FIXTURE_DIR")
+
+def fetch_page(department, etag=None, last_modified=None):
+    """
+    Downloads a department page, as a conditional request when validators
+    from a previous run are given.
+    Returns (status, html, etag, last_modified); status 304 means unchanged
+    (html is None), status None means the fetch failed.
+    """
     department = department.lower()
-    website = f"https://catalog.uta.edu/coursedescriptions/{department}"
+    if CATALOG_FIXTURE_DIR:
+        path = os.path.join(CATALOG_FIXTURE_DIR, f"{department}.html")
+        print(f"Reading fixture {path}...")
+        if not os.path.exists(path):
+            print(f"Error fetching fixture: {path} not found")
+            return None, None, None, None
+        with open(path, encoding="utf-8") as f:
+            return 200, f.read(), None, None
+
+    website = f"{CATALOG_BASE_URL.rstrip('/')}/{department}"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
 
     print(f"Requesting data from {website}...")
     try:
         response = requests.get(website, headers=headers)
+        if response.status_code == 304:
+            print("Not modified.")
+            return 304, None, etag, last_modified
         response.raise_for_status()  # Will raise an error for bad responses (404, 500, etc.)
         print("Success.")
-        return response.text
+        return response.status_code, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified')
     except requests.exceptions.RequestException as e:
         print(f"Error fetching URL: {e}")
-        return None
+        return None, None, None, None
+
+def get_html_content(department):
+    status, html, _, _ = fetch_page(department)
+    return html
 
 # --- Main execution ---
-department = "CSE" # Example department
-
-"""
-Insert the into the database for any department
-"""
-html = get_html_content(department)
-if html:
-    insert_courses(html, department)
\ No newline at end of file
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape UTA catalog departments into classes.db")
+    parser.add_argument("departments", nargs="*", default=["CSE"])  # Example department
+    parser.add_argument("--incremental", action="store_true",
+                        help="only reparse course blocks that changed since the last refresh")
+    parser.add_argument("--db", default="SmartAdvisors/data/classes.db")
+    args = parser.parse_args()
+
+    """
+    Insert the into the database for any department
+    """
+    if args.incremental:
+        pages = DepartmentPages()
+        summaries = [refresh_department(d, args.db, pages) for d in args.departments]
+        pages.close()
+        print_refresh_summary(summaries)
+    else:
+        insert_departments(args.departments, args.db)
@@ -0,0 +1,389 @@
+"""
+Single-file, read-only snapshot of everything a recommendation reads:
+every ClassesFor<Dept> table (classes.db), every offering (grades.sqlite)
+and the professors table.
+
+Build (re-run after the scraper, a new grades term or a professors update):
+    python -m app.scripts.snapshot [--out data/snapshot.bin]
+
+Layout: an 8-byte magic, the header length, a JSON header, then 8-byte
+aligned NumPy arrays. Strings are interned once into a shared string table
+(one UTF-8 blob + offsets) and columns hold integer ids into it; numbers are
+fixed-width int64/float64 arrays with a null mask. The server mmaps the file,
+so every worker reads the same page-cache copy and lookups need no SQL and
+no per-row dicts until a result is built.
+
+The header records the size/mtime of classes.db and grades.sqlite (and of
+the professors database) at build time. A snapshot whose sources changed
+since is ignored, and so is a missing one: callers then use the SQLite path.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .recommendation_engine import (
+    DATA_DIR,
+    DERIVED_TABLES,
+    OFFERING_COLUMNS,
+    get_classes_db_path,
+    get_grades_db_path,
+    offering_from_row,
+)
+from .records import Course, Offering, ProfessorRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SASNAP01'
+FORMAT_VERSION = 1
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH") or os.path.join(DATA_DIR, 'snapshot.bin')
+
+PROFESSOR_FIELDS = ('id', 'name', 'rating', 'difficulty', 'tags')
+OFFERING_FIELDS = ('subject_id', 'course_number', 'course_title', 'year', 'semester', 'course_gpa')
+
+
+def file_version(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+# --- Writing ---
+
+class _Builder:
+    def __init__(self):
+        self.string_ids = {}
+        self.strings = []
+        self.arrays = {}   # section name -> np.ndarray
+        self.columns = {}  # column name -> kind
+
+    def intern(self, text):
+        sid = self.string_ids.get(text)
+        if sid is None:
+            sid = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+    def column(self, name, values):
+        """Stores values with the narrowest kind that round-trips them exactly."""
+        present = [v for v in values if v is not None]
+        if all(type(v) is int for v in present):
+            kind = 'int'
+            self.arrays[name + '.values'] = np.array([v or 0 for v in values], dtype='<i8')
+        elif all(type(v) is float for v in present):
+            kind = 'float'
+            self.arrays[name + '.values'] = np.array([0.0 if v is None else v for v in values], dtype='<f8')
+        elif all(type(v) is str for v in present):
+            kind = 'str'
+        else:
+            kind = 'json'
+            values = [None if v is None else json.dumps(v) for v in values]
+        if kind in ('str', 'json'):
+            self.arrays[name + '.ids'] = np.array([-1 if v is None else self.intern(v) for v in values], dtype='<i4')
+        else:
+            self.arrays[name + '.null'] = np.array([v is None for v in values], dtype='u1')
+        self.columns[name] = kind
+
+    def array(self, name, values, dtype):
+        self.arrays[name] = np.asarray(values, dtype=dtype)
+
+    def write(self, path, header):
+        encoded = [s.encode('utf-8') for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        self.arrays['strings.blob'] = np.frombuffer(b''.join(encoded), dtype='u1')
+        self.arrays['strings.offsets'] = offsets
+
+        sections = {}
+        pos = 0
+        for name, arr in self.arrays.items():
+            sections[name] = {'dtype': arr.dtype.str, 'count': int(arr.size), 'offset': pos}
+            pos = _align(pos + arr.nbytes)
+
+        digest = hashlib.sha256()
+        for arr in self.arrays.values():
+            digest.update(arr.tobytes())
+        header = dict(header, format=FORMAT_VERSION, columns=self.columns, sections=sections,
+                      checksum=digest.hexdigest())
+        header_bytes = json.dumps(header).encode('utf-8')
+        data_start = _align(16 + len(header_bytes))
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(np.uint64(len(header_bytes)).tobytes())
+            f.write(header_bytes)
+            f.write(b'\0' * (data_start - 16 - len(header_bytes)))
+            for name, arr in self.arrays.items():
+                f.seek(data_start + sections[name]['offset'])
+                f.write(arr.tobytes())
+        # Atomic swap: running servers keep reading the old inode until they notice
+        os.replace(tmp_path, path)
+        return header
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build_snapshot(out_path=None, professor_rows=(), professors_version=None):
+    """
+    Compiles classes.db, grades.sqlite and the given professor rows
+    (id, name, rating, difficulty, tags) into one snapshot file.
+    """
+    out_path = out_path or SNAPSHOT_PATH
+    classes_path, grades_path = get_classes_db_path(), get_grades_db_path()
+    b = _Builder()
+
+    # Catalog: one set of columns per department, rows in table order (SELECT *)
+    departments = {}
+    conn = sqlite3.connect(classes_path)
+    try:
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'ClassesFor%' ORDER BY name")]
+        for table in tables:
+            dept = table[len('ClassesFor'):]
+            cur = conn.execute(f'SELECT * FROM {_quote(table)}')
+            names = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+            for i, col in enumerate(names):
+                b.column(f'catalog.{dept}.{col}', [row[i] for row in rows])
+            departments[dept] = {'columns': names, 'rows': len(rows)}
+    finally:
+        conn.close()
+
+    # Offerings: every term table in the order the per-table scan reads them,
+    # grouped by (subject_id, course_number)
+    groups = {}
+    conn = sqlite3.connect(grades_path)
+    try:
+        terms = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY rowid")
+                 if not r[0].startswith('sqlite') and r[0] not in DERIVED_TABLES]
+        for tbl in terms:
+            try:
+                rows = conn.execute(f'SELECT {OFFERING_COLUMNS} FROM {_quote(tbl)}').fetchall()
+            except sqlite3.Error:
+                continue
+            for row in rows:
+                groups.setdefault((row[0], row[1]), []).append(offering_from_row(row))
+    finally:
+        conn.close()
+
+    offerings = [o for group in groups.values() for o in group]
+    for field in OFFERING_FIELDS:
+        b.column(f'offerings.{field}', [o[field] for o in offerings])
+    instructor_ids, instructor_starts = [], [0]
+    for o in offerings:
+        instructor_ids.extend(b.intern(name) for name in o['instructors'])
+        instructor_starts.append(len(instructor_ids))
+    b.array('offerings.instructors', instructor_ids, '<i4')
+    b.array('offerings.instructor_starts', instructor_starts, '<i8')
+    b.array('offerings.keys', [b.intern(f"{subj}\0{num}") for subj, num in groups], '<i4')
+    b.array('offerings.group_starts', np.cumsum([0] + [len(g) for g in groups.values()]), '<i8')
+
+    # Professors, in table order (what .first() on the name queries relies on)
+    professor_rows = list(professor_rows)
+    for i, field in enumerate(PROFESSOR_FIELDS):
+        b.column(f'professors.{field}', [row[i] for row in professor_rows])
+
+    header = {
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sources': {
+            'classes': file_version(classes_path),
+            'grades': file_version(grades_path),
+            'professors': professors_version,
+        },
+        'departments': departments,
+        'offering_groups': len(groups),
+        'professors': len(professor_rows),
+    }
+    return b.write(out_path, header)
+
+
+# --- Reading ---
+
+class Snapshot:
+    """Read-only view over a memory-mapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        header_len = int(np.frombuffer(self._mm, dtype='<u8', count=1, offset=8)[0])
+        self.header = json.loads(self._mm[16:16 + header_len].decode('utf-8'))
+        if self.header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot format {self.header.get('format')}")
+        self.version = self.header['checksum'][:16]
+        data_start = _align(16 + header_len)
+        self._arrays = {
+            name: np.frombuffer(self._mm, dtype=s['dtype'], count=s['count'], offset=data_start + s['offset'])
+            for name, s in self.header['sections'].items()
+        }
+        self._blob_start = data_start + self.header['sections']['strings.blob']['offset']
+        self._offsets = self._arrays['strings.offsets']
+        # Decoded strings by id: values repeat a lot (terms, titles, instructors)
+        self._strings = {}
+
+        # code -> group number; the only per-process structure (a few thousand entries)
+        keys = self._arrays['offerings.keys'].tolist()
+        self._groups = {tuple(self.string(k).split('\0')): i for i, k in enumerate(keys)}
+
+    def string(self, sid):
+        text = self._strings.get(sid)
+        if text is None:
+            start, stop = self._offsets[sid:sid + 2].tolist()
+            text = self._strings[sid] = self._mm[self._blob_start + start:self._blob_start + stop].decode('utf-8')
+        return text
+
+    def _values(self, name, rows):
+        """Python values of one column for `rows` (a slice or an index array)."""
+        kind = self.header['columns'][name]
+        if kind in ('str', 'json'):
+            strings, string = self._strings, self.string
+            values = [None if sid < 0 else (strings.get(sid) or string(sid))
+                      for sid in self._arrays[name + '.ids'][rows].tolist()]
+            if kind == 'json':
+                values = [None if v is None else json.loads(v) for v in values]
+            return values
+        values = self._arrays[name + '.values'][rows].tolist()
+        nulls = self._arrays[name + '.null'][rows].tolist()
+        return [None if null else v for v, null in zip(values, nulls)]
+
+    def sources_match(self):
+        """False when classes.db or grades.sqlite changed after the snapshot was built."""
+        for role, path in (('classes', get_classes_db_path()), ('grades', get_grades_db_path())):
+            current = file_version(path)
+            if current is not None and current != self.header['sources'].get(role):
+                return False
+        return True
+
+    def department_courses(self, department):
+        """Same Course records as get_department_courses, or None if the department isn't in the snapshot."""
+        info = self.header['departments'].get(department)
+        if info is None:
+            return None
+        n = info['rows']
+
+        def column(col):
+            if col not in info['columns']:
+                return [None] * n
+            return self._values(f'catalog.{department}.{col}', slice(0, n))
+
+        def load_description(row):
+            return self._values(f'catalog.{department}.Description', slice(row, row + 1))[0]
+
+        if 'Description' not in info['columns']:
+            load_description = None
+        return [Course(*row, load_description, i) for i, row in enumerate(zip(
+            column('Course_Num'), column('Course_Name'), column('Pre_Requisites'), column('Co_Requisites')))]
+
+    def offerings_for(self, course_codes):
+        """Same result as get_offerings_for_courses: {code: [Offering, ...]}."""
+        starts = self._arrays['offerings.group_starts']
+        instr_starts = self._arrays['offerings.instructor_starts']
+        codes = list(dict.fromkeys(course_codes))
+        groups = [self._groups.get(tuple(code.split())) for code in codes]
+
+        # Every requested offering row, gathered once so each column is read in one call
+        bounds = [(int(starts[g]), int(starts[g + 1])) for g in groups if g is not None]
+        rows = np.array([i for start, stop in bounds for i in range(start, stop)], dtype=np.intp)
+        fields = [self._values(f'offerings.{f}', rows) for f in OFFERING_FIELDS]
+        first = instr_starts[rows].tolist()
+        last = instr_starts[rows + 1].tolist()
+        names = [self._strings.get(sid) or self.string(sid) for sid in
+                 self._arrays['offerings.instructors'][[j for a, b in zip(first, last) for j in range(a, b)]].tolist()]
+        offerings = []
+        pos = 0
+        for values, a, b in zip(zip(*fields), first, last):
+            offerings.append(Offering(*values, names[pos:pos + b - a]))
+            pos += b - a
+
+        result = {}
+        pos = 0
+        for code, group in zip(codes, groups):
+            if group is None:
+                result[code] = []
+                continue
+            count = int(starts[group + 1] - starts[group])
+            result[code] = offerings[pos:pos + count]
+            pos += count
+        return result
+
+    def professors_match(self, version):
+        """True when the professors were exported from the database file that is current now."""
+        recorded = self.header['sources'].get('professors')
+        return isinstance(version, tuple) and recorded is not None and list(version) == recorded
+
+    def professor_rows(self):
+        n = self.header['professors']
+        columns = [self._values(f'professors.{f}', slice(0, n)) for f in PROFESSOR_FIELDS]
+        return [ProfessorRecord(*row) for row in zip(*columns)]
+
+
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """The current snapshot, or None when there is none (or its sources changed)."""
+    global _snapshot, _snapshot_key
+    try:
+        st = os.stat(SNAPSHOT_PATH)
+    except OSError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _snapshot_key != key:
+        with _snapshot_lock:
+            if _snapshot_key != key:
+                try:
+                    _snapshot = Snapshot(SNAPSHOT_PATH)
+                except (OSError, ValueError) as e:
+                    logger.warning("Ignoring snapshot %s: %s", SNAPSHOT_PATH, e)
+                    _snapshot = None
+                _snapshot_key = key
+    if _snapshot is None or not _snapshot.sources_match():
+        return None
+    return _snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile classes.db, grades.sqlite and professors into one snapshot file")
+    parser.add_argument('--out', default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    # Professors come from the app's database (DATABASE_URL), like the server reads them
+    from app import create_app
+    from app.extensions import db
+    from app.models import Professor
+    from app.professor_index import _db_version
+
+    app = create_app()
+    with app.app_context():
+        rows = db.session.query(
+            Professor.id, Professor.name, Professor.rating, Professor.difficulty, Professor.tags
+        ).all()
+        version = _db_version()
+    header = build_snapshot(args.out, [tuple(r) for r in rows], list(version) if isinstance(version, tuple) else None)
+    size = os.path.getsize(args.out)
+    print(f"Wrote {args.out} ({size / 1024 / 1024:.1f} MB): {len(header['departments'])} departments, "
+          f"{header['offering_groups']} offered courses, {header['professors']} professors")
+
+
+if __name__ == "__main__":
+    main()
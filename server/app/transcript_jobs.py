@@ -0,0 +1,225 @@
+"""
+Background transcript parsing.
+
+POST /api/parse-transcript?async=1 hands the PDF to a bounded process pool
+and answers right away with a job id; GET /api/parse-transcript/<id> reports
+the job's status and, once done, its courses.
+
+Jobs live in a small SQLite file (TRANSCRIPT_JOBS_DB), not in process memory,
+so any gunicorn worker can answer the GET, and the pool process writes its
+own result. Uploads with the same bytes (sha256) share one job while it is
+queued or running, and reuse its result afterwards until the job expires.
+
+    status: queued -> running -> done | failed
+
+Each job records the worker that owns it (host + pid) and when it started.
+A job whose worker is gone (restart, deploy, OOM kill) or that is still
+unfinished after TRANSCRIPT_JOB_TIMEOUT is marked failed when it is next
+looked at, so new uploads of the same bytes start a fresh job instead of
+joining a dead one.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import Config
+from .scripts.parse_transcript import parse_courses
+
+JOBS_DB_PATH = Config.TRANSCRIPT_JOBS_DB or os.path.join(tempfile.gettempdir(), 'smartadvisors_transcript_jobs.sqlite')
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_pending = set()  # futures submitted by this process that haven't finished
+_host = socket.gethostname()
+
+
+class QueueFull(Exception):
+    """Too many jobs already waiting in this worker's pool."""
+
+
+def _connect():
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS transcript_jobs(
+                        id TEXT PRIMARY KEY,
+                        digest TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        courses TEXT,
+                        error TEXT,
+                        created REAL NOT NULL,
+                        finished REAL,
+                        owner_host TEXT,
+                        owner_pid INTEGER,
+                        started REAL
+                    )""")
+    # Jobs files from before the owner/started columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(transcript_jobs)")}
+    for column, kind in (('owner_host', 'TEXT'), ('owner_pid', 'INTEGER'), ('started', 'REAL')):
+        if column not in columns:
+            try:
+                conn.execute(f"ALTER TABLE transcript_jobs ADD COLUMN {column} {kind}")
+            except sqlite3.OperationalError:
+                pass  # another worker added it first
+    conn.execute("CREATE INDEX IF NOT EXISTS transcript_jobs_digest ON transcript_jobs(digest)")
+    return conn
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _is_dead(host, pid, created, started, now):
+    """An unfinished job that will never finish: too old, or its worker on this host is gone."""
+    if (started or created) < now - Config.TRANSCRIPT_JOB_TIMEOUT:
+        return True
+    return host == _host and pid is not None and not _pid_alive(pid)
+
+
+def _fail_dead_jobs(conn, now, job_id=None):
+    """Marks dead unfinished jobs (all of them, or just job_id) failed."""
+    sql = "SELECT id, owner_host, owner_pid, created, started FROM transcript_jobs WHERE finished IS NULL"
+    params = ()
+    if job_id is not None:
+        sql += " AND id = ?"
+        params = (job_id,)
+    dead = [row[0] for row in conn.execute(sql, params).fetchall() if _is_dead(*row[1:], now)]
+    conn.executemany(
+        "UPDATE transcript_jobs SET status = 'failed', error = ?, finished = ? WHERE id = ? AND finished IS NULL",
+        [("Parser worker stopped before finishing the job; please upload again", now, dead_id) for dead_id in dead],
+    )
+
+
+def _set_status(job_id, status, courses=None, error=None):
+    conn = _connect()
+    try:
+        if status in ('done', 'failed'):
+            conn.execute(
+                "UPDATE transcript_jobs SET status = ?, courses = ?, error = ?, finished = ? WHERE id = ?",
+                (status, json.dumps(courses) if courses is not None else None, error, time.time(), job_id),
+            )
+        else:
+            conn.execute("UPDATE transcript_jobs SET status = ?, started = ? WHERE id = ? AND status = 'queued'",
+                         (status, time.time(), job_id))
+    finally:
+        conn.close()
+
+
+def _run_job(job_id, data):
+    """Runs in a pool process: parse the PDF and store the outcome."""
+    _set_status(job_id, 'running')
+    try:
+        # Already inside a pool worker: parse the pages serially
+        courses = parse_courses(data, parallel=False)
+    except Exception as e:
+        _set_status(job_id, 'failed', error=f"Could not read PDF: {e}")
+        return
+    _set_status(job_id, 'done', courses=courses)
+
+
+def _get_pool():
+    """Lazily created per process (so gunicorn workers each get their own after fork)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=Config.TRANSCRIPT_JOB_WORKERS)
+            _pool_pid = os.getpid()
+            _pending.clear()
+        return _pool
+
+
+def _on_finished(job_id, future):
+    _pending.discard(future)
+    if future.cancelled() or future.exception() is not None:
+        # The pool process died (or never ran the job): don't leave it queued forever
+        error = 'cancelled' if future.cancelled() else str(future.exception())
+        _set_status(job_id, 'failed', error=f"Parser crashed: {error}")
+
+
+def job_view(row):
+    job_id, status, courses, error = row
+    view = {'jobId': job_id, 'status': status}
+    if status == 'done':
+        view['success'] = True
+        view['courses'] = json.loads(courses)
+    elif status == 'failed':
+        view['success'] = False
+        view['error'] = error
+    return view
+
+
+def submit(data, digest=None, cached_courses=None):
+    """
+    Starts (or joins) the job for these PDF bytes and returns its view.
+    cached_courses: an already known result for these bytes (transcript_cache),
+    which is recorded as a finished job without touching the pool.
+    """
+    digest = digest or hashlib.sha256(data).hexdigest()
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        _fail_dead_jobs(conn, now)
+        # Expired results, and unfinished rows long past the timeout (e.g. from an older version)
+        conn.execute("DELETE FROM transcript_jobs WHERE (finished IS NOT NULL AND finished < ?) "
+                     "OR (finished IS NULL AND created < ?)",
+                     (now - Config.TRANSCRIPT_JOB_TTL, now - Config.TRANSCRIPT_JOB_TIMEOUT - Config.TRANSCRIPT_JOB_TTL))
+        # Coalesce: same bytes already queued/running (by a live worker), or finished and not expired
+        row = conn.execute(
+            "SELECT id, status, courses, error FROM transcript_jobs WHERE digest = ? AND status != 'failed' "
+            "ORDER BY created DESC LIMIT 1", (digest,)
+        ).fetchone()
+        if row:
+            conn.execute("COMMIT")
+            return job_view(row)
+
+        job_id = uuid.uuid4().hex
+        if cached_courses is not None:
+            conn.execute(
+                "INSERT INTO transcript_jobs (id, digest, status, courses, created, finished) VALUES (?, ?, 'done', ?, ?, ?)",
+                (job_id, digest, json.dumps(cached_courses), now, now),
+            )
+            conn.execute("COMMIT")
+            return job_view((job_id, 'done', json.dumps(cached_courses), None))
+
+        pool = _get_pool()
+        if len(_pending) >= Config.TRANSCRIPT_JOB_MAX_PENDING:
+            conn.execute("ROLLBACK")
+            raise QueueFull()
+        conn.execute(
+            "INSERT INTO transcript_jobs (id, digest, status, created, owner_host, owner_pid) "
+            "VALUES (?, ?, 'queued', ?, ?, ?)",
+            (job_id, digest, now, _host, os.getpid()),
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    future = pool.submit(_run_job, job_id, data)
+    _pending.add(future)
+    future.add_done_callback(lambda f: _on_finished(job_id, f))
+    return {'jobId': job_id, 'status': 'queued'}
+
+
+def get_job(job_id):
+    """The job's view, or None for an unknown (or expired) id."""
+    conn = _connect()
+    try:
+        _fail_dead_jobs(conn, time.time(), job_id)
+        row = conn.execute("SELECT id, status, courses, error FROM transcript_jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return job_view(row) if row else None
@@ -0,0 +1,59 @@
+"""
+Optional startup warmup (APP_WARMUP=1).
+
+Without it every worker pays the cold costs on its first request: compiling
+each department's prerequisite graph, loading the professor name index (and
+the instructor_professor_map, when built) and checking the offerings index.
+warm_up() does all of that inside create_app.
+
+Under `gunicorn --preload` create_app runs once in the master, so the warmed
+catalogs and professor data are built once and shared copy-on-write by every
+forked worker:
+  - database handles are closed first, so no worker inherits a connection
+    (each reopens its own lazily)
+  - gc.freeze() moves the warmed objects out of the collector's generations;
+    otherwise the first collection in each worker would write to (and so
+    copy) every page holding them
+"""
+import gc
+import sys
+import time
+
+from .extensions import db
+from .professor_index import get_professor_index, mapped_professors
+from .cache import invalidate_if_data_changed
+from .scripts.catalog_graph import get_catalog_graph
+from .scripts.db_access import CATALOG, close_connections, table_names
+from .scripts.offerings_index import index_is_fresh
+from .scripts.snapshot import get_snapshot
+
+
+def department_names():
+    """Departments that have a ClassesFor<Dept> table in the catalog database (or in the snapshot)."""
+    snap = get_snapshot()
+    if snap is not None:
+        return sorted(snap.header['departments'])
+    return sorted(name[len('ClassesFor'):] for name in table_names(CATALOG) if name.startswith('ClassesFor'))
+
+
+def warm_up(app):
+    start = time.perf_counter()
+    with app.app_context():
+        departments = department_names()
+        for department in departments:
+            get_catalog_graph(department)
+        index = get_professor_index()
+        professors = len(index.professors)
+        mapped_professors(index)
+        index_is_fresh()
+        invalidate_if_data_changed()  # record the data version now, not on the first request
+
+        # Nothing connection-like may cross the fork
+        db.session.remove()
+        db.engine.dispose()
+    close_connections()
+
+    gc.collect()
+    gc.freeze()
+    print(f"Warmup: {len(departments)} catalog(s), {professors} professors "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
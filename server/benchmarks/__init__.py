@@ -0,0 +1,2 @@
+# Performance benchmarks for the recommendation path.
+# Run from the server/ folder, e.g.:  python -m benchmarks.eligibility
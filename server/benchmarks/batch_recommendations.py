@@ -0,0 +1,76 @@
+"""
+Benchmark: N calls to /api/recommendations vs one /api/recommendations/batch call.
+
+    python -m benchmarks.batch_recommendations [--cohort 200] [--department CE]
+
+Uses the Flask test client against the real data files. The recommendation
+caches are disabled so both sides do the full work, and the batch results
+are checked against the single-call results.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import time
+
+
+def make_cohort(courses, size, seed=0):
+    """Students share a handful of course histories and preference profiles, like a real cohort."""
+    rng = random.Random(seed)
+    histories = [rng.sample(courses, rng.randint(0, len(courses) // 2)) for _ in range(max(1, size // 10))]
+    keys = ['extraCredit', 'easyGrader', 'caring', 'lectureHeavy', 'groupProjects', 'testHeavy', 'popQuizzes']
+    profiles = [{k: rng.random() < 0.5 for k in keys} for _ in range(8)]
+    return [
+        {'id': f"s{i}", 'completed_courses': rng.choice(histories), 'preferences': rng.choice(profiles)}
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cohort', type=int, default=200)
+    parser.add_argument('--department', default='CE')
+    args = parser.parse_args()
+
+    os.environ['ELIGIBILITY_CACHE_SIZE'] = '0'
+    os.environ['RESULT_CACHE_SIZE'] = '0'
+    from app import create_app
+    from app.scripts.recommendation_engine import get_department_courses
+
+    app = create_app()
+    client = app.test_client()
+    courses = [c['Course_Num'] for c in get_department_courses(args.department)]
+    cohort = make_cohort(courses, args.cohort)
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        # Warm-up: catalog graph, professor index, pooled connections
+        client.post('/api/recommendations', data={'department': args.department})
+
+        start = time.perf_counter()
+        singles = []
+        for entry in cohort:
+            resp = client.post('/api/recommendations', data={
+                'department': args.department,
+                'completed_courses': json.dumps(entry['completed_courses']),
+                'preferences': json.dumps(entry['preferences']),
+            })
+            singles.append(resp.get_json()['recommendations'])
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resp = client.post('/api/recommendations/batch', json={'department': args.department, 'entries': cohort})
+        batch_time = time.perf_counter() - start
+
+    body = resp.get_json()
+    assert resp.status_code == 200, body
+    assert [r['recommendations'] for r in body['results']] == singles, "batch results differ from single calls"
+
+    print(f"cohort={args.cohort} unique histories={body['uniqueHistories']}")
+    print(f"  {args.cohort} single calls: {single_time * 1000:8.1f} ms  ({args.cohort / single_time:7.1f} students/s)")
+    print(f"  1 batch call:      {batch_time * 1000:8.1f} ms  ({args.cohort / batch_time:7.1f} students/s)")
+
+
+if __name__ == "__main__":
+    main()
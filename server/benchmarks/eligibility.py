@@ -0,0 +1,99 @@
+"""
+Benchmark: filter_eligible_courses_unique (string based) vs CatalogGraph (bitmask based).
+
+    python -m benchmarks.eligibility [--courses 5000] [--transcripts 200] [--or-rate 0.3]
+
+Checks that both return the same eligible courses (same order) for every
+transcript, then prints per-transcript timings for ClassesForCE, ClassesForCSE,
+a synthetic catalog of comma-joined (all required) requisites, and the same
+catalog with --or-rate of its requisites written as "A or B" alternatives.
+"""
+import argparse
+import random
+import time
+
+from app.scripts.recommendation_engine import get_department_courses, filter_eligible_courses_unique
+from app.scripts.catalog_graph import CatalogGraph
+
+
+def synthetic_catalog(n_courses, seed=0, or_rate=0.0):
+    """
+    Random layered catalog: each course's prereqs/coreqs come from lower-numbered courses.
+    With or_rate, that share of the prereqs get an alternative ("CE 1002 or EE 1004").
+    """
+    rng = random.Random(seed)
+    depts = ['CE', 'CSE', 'EE', 'ME', 'MATH', 'PHYS', 'CHEM', 'IE', 'MAE', 'BE']
+    codes = []
+    for i in range(n_courses):
+        codes.append(f"{depts[i % len(depts)]} {1000 + i // len(depts):04d}")
+
+    courses = []
+    for i, code in enumerate(codes):
+        earlier = codes[:i]
+        prereqs = rng.sample(earlier, min(len(earlier), rng.randint(0, 3)))
+        coreqs = rng.sample(earlier, min(len(earlier), rng.randint(0, 1)))
+        # A few requisites outside the catalog, like MATH/PHYS in ClassesForCE
+        if rng.random() < 0.05:
+            prereqs.append(f"OUT {rng.randint(1000, 4999)}")
+        if or_rate and earlier:
+            prereqs = [f"{p} or {rng.choice(earlier)}" if rng.random() < or_rate else p for p in prereqs]
+        courses.append({
+            'Course_Num': code,
+            'Course_Name': f"Course {code}",
+            'Pre_Requisites': ', '.join(prereqs),
+            'Co_Requisites': ', '.join(coreqs),
+            'Description': '',
+        })
+    return courses
+
+
+def random_transcripts(all_courses, n, seed=1):
+    rng = random.Random(seed)
+    codes = [c['Course_Num'] for c in all_courses]
+    return [rng.sample(codes, rng.randint(0, len(codes) // 2)) for _ in range(n)]
+
+
+def bench(label, all_courses, transcripts):
+    start = time.perf_counter()
+    expected = [filter_eligible_courses_unique(all_courses, t) for t in transcripts]
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = CatalogGraph(all_courses)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [graph.eligible_courses(t) for t in transcripts]
+    new_time = time.perf_counter() - start
+
+    for e, a in zip(expected, actual):
+        assert list(e.items()) == list(a.items()), f"{label}: CatalogGraph result differs"
+
+    n = len(transcripts)
+    print(f"{label:<22} courses={len(all_courses):<6} "
+          f"strings={old_time / n * 1000:8.3f} ms  "
+          f"bitmask={new_time / n * 1000:8.3f} ms  "
+          f"build={build_time * 1000:7.1f} ms  "
+          f"speedup={old_time / new_time:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--courses', type=int, default=5000)
+    parser.add_argument('--transcripts', type=int, default=200)
+    parser.add_argument('--or-rate', type=float, default=0.3, help='share of synthetic prereqs with an alternative')
+    args = parser.parse_args()
+
+    for dept in ['CE', 'CSE']:
+        courses = get_department_courses(dept)
+        bench(f"ClassesFor{dept}", courses, random_transcripts(courses, args.transcripts))
+
+    courses = synthetic_catalog(args.courses)
+    bench("synthetic", courses, random_transcripts(courses, max(1, args.transcripts // 10)))
+
+    courses = synthetic_catalog(args.courses, or_rate=args.or_rate)
+    bench("synthetic (and/or)", courses, random_transcripts(courses, max(1, args.transcripts // 10)))
+
+
+if __name__ == "__main__":
+    main()
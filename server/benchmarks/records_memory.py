@@ -0,0 +1,145 @@
+"""
+Benchmark: memory held by the loaded catalog, offerings and professors,
+plain dicts / ORM objects vs the __slots__ records in app/scripts/records.py.
+
+    python -m benchmarks.records_memory [--size small|medium|large]
+
+Loads every ClassesFor<Dept> table and every row of every grades term, and
+the professors table, once each way, and reports the bytes still allocated
+afterwards (tracemalloc, after a gc.collect()):
+
+  catalog     dict per row (SELECT *)        vs Course (Description lazy)
+  offerings   dict per row, list of names    vs Offering (interned strings)
+  professors  Professor ORM instances        vs ProfessorRecord
+
+Without --size it reads the app's own data (DATA_DIR / DATABASE_URL); with it
+a synthetic dataset (benchmarks/synthetic.py) in a temp folder. The snapshot
+is ignored either way, so both sides read SQLite.
+"""
+import argparse
+import gc
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+
+from . import synthetic
+from .suite import SIZES
+
+
+def measure(load):
+    """Bytes still allocated by what load() returns, and the object itself (kept alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = load()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, data
+
+
+def term_tables(conn, skip):
+    return [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY rowid")
+            if not r[0].startswith('sqlite') and r[0] not in skip]
+
+
+def run():
+    # Imported here: the app reads DATA_DIR / DATABASE_URL / SNAPSHOT_PATH at import time
+    from app import create_app
+    from app.extensions import db
+    from app.models import Professor
+    from app.scripts.records import ProfessorRecord
+    from app.scripts.recommendation_engine import (
+        DERIVED_TABLES, OFFERING_COLUMNS, get_classes_db_path, get_department_courses, get_grades_db_path,
+        offering_from_row,
+    )
+    from app.warmup import department_names
+
+    conn = sqlite3.connect(get_classes_db_path())
+    departments = department_names()
+
+    def catalog_dicts():
+        out = []
+        for dept in departments:
+            cur = conn.execute(f'SELECT * FROM ClassesFor{dept}')
+            columns = [d[0] for d in cur.description]
+            out.append([dict(zip(columns, row)) for row in cur.fetchall()])
+        return out
+
+    def catalog_records():
+        return [get_department_courses(dept) for dept in departments]
+
+    grades = sqlite3.connect(get_grades_db_path())
+    terms = term_tables(grades, DERIVED_TABLES)
+
+    def grade_rows():
+        for tbl in terms:
+            try:
+                yield from grades.execute(f'SELECT {OFFERING_COLUMNS} FROM "{tbl}"')
+            except sqlite3.Error:
+                continue
+
+    def offering_dicts():
+        # What offering_from_row built before it returned Offering records
+        return [{
+            'subject_id': row[0], 'course_number': row[1], 'course_title': row[2],
+            'year': row[3], 'semester': row[4], 'course_gpa': row[9],
+            'instructors': [n for n in row[5:10] if n and str(n).strip() and str(n).strip().lower() != 'none'],
+        } for row in grade_rows()]
+
+    def offering_records():
+        return [offering_from_row(row) for row in grade_rows()]
+
+    app = create_app()
+    results = []
+    with app.app_context():
+        def professors_orm():
+            rows = Professor.query.all()
+            db.session.expunge_all()  # the identity map would otherwise keep them alive for both sides
+            return rows
+
+        def professors_records():
+            return [ProfessorRecord(*row) for row in db.session.query(
+                Professor.id, Professor.name, Professor.rating, Professor.difficulty, Professor.tags)]
+
+        for label, old, new in (
+            ('catalog', catalog_dicts, catalog_records),
+            ('offerings', offering_dicts, offering_records),
+            ('professors', professors_orm, professors_records),
+        ):
+            old_bytes, old_data = measure(old)
+            new_bytes, new_data = measure(new)
+            count = sum(len(x) for x in new_data) if label == 'catalog' else len(new_data)
+            results.append((label, count, old_bytes, new_bytes))
+            del old_data, new_data
+
+    print(f"{len(departments)} departments, {len(terms)} grade terms")
+    print(f"{'':<12}{'rows':>9}{'before':>12}{'after':>12}{'saved':>8}")
+    total_old = total_new = 0
+    for label, count, old_bytes, new_bytes in results:
+        total_old += old_bytes
+        total_new += new_bytes
+        print(f"{label:<12}{count:>9}{old_bytes / 1024:>9.0f} KB{new_bytes / 1024:>9.0f} KB"
+              f"{1 - new_bytes / old_bytes:>8.0%}")
+    print(f"{'total':<12}{'':>9}{total_old / 1024:>9.0f} KB{total_new / 1024:>9.0f} KB{1 - total_new / total_old:>8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=sorted(SIZES), help='use a synthetic dataset of this size')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['SNAPSHOT_PATH'] = os.path.join(tmp, 'no-snapshot.bin')
+        if args.size:
+            sizes = SIZES[args.size]
+            synthetic.make_dataset(tmp, sizes['departments'], sizes['courses'], sizes['professors'],
+                                   sizes['terms'], sizes['max_sections'])
+            os.environ['DATA_DIR'] = tmp
+            os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'professors.db')}"
+        run()
+
+
+if __name__ == '__main__':
+    main()
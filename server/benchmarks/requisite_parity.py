@@ -0,0 +1,89 @@
+"""
+Accuracy-parity and speed check for requisite extraction modes.
+
+    python -m benchmarks.requisite_parity [--modes lg sentencizer]
+
+The current output is what the scraper stored in data/classes.db for
+ClassesForCE and ClassesForCSE (Pre_Requisites / Co_Requisites, extracted
+from the stored Description). Each mode re-extracts requisites from those
+descriptions with extract_requisites_batch() and reports how many courses
+get exactly the same prereq and coreq sets (every course mentioned, required
+or an alternative), plus the time taken. "lg
+(unbatched)" is the old one-document-at-a-time call on the full model.
+"""
+import argparse
+import sqlite3
+import time
+
+from app.scripts import scraping
+from app.scripts.recommendation_engine import get_classes_db_path
+from app.scripts.requisites import requisite_codes
+
+
+def stored_rows(department):
+    conn = sqlite3.connect(get_classes_db_path())
+    try:
+        return conn.execute(
+            f"SELECT Course_Num, Description, Pre_Requisites, Co_Requisites FROM ClassesFor{department}"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def as_set(req_str):
+    return set(requisite_codes(req_str))
+
+
+def unbatched_lg(descriptions):
+    """The old path: full en_core_web_lg pipeline, one nlp() call per description."""
+    nlp = scraping.spacy.load("en_core_web_lg")
+    results = []
+    for text in descriptions:
+        block = scraping._requisite_block(text)
+        if block is None:
+            results.append({"prereqs": set(), "coreqs": set()})
+        else:
+            results.append(scraping._requisites_from_doc(nlp(block[0]), block[1]))
+    return results
+
+
+def compare(label, rows, extract):
+    descriptions = [row[1] or '' for row in rows]
+    scraping._requisite_cache.clear()
+    start = time.perf_counter()
+    results = extract(descriptions)
+    elapsed = time.perf_counter() - start
+
+    same = 0
+    mismatches = []
+    for (course, _, pre, co), got in zip(rows, results):
+        if got["prereqs"] == as_set(pre) and got["coreqs"] == as_set(co):
+            same += 1
+        else:
+            mismatches.append(course)
+    print(f"  {label:<18} parity={same}/{len(rows)} ({same / len(rows):6.1%})  time={elapsed * 1000:8.1f} ms")
+    for course in mismatches[:5]:
+        print(f"      differs: {course}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='*', default=['lg', 'sentencizer'])
+    parser.add_argument('--departments', nargs='*', default=['CE', 'CSE'])
+    args = parser.parse_args()
+
+    if 'lg' in args.modes and not scraping.spacy.util.is_package("en_core_web_lg"):
+        print("en_core_web_lg is not installed; skipping the lg modes")
+        args.modes = [m for m in args.modes if m != 'lg']
+
+    for department in args.departments:
+        rows = stored_rows(department)
+        print(f"ClassesFor{department} ({len(rows)} courses)")
+        if 'lg' in args.modes:
+            compare("lg (unbatched)", rows, unbatched_lg)
+        for mode in args.modes:
+            compare(mode, rows, lambda descs, mode=mode: scraping.extract_requisites_batch(descs, mode))
+
+
+if __name__ == "__main__":
+    main()
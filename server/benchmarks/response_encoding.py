@@ -0,0 +1,108 @@
+"""
+Benchmark: encoding and transfer size of /api/recommendations responses.
+
+    python -m benchmarks.response_encoding [--students 40] [--department CE] [--repeat 5]
+
+Uses the Flask test client against the real data files and a set of random
+course histories / preference profiles. Per response it reports:
+
+  encode      stdlib json.dumps (Flask's default provider) vs app.json
+              (orjson when installed); both must give the same JSON, and
+              the same bytes apart from non-ASCII text (Flask writes \\uXXXX
+              escapes, orjson raw UTF-8)
+  transfer    body size sent as identity, gzip and (if installed) br,
+              and the CPU spent compressing
+  revalidate  the same requests again as GETs with If-None-Match: all must be 304
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import time
+
+from .batch_recommendations import make_cohort
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=40)
+    parser.add_argument('--department', default='CE')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.responses import brotli, orjson
+    from app.scripts.recommendation_engine import get_department_courses
+
+    app = create_app()
+    client = app.test_client()
+    courses = [c['Course_Num'] for c in get_department_courses(args.department)]
+    forms = [{
+        'department': args.department,
+        'completed_courses': json.dumps(entry['completed_courses']),
+        'preferences': json.dumps(entry['preferences']),
+    } for entry in make_cohort(courses, args.students)]
+
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        responses = [client.post('/api/recommendations', data=form) for form in forms]
+    payloads = [resp.get_json() for resp in responses]
+    bodies = [resp.get_data() for resp in responses]
+
+    # --- Encode ---
+    def stdlib():
+        return [(json.dumps(p, sort_keys=True, separators=(',', ':')) + '\n').encode() for p in payloads]
+
+    def stdlib_utf8():
+        return [(json.dumps(p, sort_keys=True, separators=(',', ':'), ensure_ascii=False) + '\n').encode()
+                for p in payloads]
+
+    def provider():
+        with app.app_context():
+            return [app.json.response(p).get_data() for p in payloads]
+
+    assert [json.loads(b) for b in provider()] == payloads, "app.json output decodes differently"
+    if orjson is not None:
+        assert stdlib_utf8() == provider() == bodies, "app.json output differs from json.dumps beyond escaping"
+    else:
+        assert stdlib() == provider() == bodies, "app.json output differs from Flask's default encoder"
+    old, new = best_of(args.repeat, stdlib), best_of(args.repeat, provider)
+    print(f"{len(payloads)} responses, {sum(map(len, bodies)) / len(bodies) / 1024:.1f} KiB on average; "
+          f"best of {args.repeat}")
+    print(f"encode        json {old * 1000:.2f} ms   app.json ({'orjson' if orjson else 'json'}) "
+          f"{new * 1000:.2f} ms   {old / new:.1f}x")
+
+    # --- Transfer ---
+    encodings = [
+        ('identity', lambda b: b),
+        ('gzip', lambda b: gzip.compress(b, compresslevel=app.config['RESPONSE_GZIP_LEVEL'], mtime=0)),
+    ]
+    if brotli is not None:
+        encodings.append(('br', lambda b: brotli.compress(b, quality=app.config['RESPONSE_BROTLI_QUALITY'])))
+    total = sum(map(len, bodies))
+    for name, compress in encodings:
+        size = sum(len(compress(b)) for b in bodies)
+        elapsed = best_of(args.repeat, lambda: [compress(b) for b in bodies])
+        print(f"{name:<14}{size / 1024:>9.1f} KiB  {size / total:>6.1%}  {elapsed * 1000:>8.2f} ms")
+
+    # --- Revalidate ---
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        etags = [client.get('/api/recommendations', query_string=form).headers['ETag'] for form in forms]
+        statuses = [client.get('/api/recommendations', query_string=form, headers={'If-None-Match': etag})
+                    .status_code for form, etag in zip(forms, etags)]
+    assert statuses == [304] * len(forms), statuses
+    print(f"revalidate    {len(forms)} x 304, {total / 1024:.1f} KiB of bodies not resent")
+
+
+if __name__ == '__main__':
+    main()
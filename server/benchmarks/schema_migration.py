@@ -0,0 +1,186 @@
+"""
+Benchmark: recommendation-path queries before and after `flask db upgrade`
+(typed professor columns, lower(name) index, course_requisites edges).
+
+    python -m benchmarks.schema_migration [--size small|medium|large] [--repeat 5]
+
+Copies professors.db, classes.db and grades.sqlite (the app's own, or a
+synthetic dataset with --size) into a temp folder, times the queries on the scraper's schema,
+runs the migrations with Flask-Migrate, and times them again:
+
+  professors     load every rating and turn it into numbers
+                 (before: TEXT, "N/A" and "85%" parsed in Python)
+  name lookups   WHERE lower(name) = ? for every professor name
+                 (before: full scan per lookup, after: ix_professors_name_lower)
+  required by    "which courses list X as a prerequisite?" for every course
+                 (before: LIKE over every ClassesFor<Dept>, after: the edge table)
+
+Both sides must return the same answers.
+"""
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from . import synthetic
+from .suite import SIZES
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def as_number(value):
+    """What callers did with the TEXT columns: '4.5' -> 4.5, '85%' -> 85.0, 'N/A' -> None."""
+    if value is None:
+        return None
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except ValueError:
+        return None
+
+
+def catalog_tables(conn):
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'ClassesFor%' ORDER BY name")]
+
+
+def course_codes(conn):
+    codes = set()
+    for table in catalog_tables(conn):
+        for (num,) in conn.execute(f'SELECT Course_Num FROM "{table}"'):
+            codes.add(' '.join(str(num).replace('\xa0', ' ').split()))
+    return sorted(codes)
+
+
+# --- Queries, scraper schema ---
+
+def professors_before(conn):
+    return [(pid, as_number(q), as_number(d), as_number(n), as_number(w)) for pid, q, d, n, w in conn.execute(
+        "SELECT id, quality_rating, difficulty_rating, total_ratings, would_take_again FROM professors")]
+
+
+def required_by_before(conn, tables, codes):
+    out = {}
+    for code in codes:
+        found = set()
+        for table in tables:
+            dept = table[len('ClassesFor'):]
+            for num, pre in conn.execute(f'SELECT Course_Num, Pre_Requisites FROM "{table}" WHERE Pre_Requisites LIKE ?',
+                                         (f'%{code}%',)):
+                # LIKE only narrows it down: "CSE 1310" also matches "CSE 13100"
+                pieces = re.split(r'[(),]|\b(?:and|or)\b', str(pre).replace('\xa0', ' '))
+                if code in [' '.join(p.split()) for p in pieces]:
+                    found.add((dept, ' '.join(str(num).replace('\xa0', ' ').split())))
+        out[code] = sorted(found)
+    return out
+
+
+# --- Queries, migrated schema ---
+
+def professors_after(conn):
+    return [(pid, q, d, None if n is None else float(n), w) for pid, q, d, n, w in conn.execute(
+        "SELECT id, quality_rating, difficulty_rating, total_ratings, would_take_again FROM professors")]
+
+
+def required_by_after(conn, codes):
+    return {code: sorted(set(conn.execute(
+        "SELECT department, course_num FROM course_requisites WHERE requisite = ? AND kind = 'pre'", (code,))))
+        for code in codes}
+
+
+def name_lookups(conn, names):
+    return [conn.execute("SELECT id FROM professors WHERE lower(name) = ?", (name,)).fetchall() for name in names]
+
+
+def time_queries(folder, repeat, names, codes, migrated):
+    professors = sqlite3.connect(os.path.join(folder, 'professors.db'))
+    classes = sqlite3.connect(os.path.join(folder, 'classes.db'))
+    tables = catalog_tables(classes)
+    if migrated:
+        runs = [
+            ('professors', lambda: professors_after(professors)),
+            ('name lookups', lambda: name_lookups(professors, names)),
+            ('required by', lambda: required_by_after(classes, codes)),
+        ]
+    else:
+        runs = [
+            ('professors', lambda: professors_before(professors)),
+            ('name lookups', lambda: name_lookups(professors, names)),
+            ('required by', lambda: required_by_before(classes, tables, codes)),
+        ]
+    results = {label: best_of(repeat, fn) for label, fn in runs}
+    professors.close()
+    classes.close()
+    return results
+
+
+def migrate():
+    # Imported here: the app reads DATA_DIR / DATABASE_URL at import time
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+
+
+def run(source, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('professors.db', 'classes.db', 'grades.sqlite'):
+            shutil.copy(os.path.join(source, name), os.path.join(tmp, name))
+        os.environ['DATA_DIR'] = tmp
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'professors.db')}"
+
+        with sqlite3.connect(os.path.join(tmp, 'professors.db')) as conn:
+            names = sorted({str(n).lower() for (n,) in conn.execute("SELECT name FROM professors") if n})
+        with sqlite3.connect(os.path.join(tmp, 'classes.db')) as conn:
+            codes = course_codes(conn)
+
+        before = time_queries(tmp, repeat, names, codes, migrated=False)
+        start = time.perf_counter()
+        migrate()
+        migration_time = time.perf_counter() - start
+        after = time_queries(tmp, repeat, names, codes, migrated=True)
+
+    print(f"{len(names)} professor names, {len(codes)} courses; best of {repeat}; "
+          f"migration took {migration_time * 1000:.0f} ms")
+    print(f"{'':<14}{'before':>11}{'after':>11}{'speedup':>9}")
+    for label in before:
+        old, old_result = before[label]
+        new, new_result = after[label]
+        assert old_result == new_result, f"{label}: results differ after the migration"
+        print(f"{label:<14}{old * 1000:>8.1f} ms{new * 1000:>8.1f} ms{old / new:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=sorted(SIZES), help='use a synthetic dataset of this size')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.size:
+        with tempfile.TemporaryDirectory() as tmp:
+            sizes = SIZES[args.size]
+            synthetic.make_dataset(tmp, sizes['departments'], sizes['courses'], sizes['professors'],
+                                   sizes['terms'], sizes['max_sections'])
+            run(tmp, args.repeat)
+    else:
+        # Same default as recommendation_engine.DATA_DIR, without importing the app before run() sets it
+        default = os.path.join(os.path.dirname(MIGRATIONS), '..', 'data')
+        run(os.path.abspath(os.getenv('DATA_DIR') or default), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
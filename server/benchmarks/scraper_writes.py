@@ -0,0 +1,169 @@
+"""
+Benchmark: scraper write path, one execute per row vs buffered bulk writes.
+
+    python -m benchmarks.scraper_writes [--departments 8] [--courses 120]
+
+Generates synthetic catalog pages (every course lists a couple of lower-level
+prerequisites, some in other departments), parses them once, then times a
+multi-department scrape into a fresh classes.db two ways:
+
+  before: the old insert_courses/find_prereqs write loop, one connection and
+          commit per department (SELECT 1 existence check per prerequisite,
+          cur.execute per row, default pragmas)
+  after:  insert_departments() (CourseWriter + one WAL load transaction)
+
+Page parsing is shared and done up front, so only the database work differs.
+Both runs must leave identical tables.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from app.scripts import scraping
+
+
+def make_pages(folder, n_departments, n_courses, seed=0):
+    rng = random.Random(seed)
+    departments = [f"D{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(n_departments)]
+    numbers = sorted(rng.sample(range(1100, 4999), n_courses))
+    for dept in departments:
+        blocks = []
+        for k, num in enumerate(numbers):
+            desc = "Synthetic course description."
+            if k:
+                reqs = {f"{dept} {numbers[rng.randrange(k)]}"}
+                if rng.random() < 0.5:
+                    reqs.add(f"{rng.choice(departments)} {numbers[rng.randrange(k)]}")
+                desc += f" Prerequisite: {' and '.join(sorted(reqs))}."
+            blocks.append(
+                f'<div class="courseblock"><p class="courseblocktitle">{dept} {num}. Course {num}. (3-0) 3</p>'
+                f'<p class="courseblockdesc">{desc}</p></div>'
+            )
+        with open(os.path.join(folder, f"{dept.lower()}.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body>" + "".join(blocks) + "</body></html>")
+    return departments
+
+
+# --- The write path before bulk writes, kept here for comparison ---
+
+def legacy_find_prereqs(prerequisites, main_course_department, safe_table_name, cur, pages):
+    sql_insert = f"""
+        INSERT OR REPLACE INTO {safe_table_name}
+        (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    needed = []
+    for prereq_course_id in prerequisites:
+        if main_course_department not in str(prereq_course_id):
+            cur.execute(f"SELECT 1 FROM {safe_table_name} WHERE Course_Num = ?", (prereq_course_id,))
+            if not cur.fetchone():
+                needed.append(prereq_course_id.split(" ")[0])
+    pages.prefetch(needed)
+
+    for prereq_course_id in prerequisites:
+        if main_course_department in str(prereq_course_id):
+            continue
+        cur.execute(f"SELECT 1 FROM {safe_table_name} WHERE Course_Num = ?", (prereq_course_id,))
+        if cur.fetchone():
+            continue
+        prereq_dept = prereq_course_id.split(" ")[0]
+        page = pages.get(prereq_dept)
+        if not page:
+            continue
+        new_titles, new_preqs, new_descs, by_code = page
+        k = by_code.get(prereq_course_id)
+        if k is None:
+            continue
+        cur.execute(sql_insert, (
+            new_titles[k][0], new_titles[k][1],
+            ', '.join(new_preqs[k]["prereqs"]), ', '.join(new_preqs[k]["coreqs"]),
+            str(new_descs[k]).strip(),
+        ))
+        reqs = new_preqs[k]["prereqs"].union(new_preqs[k]["coreqs"])
+        if reqs:
+            legacy_find_prereqs(reqs, prereq_dept, safe_table_name, cur, pages)
+
+
+def legacy_insert_courses(department, db_path, pages):
+    db = sqlite3.connect(db_path)
+    cur = db.cursor()
+    list_of_titles, list_of_preqs, description, _ = pages.get(department)
+    safe_table_name = f"ClassesFor{department}"
+    scraping.create_course_table(cur, safe_table_name)
+    sql_insert = f"""
+        INSERT OR REPLACE INTO {safe_table_name}
+        (Course_Num, Course_Name, Pre_Requisites,Co_Requisites, Description)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    for i in range(len(list_of_titles)):
+        prereqs_set = list_of_preqs[i]["prereqs"]
+        coreqs_set = list_of_preqs[i]["coreqs"]
+        legacy_find_prereqs(prereqs_set.union(coreqs_set), department, safe_table_name, cur, pages)
+        cur.execute(sql_insert, (
+            list_of_titles[i][0], list_of_titles[i][1],
+            ', '.join(str(x) for x in prereqs_set), ', '.join(str(x) for x in coreqs_set),
+            str(description[i]).strip(),
+        ))
+    db.commit()
+    db.close()
+
+
+def dump(db_path, departments):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {d: conn.execute(f"SELECT * FROM ClassesFor{d} ORDER BY rowid").fetchall() for d in departments}
+    finally:
+        conn.close()
+
+
+def timed(label, departments, run, db_path):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(departments, db_path)
+    elapsed = time.perf_counter() - start
+    rows = sum(len(t) for t in dump(db_path, departments).values())
+    print(f"  {label:<8} {elapsed * 1000:9.1f} ms   {rows} rows   {rows / elapsed:10.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--departments', type=int, default=8)
+    parser.add_argument('--courses', type=int, default=120)
+    parser.add_argument('--nlp-mode', default='sentencizer')
+    args = parser.parse_args()
+
+    scraping.NLP_MODE = args.nlp_mode
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "pages")
+        os.mkdir(fixtures)
+        departments = make_pages(fixtures, args.departments, args.courses)
+        scraping.CATALOG_FIXTURE_DIR = fixtures
+
+        # Parse every page once up front; both runs share the memo
+        pages = scraping.DepartmentPages()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages.prefetch(departments)
+            for dept in departments:
+                pages.get(dept)
+
+        print(f"{args.departments} departments x {args.courses} courses")
+        before_db = os.path.join(tmp, "before.db")
+        after_db = os.path.join(tmp, "after.db")
+        before = timed("before", departments,
+                       lambda ds, p: [legacy_insert_courses(d, p, pages) for d in ds], before_db)
+        after = timed("after", departments,
+                      lambda ds, p: scraping.insert_departments(ds, p, pages), after_db)
+        pages.close()
+
+        same = dump(before_db, departments) == dump(after_db, departments)
+        print(f"  speedup  {before / after:.1f}x   identical tables: {same}")
+
+
+if __name__ == '__main__':
+    main()
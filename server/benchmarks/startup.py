@@ -0,0 +1,156 @@
+"""
+Benchmark: app cold start, first-request latency and per-worker memory.
+
+    python -m benchmarks.startup [--workers 3] [--runs 3]
+
+Each measurement runs in a fresh interpreter:
+
+  eager parsers   imports pdfplumber/pypdfium2 before create_app (what every
+                  worker paid before the parsers were imported lazily)
+  lazy            create_app as it is now
+  lazy + warmup   create_app with APP_WARMUP=1
+
+"startup" is import + create_app, "first request" one /api/recommendations
+call right after, "rss" the process RSS after that request.
+
+The preload part forks --workers children from one master, the way
+`gunicorn --preload` does, and has each child serve a request:
+
+  warm per worker   master only creates the app; each worker warms itself
+  preload + warmup  master warms (APP_WARMUP=1); workers share those pages
+
+Private memory (Private_Clean + Private_Dirty from /proc/<pid>/smaps_rollup)
+is what each extra worker really costs; Pss splits shared pages between them.
+Linux only.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DEPARTMENT = 'CE'
+
+
+def _rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def _smaps_kb():
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def _first_request(app):
+    import contextlib
+    import io
+    client = app.test_client()
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        resp = client.post('/api/recommendations', data={'department': DEPARTMENT})
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def child_startup(mode):
+    start = time.perf_counter()
+    if mode == 'eager':
+        import pdfplumber  # noqa: F401
+        import pypdfium2  # noqa: F401
+    import contextlib
+    import io
+    from app import create_app
+    with contextlib.redirect_stderr(io.StringIO()):
+        app = create_app()
+    startup = (time.perf_counter() - start) * 1000
+    first = _first_request(app)
+    return {'startup_ms': round(startup, 1), 'first_request_ms': round(first, 1), 'rss_kb': _rss_kb()}
+
+
+def child_preload(workers):
+    import contextlib
+    import io
+    from app import create_app
+    with contextlib.redirect_stderr(io.StringIO()):
+        app = create_app()
+
+    results = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            first = _first_request(app)
+            smaps = _smaps_kb()
+            report = {
+                'first_request_ms': round(first, 1),
+                'private_kb': smaps.get('Private_Clean', 0) + smaps.get('Private_Dirty', 0),
+                'pss_kb': smaps.get('Pss', 0),
+                'rss_kb': smaps.get('Rss', 0),
+            }
+            os.write(write_fd, json.dumps(report).encode())
+            os._exit(0)
+        os.close(write_fd)
+        # One worker at a time, alive while the next ones are measured, so Pss is split like in gunicorn
+        with os.fdopen(read_fd) as f:
+            results.append((pid, json.loads(f.read())))
+    for pid, _ in results:
+        os.waitpid(pid, 0)
+    return [r for _, r in results]
+
+
+def run_child(args, env=None):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup'] + args,
+        env=dict(os.environ, **(env or {})), capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def mean(rows, key):
+    return sum(r[key] for r in rows) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--child')
+    args = parser.parse_args()
+
+    if args.child == 'preload':
+        print(json.dumps(child_preload(args.workers)))
+        return
+    if args.child:
+        print(json.dumps(child_startup(args.child)))
+        return
+
+    print(f"{'mode':<18}{'startup':>12}{'first request':>16}{'rss':>12}")
+    for label, mode, env in (
+        ('eager parsers', 'eager', {'APP_WARMUP': '0'}),
+        ('lazy', 'lazy', {'APP_WARMUP': '0'}),
+        ('lazy + warmup', 'lazy', {'APP_WARMUP': '1'}),
+    ):
+        rows = [run_child(['--child', mode], env) for _ in range(args.runs)]
+        print(f"{label:<18}{mean(rows, 'startup_ms'):>9.0f} ms{mean(rows, 'first_request_ms'):>13.1f} ms"
+              f"{mean(rows, 'rss_kb') / 1024:>9.1f} MB")
+
+    print(f"\n{args.workers} forked workers  {'first request':>16}{'private/worker':>17}{'pss/worker':>13}")
+    for label, env in (('warm per worker', {'APP_WARMUP': '0'}), ('preload + warmup', {'APP_WARMUP': '1'})):
+        rows = run_child(['--child', 'preload', '--workers', str(args.workers)], env)
+        print(f"{label:<18}{mean(rows, 'first_request_ms'):>17.1f} ms{mean(rows, 'private_kb') / 1024:>14.1f} MB"
+              f"{mean(rows, 'pss_kb') / 1024:>10.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
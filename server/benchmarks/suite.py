@@ -0,0 +1,213 @@
+"""
+End-to-end benchmark suite on synthetic data.
+
+    python -m benchmarks.suite [--out results.json] [--compare old.json] [--size small|medium|large]
+
+Generates classes.db / grades.sqlite / professors.db and a transcript PDF
+(see benchmarks/synthetic.py) in a temp folder, points the app at them
+(DATA_DIR, DATABASE_URL), then times:
+
+  extract_all_courses                 synthetic transcript PDF
+  filter_eligible_courses_unique      random course histories, largest department
+  get_professor_offerings_for_course  per-table scan of every grades term
+  get_offerings_for_courses           same lookups through the offerings index
+  calculate_match_score               every professor x a set of preference profiles
+  /api/recommendations                Flask test client, caches off and on
+
+Results (plus the sizes and environment) go to a JSON file. --compare prints
+the change against an earlier results file and exits with status 1 if any
+benchmark got slower by more than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import synthetic
+
+SIZES = {
+    #          departments, courses/dept, professors, terms, max sections, transcript pages
+    'small':  dict(departments=4, courses=80, professors=200, terms=3, max_sections=2, transcript_pages=2),
+    'medium': dict(departments=8, courses=200, professors=800, terms=6, max_sections=3, transcript_pages=6),
+    'large':  dict(departments=16, courses=400, professors=3000, terms=12, max_sections=4, transcript_pages=20),
+}
+
+
+def timeit(fn, repeat):
+    """Best and mean wall time of fn() over `repeat` runs, in ms."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': round(min(times), 3), 'mean_ms': round(sum(times) / len(times), 3), 'runs': repeat}
+
+
+def random_histories(codes, n, seed=1):
+    rng = random.Random(seed)
+    return [rng.sample(codes, rng.randint(0, len(codes) // 2)) for _ in range(n)]
+
+
+def preference_profiles(n, seed=2):
+    rng = random.Random(seed)
+    keys = ['extraCredit', 'easyGrader', 'clearGrading', 'caring', 'goodFeedback', 'lectureHeavy',
+            'groupProjects', 'testHeavy', 'homeworkHeavy', 'strictAttendance', 'popQuizzes']
+    return [{k: rng.random() < 0.5 for k in keys} for _ in range(n)]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def run_suite(data_dir, sizes, codes, repeat):
+    # Imported here: the app reads DATA_DIR / DATABASE_URL at import time
+    from app import create_app
+    from app.models import Professor
+    from app.routes import calculate_match_score
+    from app.scripts.offerings_index import build_offerings_index, get_offerings_for_courses
+    from app.scripts.parse_transcript import extract_all_courses
+    from app.scripts.recommendation_engine import (
+        filter_eligible_courses_unique, get_department_courses, get_professor_offerings_for_course,
+    )
+
+    results = {}
+    pool = [code for dept_codes in codes.values() for code in dept_codes]
+    department = max(codes, key=lambda d: len(codes[d]))
+
+    # --- Transcript parsing ---
+    pdf_path = os.path.join(data_dir, 'transcript.pdf')
+    expected = synthetic.make_transcript_pdf(pdf_path, pool, sizes['transcript_pages'])
+    found = set(extract_all_courses(pdf_path))
+    assert found == expected, "extract_all_courses missed courses on the synthetic transcript"
+    results['extract_all_courses'] = dict(
+        timeit(lambda: extract_all_courses(pdf_path), repeat),
+        pages=sizes['transcript_pages'], courses=len(expected))
+
+    # --- Eligibility ---
+    all_courses = get_department_courses(department)
+    histories = random_histories([c['Course_Num'] for c in all_courses], 20)
+    results['filter_eligible_courses_unique'] = dict(
+        timeit(lambda: [filter_eligible_courses_unique(all_courses, h) for h in histories], repeat),
+        department=department, catalog=len(all_courses), histories=len(histories))
+
+    # --- Offerings ---
+    lookups = random.Random(3).sample(pool, min(50, len(pool)))
+    results['get_professor_offerings_for_course'] = dict(
+        timeit(lambda: [get_professor_offerings_for_course(c) for c in lookups], repeat),
+        courses=len(lookups), terms=sizes['terms'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_offerings_index()
+    results['get_offerings_for_courses'] = dict(
+        timeit(lambda: get_offerings_for_courses(lookups), repeat), courses=len(lookups))
+
+    # --- Scoring and the full route (needs the app for the Professor table) ---
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        professors = Professor.query.all()
+    profiles = preference_profiles(8)
+    results['calculate_match_score'] = dict(
+        timeit(lambda: [calculate_match_score(p, prefs) for prefs in profiles for p in professors], repeat),
+        professors=len(professors), profiles=len(profiles))
+
+    requests = [
+        {'department': department, 'completed_courses': json.dumps(h), 'preferences': json.dumps(p)}
+        for h, p in zip(histories, profiles * (len(histories) // len(profiles) + 1))
+    ]
+
+    def post_all():
+        for form in requests:
+            resp = client.post('/api/recommendations', data=form)
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    from app.cache import eligibility_cache, result_cache
+    with contextlib.redirect_stderr(io.StringIO()):
+        post_all()  # warm-up: catalog graph, professor index, pooled connections
+        def uncached():
+            eligibility_cache.clear()
+            result_cache.clear()
+            post_all()
+        results['api_recommendations'] = dict(timeit(uncached, repeat), requests=len(requests))
+        results['api_recommendations_cached'] = dict(timeit(post_all, repeat), requests=len(requests))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change per benchmark; returns the names that regressed past the threshold."""
+    regressed = []
+    print(f"\n{'benchmark':<36}{'before':>12}{'after':>12}{'change':>10}")
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            print(f"{name:<36}{'-':>12}{result['best_ms']:>12.2f}{'new':>10}")
+            continue
+        change = result['best_ms'] / old['best_ms'] - 1 if old['best_ms'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressed.append(name)
+            flag = '  <-- slower'
+        print(f"{name:<36}{old['best_ms']:>12.2f}{result['best_ms']:>12.2f}{change:>+10.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown before flagging (0.2 = 20%%)')
+    parser.add_argument('--keep-data', help='write the synthetic data here instead of a temp folder')
+    args = parser.parse_args()
+
+    sizes = SIZES[args.size]
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.abspath(args.keep_data or tmp)
+        codes = synthetic.make_dataset(data_dir, sizes['departments'], sizes['courses'], sizes['professors'],
+                                       sizes['terms'], sizes['max_sections'])
+        os.environ['DATA_DIR'] = data_dir
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(data_dir, 'professors.db')}"
+        results = run_suite(data_dir, sizes, codes, args.repeat)
+
+    report = {
+        'meta': {
+            'size': args.size,
+            'sizes': sizes,
+            'repeat': args.repeat,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<36}best={result['best_ms']:>10.2f} ms  mean={result['mean_ms']:>10.2f} ms")
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('size') != args.size:
+            print("Warning: comparing runs of different sizes")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
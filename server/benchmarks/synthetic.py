@@ -0,0 +1,269 @@
+"""
+Synthetic data for the benchmark suite: classes.db, grades.sqlite,
+professors.db and transcript PDFs of any size, shaped like the real files.
+
+    python -m benchmarks.synthetic OUT_DIR [--departments 6] [--courses 150] ...
+
+Everything is seeded, so the same arguments always give the same files.
+"""
+import argparse
+import os
+import random
+import sqlite3
+
+from app.scoring import TAG_PHRASES
+
+FIRST_NAMES = ['James', 'Maria', 'Wei', 'Priya', 'Ahmed', 'Elena', 'Carlos', 'Aisha', 'John', 'Mei',
+               'David', 'Fatima', 'Luis', 'Sara', 'Ivan', 'Grace', 'Omar', 'Hannah', 'Ravi', 'Chloe']
+LAST_NAMES = ['Smith', 'Nguyen', 'Garcia', 'Patel', 'Kim', 'Johnson', 'Lopez', 'Chen', 'Brown', 'Khan',
+              'Martinez', 'Singh', 'Davis', 'Ali', 'Wilson', 'Lee', 'Clark', 'Rossi', 'Moore', 'Tanaka']
+SEMESTERS = ['Spring', 'Summer', 'Fall']
+DEPARTMENTS = ['CE', 'CSE', 'EE', 'ME', 'MATH', 'PHYS', 'CHEM', 'IE', 'MAE', 'BE', 'ARCH', 'BIOL']
+
+
+def department_names(n):
+    if n <= len(DEPARTMENTS):
+        return DEPARTMENTS[:n]
+    return DEPARTMENTS + [f"D{i:02d}" for i in range(n - len(DEPARTMENTS))]
+
+
+def course_codes(departments, courses_per_department, seed=0):
+    """{department: ["CE 1105", ...]} with increasing course numbers."""
+    rng = random.Random(seed)
+    codes = {}
+    for dept in departments:
+        numbers = sorted(rng.sample(range(1100, 4999), courses_per_department))
+        codes[dept] = [f"{dept} {n}" for n in numbers]
+    return codes
+
+
+def make_classes_db(path, codes, seed=0):
+    """
+    One ClassesFor<Dept> table per department, like the scraper writes them
+    (Course_Num with a non-breaking space, comma-joined requisites). Prereqs
+    come from earlier courses, some from other departments.
+    """
+    rng = random.Random(seed)
+    departments = list(codes)
+    conn = sqlite3.connect(path)
+    for dept in departments:
+        conn.execute(f"DROP TABLE IF EXISTS ClassesFor{dept}")
+        conn.execute(f"""CREATE TABLE ClassesFor{dept}(
+                            Course_Num VARCHAR(10) NOT NULL PRIMARY KEY,
+                            Course_Name VARCHAR(100) NOT NULL,
+                            Pre_Requisites VARCHAR(200),
+                            Co_Requisites VARCHAR(200),
+                            Description VARCHAR(1000)
+                            )""")
+        rows = []
+        own = codes[dept]
+        for k, code in enumerate(own):
+            prereqs = rng.sample(own[:k], min(k, rng.randint(0, 2)))
+            if k and rng.random() < 0.3:
+                other = codes[rng.choice(departments)]
+                prereqs.append(other[rng.randrange(max(1, len(other) // 2))])
+            coreqs = rng.sample(own[:k], 1) if k and rng.random() < 0.1 else []
+            rows.append((
+                code.replace(' ', '\u00A0'),
+                f"COURSE {code}.  3 Hours.",
+                ', '.join(dict.fromkeys(prereqs)),
+                ', '.join(coreqs),
+                "Synthetic course description.",
+            ))
+        conn.executemany(f"INSERT OR REPLACE INTO ClassesFor{dept} VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def professor_names(n, seed=0):
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    while len(names) < n:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first} {last}"
+        if name in seen:
+            name = f"{first} {chr(65 + rng.randrange(26))}. {last}"
+            if name in seen:
+                continue
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def make_professors_db(path, names, seed=0):
+    """professors table with the RateMyProfessors columns the app reads."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS professors")
+    conn.execute("""CREATE TABLE professors (
+                        id TEXT PRIMARY KEY,
+                        name TEXT,
+                        rmp_name TEXT,
+                        url TEXT,
+                        department TEXT,
+                        quality_rating TEXT,
+                        difficulty_rating TEXT,
+                        total_ratings TEXT,
+                        would_take_again TEXT,
+                        tags TEXT
+                    )""")
+    rows = []
+    for i, name in enumerate(names):
+        tags = ', '.join(phrase.capitalize() for phrase in rng.sample(TAG_PHRASES, rng.randint(0, 5)))
+        rows.append((
+            str(100000 + i), name, name, f"https://www.ratemyprofessors.com/professor/{100000 + i}",
+            rng.choice(['Engineering', 'Mathematics', 'Physics', 'Computer Science']),
+            f"{rng.uniform(1, 5):.1f}" if rng.random() > 0.05 else None,
+            f"{rng.uniform(1, 5):.1f}" if rng.random() > 0.05 else None,
+            str(rng.randint(1, 200)), f"{rng.randint(0, 100)}%", tags,
+        ))
+    conn.executemany("INSERT INTO professors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def instructor_variant(rng, name):
+    """How the grades data spells an instructor: exact, "Last, First", unknown first name, or Staff."""
+    parts = name.split()
+    return rng.choice([
+        name, name, name.upper(),
+        f"{parts[-1]}, {' '.join(parts[:-1])}",
+        f"Zed {parts[-1]}",
+        'Staff',
+    ])
+
+
+def make_grades_db(path, codes, instructors, terms=6, max_sections=3, seed=0):
+    """One "grades-<year>-<semester>" table per term, like grades.sqlite."""
+    rng = random.Random(seed)
+    all_codes = [code for dept_codes in codes.values() for code in dept_codes]
+    conn = sqlite3.connect(path)
+    for t in range(terms):
+        year, semester = 2020 + t // 3, SEMESTERS[t % 3]
+        table = f"grades-{year}-{semester}"
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(f'CREATE TABLE "{table}"(subject_id TEXT, course_number TEXT, section_number TEXT, '
+                     'course_title TEXT, year INTEGER, semester TEXT, instructor1 TEXT, instructor2 TEXT, '
+                     'instructor3 TEXT, instructor4 TEXT, instructor5 TEXT, course_gpa REAL)')
+        rows = []
+        for code in all_codes:
+            subject, number = code.split()
+            for section in range(rng.randint(0, max_sections)):
+                second = instructor_variant(rng, rng.choice(instructors)) if rng.random() < 0.2 else None
+                rows.append((
+                    subject, number, f"{section + 1:03d}", f"COURSE {code}", year, semester,
+                    instructor_variant(rng, rng.choice(instructors)), second, None, None, None,
+                    round(rng.uniform(2.0, 4.0), 2),
+                ))
+        conn.executemany(f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+# --- Transcript PDFs ---
+# A minimal hand-written PDF (Helvetica text only) is enough for both
+# pdfplumber and pypdfium2, so no PDF writer dependency is needed.
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_text_pdf(path, pages):
+    """pages: list of lists of text lines."""
+    objects = []  # object bodies, object i+1 at objects[i]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(None)  # filled in below
+    page_ids = []
+    for lines in pages:
+        ops = ["BT", "/F1 9 Tf", "11 TL", "40 760 Td"]
+        for line in lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+        ))
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def make_transcript_pdf(path, course_pool, n_pages=2, lines_per_page=40, seed=0):
+    """
+    Transcript with semester course lines in the UTA layout
+    ("CSE 1310 INTRO PROGRAMMING 3.000 3.000 A 12.000"). Returns the set of
+    course codes on it, which is what extract_all_courses should find.
+    """
+    rng = random.Random(seed)
+    expected = set()
+    pages = []
+    term = 0
+    for _ in range(n_pages):
+        lines = ["Unofficial Transcript", "Beginning of Undergraduate Record"]
+        while len(lines) < lines_per_page:
+            if len(lines) % 8 == 2:
+                lines.append(f"{SEMESTERS[term % 3]} {2020 + term // 3}")
+                term += 1
+                continue
+            code = rng.choice(course_pool)
+            expected.add(code)
+            grade = rng.choice(['A', 'B', 'C'])
+            lines.append(f"{code} COURSE TITLE {code.split()[1]} 3.000 3.000 {grade} 9.000")
+        pages.append(lines)
+    write_text_pdf(path, pages)
+    return expected
+
+
+def make_dataset(out_dir, departments=6, courses=150, professors=400, terms=6, max_sections=3, seed=0):
+    """Writes classes.db, grades.sqlite and professors.db into out_dir; returns the course codes."""
+    os.makedirs(out_dir, exist_ok=True)
+    codes = course_codes(department_names(departments), courses, seed)
+    names = professor_names(professors, seed)
+    make_classes_db(os.path.join(out_dir, 'classes.db'), codes, seed)
+    make_professors_db(os.path.join(out_dir, 'professors.db'), names, seed)
+    make_grades_db(os.path.join(out_dir, 'grades.sqlite'), codes, names, terms, max_sections, seed)
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('out_dir')
+    parser.add_argument('--departments', type=int, default=6)
+    parser.add_argument('--courses', type=int, default=150, help='courses per department')
+    parser.add_argument('--professors', type=int, default=400)
+    parser.add_argument('--terms', type=int, default=6)
+    parser.add_argument('--sections', type=int, default=3, help='max sections per course per term')
+    parser.add_argument('--transcript-pages', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    codes = make_dataset(args.out_dir, args.departments, args.courses, args.professors,
+                         args.terms, args.sections, args.seed)
+    pool = [code for dept_codes in codes.values() for code in dept_codes]
+    make_transcript_pdf(os.path.join(args.out_dir, 'transcript.pdf'), pool, args.transcript_pages, seed=args.seed)
+    print(f"Wrote classes.db, grades.sqlite, professors.db and transcript.pdf to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
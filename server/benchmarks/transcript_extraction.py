@@ -0,0 +1,86 @@
+"""
+Benchmark: transcript text extraction, pypdfium2 fast path vs pdfplumber.
+
+    python -m benchmarks.transcript_extraction [--pages 10 25] [--repeat 3]
+
+Inputs are data/sample_transcript.pdf plus synthetic multi-page transcripts
+made by repeating its pages. Each (input, mode) run happens in a fresh
+process so peak memory is measured per mode: `rss` is the child's peak RSS
+(includes pdfium's native allocations), `py` the tracemalloc peak.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+
+import pypdfium2 as pdfium
+
+from app.scripts.parse_transcript import parse_courses
+
+SAMPLE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/sample_transcript.pdf'))
+
+
+def synthetic_transcript(n_pages, path):
+    """Writes an n-page transcript built from the sample's pages."""
+    src = pdfium.PdfDocument(SAMPLE)
+    out = pdfium.PdfDocument.new()
+    while len(out) < n_pages:
+        take = min(len(src), n_pages - len(out))
+        out.import_pages(src, list(range(take)))
+    out.save(path)
+    out.close()
+    src.close()
+    return path
+
+
+def _run(path, mode, repeat):
+    with open(path, 'rb') as f:
+        data = f.read()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        courses = parse_courses(data, mode)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    # Separate traced run: tracemalloc slows allocation-heavy code down a lot
+    tracemalloc.start()
+    parse_courses(data, mode)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, courses, py_peak, rss_kb
+
+
+def measure(path, mode, repeat):
+    # spawn: every measurement starts from a clean interpreter
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run, (path, mode, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs='*', default=[10, 25])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tmp', default='/tmp')
+    args = parser.parse_args()
+
+    inputs = [('sample_transcript.pdf', SAMPLE)]
+    for n in args.pages:
+        inputs.append((f"synthetic {n}p", synthetic_transcript(n, os.path.join(args.tmp, f"synthetic_transcript_{n}.pdf"))))
+
+    for label, path in inputs:
+        n_pages = len(pdfium.PdfDocument(path))
+        results = {}
+        for mode in ['pdfplumber', 'fast']:
+            elapsed, courses, py_peak, rss_kb = measure(path, mode, args.repeat)
+            results[mode] = courses
+            print(f"{label:<22} {mode:<11} pages={n_pages:<4} "
+                  f"per-page={elapsed / n_pages * 1000:7.2f} ms  total={elapsed * 1000:8.1f} ms  "
+                  f"py-peak={py_peak / 2**20:6.1f} MiB  rss={rss_kb / 1024:6.1f} MiB  courses={len(courses)}")
+        assert results['fast'] == results['pdfplumber'], f"{label}: fast path found different courses"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""typed professor rating columns and a lowercase name index
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-18 04:00:00
+
+professors.db was written by the RateMyProfessors scraper with every column
+TEXT ("4.5", "85%", "N/A"). This converts the four numeric columns to
+REAL/INTEGER ("N/A" and other non-numbers become NULL, "85%" becomes 85.0)
+and indexes lower(name) for case-insensitive lookups.
+
+Existing databases have no alembic_version yet; `flask db upgrade` runs this
+against them as they are. An empty database gets the typed table directly.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# column -> (new type, Postgres USING cast, Python conversion)
+NUMERIC_COLUMNS = {
+    'quality_rating': (sa.Float(), 'double precision', float),
+    'difficulty_rating': (sa.Float(), 'double precision', float),
+    'total_ratings': (sa.Integer(), 'integer', int),
+    'would_take_again': (sa.Float(), 'double precision', float),
+}
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def _to_number(value, kind):
+    """'4.5' -> 4.5, '85%' -> 85.0, 'N/A' / '' / None -> None."""
+    if value is None:
+        return None
+    text = str(value).strip().rstrip('%').strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return int(number) if kind is int else number
+
+
+def _rewrite(convert):
+    """Rewrites every numeric column through convert(column, value), in Python: portable, and 'N/A' can't be CAST."""
+    bind = op.get_bind()
+    names = list(NUMERIC_COLUMNS)
+    rows = bind.execute(sa.text(f"SELECT id, {', '.join(names)} FROM professors")).fetchall()
+    updates = [
+        dict({'id': row[0]}, **{name: convert(name, value) for name, value in zip(names, row[1:])})
+        for row in rows
+    ]
+    if updates:
+        assignments = ', '.join(f"{name} = :{name}" for name in names)
+        bind.execute(sa.text(f"UPDATE professors SET {assignments} WHERE id = :id"), updates)
+
+
+def upgrade_():
+    bind = op.get_bind()
+    if 'professors' not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            'professors',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=128)),
+            sa.Column('rmp_name', sa.String(length=128)),
+            sa.Column('url', sa.String(length=256)),
+            sa.Column('department', sa.String(length=128)),
+            sa.Column('quality_rating', sa.Float()),
+            sa.Column('difficulty_rating', sa.Float()),
+            sa.Column('total_ratings', sa.Integer()),
+            sa.Column('would_take_again', sa.Float()),
+            sa.Column('tags', sa.String(length=512)),
+        )
+    else:
+        # Clean the text first (still TEXT columns, so write strings), then change the types
+        def clean(name, value):
+            number = _to_number(value, NUMERIC_COLUMNS[name][2])
+            return None if number is None else str(number)
+
+        _rewrite(clean)
+        with op.batch_alter_table('professors') as batch_op:
+            for name, (type_, pg_type, _) in NUMERIC_COLUMNS.items():
+                batch_op.alter_column(name, type_=type_, existing_type=sa.Text(),
+                                      postgresql_using=f"{name}::{pg_type}")
+
+    op.create_index('ix_professors_name_lower', 'professors', [sa.text('lower(name)')])
+
+
+def downgrade_():
+    op.drop_index('ix_professors_name_lower', table_name='professors')
+    with op.batch_alter_table('professors') as batch_op:
+        for name, (type_, _, _) in NUMERIC_COLUMNS.items():
+            batch_op.alter_column(name, type_=sa.Text(), existing_type=type_, postgresql_using=f"{name}::text")
+
+    # Back to the scraper's spelling: "4.5", "85%", "N/A"
+    def as_text(name, value):
+        number = _to_number(value, float)
+        if number is None:
+            return 'N/A'
+        return f"{number:g}%" if name == 'would_take_again' else f"{number:g}"
+
+    _rewrite(as_text)
+
+
+def upgrade_catalog():
+    pass
+
+
+def downgrade_catalog():
+    pass
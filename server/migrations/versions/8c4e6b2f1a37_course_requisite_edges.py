@@ -0,0 +1,78 @@
+"""course_requisites edge table in classes.db
+
+Revision ID: 8c4e6b2f1a37
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 04:10:00
+
+The ClassesFor<Dept> tables store requisites as comma-joined strings
+("MATH 1426, PHYS 1443"), so "what requires MATH 1426?" is a LIKE scan of
+every catalog table. This adds one row per (course, requisite) edge,
+indexed on both endpoints, and fills it from the current strings. The
+string columns are kept; the scraper updates both (see CourseWriter).
+
+A full re-scrape into a new classes.db file starts without this table:
+run `flask db upgrade` again afterwards.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.scripts.requisites import requisite_codes
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e6b2f1a37'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine_name):
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name):
+    globals()["downgrade_%s" % engine_name]()
+
+
+def upgrade_():
+    pass
+
+
+def downgrade_():
+    pass
+
+
+def upgrade_catalog():
+    edges = op.create_table(
+        'course_requisites',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('department', sa.String(length=10), nullable=False),
+        sa.Column('course_num', sa.String(length=16), nullable=False),
+        sa.Column('requisite', sa.String(length=16), nullable=False),
+        sa.Column('kind', sa.String(length=3), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_course_requisites_course', 'course_requisites', ['department', 'course_num'])
+    op.create_index('ix_course_requisites_requisite', 'course_requisites', ['requisite'])
+
+    bind = op.get_bind()
+    rows = []
+    for table in sorted(sa.inspect(bind).get_table_names()):
+        if not table.startswith('ClassesFor'):
+            continue
+        department = table[len('ClassesFor'):]
+        courses = bind.execute(sa.text(f'SELECT Course_Num, Pre_Requisites, Co_Requisites FROM "{table}"'))
+        for course_num, prereqs, coreqs in courses:
+            code = ' '.join(str(course_num).replace('\xa0', ' ').split())
+            for kind, req_str in (('pre', prereqs), ('co', coreqs)):
+                for position, requisite in enumerate(requisite_codes(req_str)):
+                    rows.append({'department': department, 'course_num': code, 'requisite': requisite,
+                                 'kind': kind, 'position': position})
+    if rows:
+        op.bulk_insert(edges, rows)
+
+
+def downgrade_catalog():
+    op.drop_index('ix_course_requisites_requisite', table_name='course_requisites')
+    op.drop_index('ix_course_requisites_course', table_name='course_requisites')
+    op.drop_table('course_requisites')